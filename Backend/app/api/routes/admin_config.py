@@ -8,6 +8,8 @@ acting as a non-breaking stub while the real admin/config backend is designed.
 
 from fastapi import APIRouter, status
 
+from app.core.security import permission_cache
+
 
 router = APIRouter()
 
@@ -82,11 +84,13 @@ async def list_role_permissions() -> dict:
 
 @router.post("/roles/{role_id}/permissions")
 async def grant_permission(role_id: str) -> dict:
+  permission_cache.bump()
   return {"role": role_id, "status": "granted"}
 
 
 @router.delete("/roles/{role_id}/permissions")
 async def revoke_permission(role_id: str) -> dict:
+  permission_cache.bump()
   return {"role": role_id, "status": "revoked"}
 
 
@@ -11,9 +11,9 @@ from app.models import (
 from app.db.session import get_session
 from app.security.jwt_tenancy import (
     create_access_token,
+    get_login_context,
     get_user_by_email,
-    get_roles_for_user,
-    verify_password,
+    verify_password_async,
 )
 
 router = APIRouter()
@@ -47,15 +47,16 @@ async def check_email(payload: CheckEmailRequest, session: AsyncSession = Depend
 async def login_for_access_token(
     payload: TokenRequest, session: AsyncSession = Depends(get_session)
 ) -> TokenResponse:
-    db_user = await get_user_by_email(session, payload.email)
+    # user, tenant and roles come back in one statement
+    db_user = await get_login_context(session, payload.email)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais invalidas.")
 
-    if not verify_password(payload.password, db_user["senha_hash"]):
+    if not await verify_password_async(payload.password, db_user["senha_hash"]):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais invalidas.")
 
-    # Load roles from RBAC tables (user_roles -> roles). Fallback to perfil if present.
-    roles = await get_roles_for_user(session, str(db_user["user_id"]))
+    # Roles from RBAC tables (user_roles -> roles). Fallback to perfil if present.
+    roles = db_user["roles"]
     if not roles and db_user.get("perfil"):
         roles = [str(db_user.get("perfil")).lower()]
     token = create_access_token(
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext, get_tenant_context
-from app.dependencies.tenancy import get_tenant_session, get_tenant_session_sqlsafe
+from app.db.utils import tenant_schema_of
+from app.dependencies.tenancy import get_optional_tenant_read_session, get_tenant_read_session_sqlsafe
 from app.models import (
     DashboardFavoriteUpdate,
     DashboardListResponse,
@@ -16,14 +18,21 @@ from app.models import (
     MetaObjectPermissionUpdate,
     MetaObjectResponse,
     SchemasResponse,
+    SQLExportRequest,
+    SQLJobResponse,
     SQLTestRequest,
     SQLTestResponse,
     WidgetPayload,
     WidgetQueryRequest,
     WidgetQueryResponse,
 )
-from app.services import data_store, validar_e_executar_sql_seguro
+from app.security.jwt_tenancy import validar_jwt_e_tenant
+from app.services import data_store, validar_e_executar_sql_seguro, validar_sql
+from app.services.arrow_encoding import arrow_response, wants_arrow
 from app.services.data_store import BASE_TABLES, DEFAULT_PROFILES
+from app.services.schema_catalog import schema_catalog_cache
+from app.services.sql_guard import iniciar_exportacao
+from app.services.sql_jobs import SQLJob, sql_jobs
 
 router = APIRouter()
 
@@ -35,10 +44,34 @@ router = APIRouter()
 )
 async def test_sql_query(
     query: SQLTestRequest,
-    session: AsyncSession = Depends(get_tenant_session_sqlsafe),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_tenant_read_session_sqlsafe),
     context: TenantContext = Depends(get_tenant_context),
 ) -> SQLTestResponse:
-    validation = await validar_e_executar_sql_seguro(query.query, session=session)
+    validation = await validar_e_executar_sql_seguro(query.query, session=session, tenant_id=context.tenant_id)
+    cache_status = "HIT" if validation.cache_hit else "MISS"
+    response.headers["X-Cache"] = cache_status
+    plan = validation.plan
+    if validation.routed_to_job:
+        # Too expensive for the interactive path: hand it to the job pool instead
+        job = sql_jobs.submit(context.tenant_id, tenant_schema_of(session), validation.normalized_query.rstrip(";"))
+        response.status_code = status.HTTP_202_ACCEPTED
+        return SQLTestResponse(
+            isValid=True,
+            normalizedQuery=validation.normalized_query,
+            message="Consulta encaminhada para execucao assincrona (custo estimado alto).",
+            estimatedCost=plan.total_cost,
+            estimatedRows=plan.plan_rows,
+            jobId=job.job_id,
+        )
+    if wants_arrow(request):
+        # Columnar body straight from the row tuples; metadata travels in headers
+        return arrow_response(
+            validation.columns,
+            validation.rows,
+            headers={"X-Cache": cache_status, "X-Execution-Time": f"{validation.execution_time_ms}ms"},
+        )
     return SQLTestResponse(
         isValid=True,
         rowsAffected=validation.rows_affected,
@@ -46,20 +79,110 @@ async def test_sql_query(
         message=f"Consulta validada para o tenant {context.tenant_id}.",
         time=f"{validation.execution_time_ms}ms",
         results=validation.sample_rows,
+        estimatedCost=plan.total_cost if plan else None,
+        estimatedRows=plan.plan_rows if plan else None,
     )
 
 
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@router.post(
+    "/query/export",
+    summary="Stream the full result of a SQL query as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_sql_query(
+    payload: SQLExportRequest,
+    user: dict = Depends(validar_jwt_e_tenant),
+) -> StreamingResponse:
+    # Validate and start the query before streaming so guard and SQL errors still return a proper 400
+    body = validar_sql(payload.query)
+    chunks = await iniciar_exportacao(body, user["schema_name"], payload.format, tenant_id=user["tenant_id"])
+    return StreamingResponse(
+        chunks,
+        media_type=_EXPORT_MEDIA_TYPES[payload.format],
+        headers={"Content-Disposition": f'attachment; filename="export.{payload.format}"'},
+    )
+
+
+def _job_response(job: SQLJob, offset: int = 0, limit: int = 0) -> SQLJobResponse:
+    elapsed = job.execution_time_ms
+    return SQLJobResponse(
+        jobId=job.job_id,
+        status=job.status,
+        rowCount=len(job.rows),
+        truncated=job.truncated,
+        columns=job.columns,
+        results=job.page(offset, limit) if limit else [],
+        offset=offset,
+        limit=limit,
+        error=job.error,
+        time=f"{elapsed}ms" if elapsed is not None else None,
+    )
+
+
+@router.post(
+    "/query/jobs",
+    summary="Submit a SQL query to run as a background job",
+    response_model=SQLJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_sql_job(
+    query: SQLTestRequest,
+    user: dict = Depends(validar_jwt_e_tenant),
+) -> SQLJobResponse:
+    body = validar_sql(query.query)
+    job = sql_jobs.submit(user["tenant_id"], user["schema_name"], body)
+    return _job_response(job)
+
+
+@router.get(
+    "/query/jobs/{job_id}",
+    summary="Poll a SQL job status and page through its results",
+    response_model=SQLJobResponse,
+)
+async def get_sql_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=1000),
+    user: dict = Depends(validar_jwt_e_tenant),
+) -> SQLJobResponse:
+    job = sql_jobs.get(user["tenant_id"], job_id)
+    return _job_response(job, offset, limit)
+
+
+@router.delete(
+    "/query/jobs/{job_id}",
+    summary="Cancel a queued or running SQL job",
+    response_model=SQLJobResponse,
+)
+async def cancel_sql_job(
+    job_id: str,
+    user: dict = Depends(validar_jwt_e_tenant),
+) -> SQLJobResponse:
+    job = await sql_jobs.cancel(sql_jobs.get(user["tenant_id"], job_id))
+    return _job_response(job)
+
+
 @router.get(
     "/meta/schemas",
     summary="List schemas and objects for SchemaBrowser",
     response_model=SchemasResponse,
 )
 async def get_meta_schemas(
+    session: AsyncSession | None = Depends(get_optional_tenant_read_session),
     context: TenantContext = Depends(get_tenant_context),
 ) -> SchemasResponse:
     store = data_store.get_store(context.tenant_id)
     objetos_custom = [obj.nomeAmigavel for obj in store.list_meta_objects() if obj.tipo == "CUSTOMIZADO"]
-    return SchemasResponse(tabelasBase=BASE_TABLES, objetosCustom=objetos_custom)
+    if session is None:
+        # No JWT (header-context callers): no tenant schema to introspect
+        return SchemasResponse(tabelasBase=BASE_TABLES, objetosCustom=objetos_custom)
+    # Cached per tenant schema; catalog queries only run when DDL changed the schema
+    tabelas = await schema_catalog_cache.get(session, tenant_schema_of(session))
+    tabelas_base = [tabela["nome"] for tabela in tabelas] or BASE_TABLES
+    return SchemasResponse(tabelasBase=tabelas_base, objetosCustom=objetos_custom, tabelas=tabelas)
 
 
 @router.get(
@@ -112,7 +235,7 @@ async def get_meta_object_permissions(
     context: TenantContext = Depends(get_tenant_context),
 ) -> MetaObjectPermissionResponse:
     store = data_store.get_store(context.tenant_id)
-    record = next((obj for obj in store.list_meta_objects() if obj.metaId == meta_id), None)
+    record = store.get_meta_object(meta_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta objeto nao encontrado.")
     return MetaObjectPermissionResponse(
@@ -246,14 +369,18 @@ async def update_dashboard_favorite(
 )
 async def execute_no_code_query(
     query_spec: WidgetQueryRequest,
+    request: Request,
     context: TenantContext = Depends(get_tenant_context),
 ) -> WidgetQueryResponse:
-    sample_rows: list[dict[str, Any]] = [
-        {query_spec.groupBy: "Grupo A", query_spec.aggregateField: 42000},
-        {query_spec.groupBy: "Grupo B", query_spec.aggregateField: 31000},
-        {query_spec.groupBy: "Grupo C", query_spec.aggregateField: 18000},
+    columns = [query_spec.groupBy, query_spec.aggregateField]
+    rows: list[tuple[Any, ...]] = [
+        ("Grupo A", 42000),
+        ("Grupo B", 31000),
+        ("Grupo C", 18000),
     ]
-    return WidgetQueryResponse(rows=sample_rows)
+    if wants_arrow(request, len(rows)):
+        return arrow_response(columns, rows)
+    return WidgetQueryResponse(rows=[dict(zip(columns, row)) for row in rows])
 
 
 @router.get(
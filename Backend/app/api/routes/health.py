@@ -1,9 +1,75 @@
 """Basic service-level endpoints."""
 from fastapi import APIRouter
 
+from app.core.security import permission_cache
+from app.db.statements import statements
+from app.db.table_versions import table_versions
+from app.security.jwt_tenancy import password_hash_pool, tenant_schema_cache, verified_token_cache
+from app.services.data_store import data_store
+from app.services.schema_catalog import schema_catalog_cache
+from app.services.sql_guard import validated_query_cache
+from app.services.sql_jobs import sql_jobs
+from app.services.studio_cache import studio_result_cache
+from app.services.studio_limiter import studio_limiter
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("/ping", summary="Health-check endpoint")
 async def ping() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/tenant-cache", summary="Tenant schema cache hit/miss counters")
+async def tenant_cache_stats() -> dict[str, int]:
+    return tenant_schema_cache.stats()
+
+
+@router.get("/permission-cache", summary="Compiled RBAC permission map counters")
+async def permission_cache_stats() -> dict[str, int]:
+    return permission_cache.stats()
+
+
+@router.get("/statements", summary="Tenant statement registry counters")
+async def statement_registry_stats() -> dict[str, int]:
+    return statements.stats()
+
+
+@router.get("/jwt-cache", summary="Verified JWT cache counters")
+async def jwt_cache_stats() -> dict[str, int]:
+    return verified_token_cache.stats()
+
+
+@router.get("/password-hashing", summary="bcrypt thread pool queue depth")
+async def password_hashing_stats() -> dict[str, int]:
+    return password_hash_pool.stats()
+
+
+@router.get("/sql-guard", summary="SQL Studio validated-query cache counters")
+async def sql_guard_stats() -> dict[str, int]:
+    return validated_query_cache.stats()
+
+
+@router.get("/sql-jobs", summary="SQL Studio job queue counters")
+async def sql_jobs_stats() -> dict[str, int]:
+    return sql_jobs.stats()
+
+
+@router.get("/studio-cache", summary="SQL Studio result cache and table version counters")
+async def studio_cache_stats() -> dict[str, dict[str, int]]:
+    return {"results": studio_result_cache.stats(), "table_versions": table_versions.stats()}
+
+
+@router.get("/schema-catalog", summary="Schema browser catalog cache counters")
+async def schema_catalog_stats() -> dict[str, int]:
+    return schema_catalog_cache.stats()
+
+
+@router.get("/sql-limiter", summary="SQL Studio concurrency queue and wait-time metrics")
+async def sql_limiter_stats() -> dict[str, float]:
+    return studio_limiter.stats()
+
+
+@router.get("/data-store", summary="In-memory tenant store residency and eviction counters")
+async def data_store_stats() -> dict[str, float]:
+    return data_store.stats()
@@ -1,6 +1,6 @@
-from collections import defaultdict
+from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from app.core.security import TenantContext, get_tenant_context
 from app.models import DashboardSummary, FunnelStage, KPIItem
@@ -8,7 +8,6 @@ from app.services import data_store
 
 router = APIRouter()
 
-
 def _format_currency(value: float) -> str:
     return f"R$ {value:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
@@ -20,36 +19,29 @@ def _format_currency(value: float) -> str:
 )
 async def get_dashboard_kpis(context: TenantContext = Depends(get_tenant_context)) -> DashboardSummary:
     store = data_store.get_store(context.tenant_id)
-    opportunities = store.list_opportunities()
-    leads = store.list_leads()
+    # Running aggregates kept by the store: O(stages), no scan of opportunities/leads
+    stage_totals = store.pipeline_by_stage()
     activities = store.list_activities()
 
-    receita_prevista = sum(op.valor for op in opportunities)
-    oportunidades_total = len(opportunities)
-    atividades_abertas = len([act for act in activities if act.status.lower() != "concluido"])
+    receita_prevista = sum(valor for valor, _ in stage_totals.values())
+    atividades_abertas = store.count_open_activities()
 
     kpi_cards = [
         KPIItem(label="Receita prevista", value=_format_currency(receita_prevista), change="+14% vs meta"),
         KPIItem(label="Atividades em aberto", value=str(atividades_abertas), change="3 novas reunioes"),
-        KPIItem(label="Leads ativos", value=str(len(leads)), change="+5 no ultimo ciclo"),
+        KPIItem(label="Leads ativos", value=str(store.count_leads()), change="+5 no ultimo ciclo"),
     ]
 
-    stage_totals: dict[str, dict[str, float]] = defaultdict(lambda: {"valor": 0.0, "count": 0})
-    for opportunity in opportunities:
-        stage = opportunity.stage
-        stage_totals[stage]["valor"] += opportunity.valor
-        stage_totals[stage]["count"] += 1
-
     funnel_stages: list[FunnelStage] = []
-    for index, (stage, totals) in enumerate(stage_totals.items()):
-        amount = _format_currency(totals["valor"])
-        progress = min(1.0, (totals["valor"] / receita_prevista) if receita_prevista else 0.25)
+    for index, (stage, (valor, count)) in enumerate(stage_totals.items()):
+        amount = _format_currency(valor)
+        progress = min(1.0, (valor / receita_prevista) if receita_prevista else 0.25)
         accent_palette = ["#00bcd4", "#8bc34a", "#ffc107", "#1a7cb7"]
         funnel_stages.append(
             FunnelStage(
                 title=stage,
                 amount=amount,
-                items=int(totals["count"]),
+                items=count,
                 progress=float(progress),
                 accent=accent_palette[index % len(accent_palette)],
             )
@@ -76,7 +68,12 @@ async def get_user_activities(context: TenantContext = Depends(get_tenant_contex
 
 
 @router.get("/calendario", summary="List calendar activities")
-async def get_calendar_activities(context: TenantContext = Depends(get_tenant_context)):
+async def get_calendar_activities(
+    inicio: datetime | None = Query(default=None, alias="from"),
+    fim: datetime | None = Query(default=None, alias="to"),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    context: TenantContext = Depends(get_tenant_context),
+):
     store = data_store.get_store(context.tenant_id)
     events = [
         {
@@ -85,12 +82,17 @@ async def get_calendar_activities(context: TenantContext = Depends(get_tenant_co
             "status": activity.status,
             "date": activity.dueDate.isoformat(),
         }
-        for activity in store.list_activities()
+        for activity in store.list_activities_due(inicio, fim, limit)
     ]
     return {"events": events}
 
 
 @router.get("/lembretes", summary="List reminders based on activities")
-async def get_reminders(context: TenantContext = Depends(get_tenant_context)):
+async def get_reminders(
+    inicio: datetime | None = Query(default=None, alias="from"),
+    fim: datetime | None = Query(default=None, alias="to"),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    context: TenantContext = Depends(get_tenant_context),
+):
     store = data_store.get_store(context.tenant_id)
-    return {"items": store.list_reminders()}
+    return {"items": store.list_reminders(inicio, fim, limit)}
@@ -1,7 +1,8 @@
 """Simple authentication / tenancy dependencies."""
 from __future__ import annotations
 
-from typing import List
+import time
+from typing import Dict, FrozenSet, List
 
 from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -67,6 +68,96 @@ def require_roles(*expected_roles: str):
     return _checker
 
 
+def _permission_signature_sql(schema: str):
+    # Changes on any insert, update or delete in the three RBAC tables, from any
+    # process (other workers, migrations, manual SQL)
+    parts = [
+        f"(SELECT count(*)::text || ':' || COALESCE(max(xmin::text::bigint), 0)::text FROM {schema}.{table})"
+        for table in ("roles", "role_permissions", "permissions")
+    ]
+    return text("SELECT " + " || '/' || ".join(parts))
+
+
+class PermissionCache:
+    """Compiled role -> action_key map for the RBAC tables in tenant_admin.
+
+    Checks on the hot path are set lookups. The map is trusted for
+    ``revalidate_seconds``; after that one cheap signature query over the RBAC
+    tables decides whether it must be rebuilt, so a grant or revoke made through
+    any worker takes effect everywhere within that window. ``bump`` (admin writes
+    in this worker) forces the rebuild immediately, and ``ttl_seconds`` bounds
+    how long a compiled map is reused at all.
+    """
+
+    def __init__(self, ttl_seconds: int, revalidate_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self.version = 0
+        self._compiled: Dict[str, FrozenSet[str]] | None = None
+        self._compiled_version = -1
+        self._signature = ""
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self.hits = 0
+        self.revalidations = 0
+        self.loads = 0
+
+    def bump(self) -> None:
+        self.version += 1
+
+    async def get(self, session: AsyncSession) -> Dict[str, FrozenSet[str]]:
+        now = time.monotonic()
+        schema = settings.tenant_admin_schema
+        usable = (
+            self._compiled is not None
+            and self._compiled_version == self.version
+            and now - self._loaded_at < self.ttl_seconds
+        )
+        if usable and now - self._checked_at < self.revalidate_seconds:
+            self.hits += 1
+            return self._compiled  # type: ignore[return-value]
+
+        version = self.version
+        signature = (await session.execute(_permission_signature_sql(schema))).scalar_one()
+        if usable and signature == self._signature:
+            self.revalidations += 1
+            self._checked_at = now
+            return self._compiled  # type: ignore[return-value]
+
+        q = text(
+            f"""
+            SELECT lower(r.name) AS role_name, p.action_key
+            FROM {schema}.roles r
+            JOIN {schema}.role_permissions rp ON rp.role_id = r.role_id
+            JOIN {schema}.permissions p ON p.permission_id = rp.permission_id
+            """
+        )
+        res = await session.execute(q)
+        grouped: Dict[str, set[str]] = {}
+        for role_name, key in res.all():
+            grouped.setdefault(role_name, set()).add(key)
+        self.loads += 1
+        self._compiled = {role: frozenset(keys) for role, keys in grouped.items()}
+        self._compiled_version = version
+        self._signature = signature
+        self._loaded_at = self._checked_at = now
+        return self._compiled
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "roles": len(self._compiled or {}),
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "loads": self.loads,
+        }
+
+
+permission_cache = PermissionCache(
+    ttl_seconds=settings.permission_cache_ttl_seconds,
+    revalidate_seconds=settings.permission_cache_revalidate_seconds,
+)
+
+
 def require_permission(action_key: str):
     async def _checker(
         context: TenantContext = Depends(get_tenant_context),
@@ -80,19 +171,9 @@ def require_permission(action_key: str):
         if not roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing roles.")
 
-        schema = settings.tenant_admin_schema
-        q = text(
-            f"""
-            SELECT 1
-            FROM {schema}.roles r
-            JOIN {schema}.role_permissions rp ON rp.role_id = r.role_id
-            JOIN {schema}.permissions p ON p.permission_id = rp.permission_id
-            WHERE lower(r.name) = ANY(:roles) AND p.action_key = :key
-            LIMIT 1
-            """
-        )
-        res = await session.execute(q, {"roles": roles, "key": action_key})
-        if res.scalar() is None:
+        # The session only checks out a connection when the compiled map must be revalidated
+        compiled = await permission_cache.get(session)
+        if not any(action_key in compiled.get(role, ()) for role in roles):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied.")
         return context
 
@@ -1,14 +1,138 @@
 """Database session handling for async SQLAlchemy usage."""
+import asyncio
+import logging
 from collections.abc import AsyncGenerator
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=settings.sqlalchemy_echo)
+logger = logging.getLogger("nexus.db")
+
+# Startup probe for transaction pooling: one parameterised statement, run by
+# several client connections in many short transactions at once
+_PGBOUNCER_PROBE_SQL = text("SELECT CAST(:value AS integer) + 1")
+_PGBOUNCER_PROBE_CONNECTIONS = 4
+_PGBOUNCER_PROBE_ROUNDS = 10
+
+
+def _unique_statement_name() -> str:
+    # PgBouncer may hand a transaction to a server connection that already has a
+    # statement with asyncpg's sequential name; random names never collide.
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _connect_args() -> dict[str, Any]:
+    if settings.db_pgbouncer_transaction_mode:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    # SQL text is schema-qualified per tenant (see app.db.statements), so reuse is tenant-safe
+    return {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+
+
+def _build_engine(url: str, *, pool_size: int | None = None, max_overflow: int | None = None) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.sqlalchemy_echo,
+        pool_size=settings.db_pool_size if pool_size is None else pool_size,
+        max_overflow=settings.db_max_overflow if max_overflow is None else max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        connect_args=_connect_args(),
+    )
+
+
+engine = _build_engine(settings.database_url)
+# Read replica pool; without DATABASE_REPLICA_URL reads are routed to the primary
+replica_engine = _build_engine(settings.database_replica_url) if settings.database_replica_url else None
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+AsyncReadSessionLocal = (
+    async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine is not None else None
+)
+
+# SQL Studio jobs run on their own small pool (replica when configured) so long
+# analytical queries never take API connections. The single overflow slot is
+# reserved for pg_cancel_backend while every job slot is busy.
+studio_engine = _build_engine(
+    settings.database_replica_url or settings.database_url,
+    pool_size=settings.sql_studio_job_pool_size,
+    max_overflow=1,
+)
+StudioSessionLocal = async_sessionmaker(studio_engine, expire_on_commit=False)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield a request-scoped session.
+
+    The session is lazy: a pooled connection is only checked out when the first
+    statement executes (autobegin), so handlers that never query Postgres do not
+    hold a pool slot. Connections that were used are returned as soon as the
+    session closes.
+    """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_session(
+    primary: AsyncSession = Depends(get_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session bound to the read replica.
+
+    Without a replica the request's primary session is reused, so read and write
+    dependencies share one session (and at most one pooled connection).
+    """
+    if AsyncReadSessionLocal is None:
+        yield primary
+        return
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """True when the session reads from the (possibly lagging) replica."""
+    return replica_engine is not None and session.bind is replica_engine
+
+
+async def _probe_prepared_statements(target: AsyncEngine) -> None:
+    async def run(conn_index: int) -> None:
+        async with target.connect() as conn:
+            for round_ in range(_PGBOUNCER_PROBE_ROUNDS):
+                async with conn.begin():
+                    value = conn_index * _PGBOUNCER_PROBE_ROUNDS + round_
+                    result = (await conn.execute(_PGBOUNCER_PROBE_SQL, {"value": value})).scalar_one()
+                    if result != value + 1:
+                        raise RuntimeError(f"Unexpected probe result {result!r} for {value}")
+
+    await asyncio.gather(*(run(i) for i in range(_PGBOUNCER_PROBE_CONNECTIONS)))
+
+
+async def verify_transaction_pooling_compatibility() -> None:
+    """Startup check for DB_PGBOUNCER_TRANSACTION_MODE.
+
+    Behind a transaction pooler consecutive transactions of one client connection
+    can run on different server connections, which breaks server-side prepared
+    statements reused by name ("prepared statement ... does not exist" / "already
+    exists"). Several connections run the same parameterised statement in many
+    short transactions concurrently so the pooler interleaves them; any error
+    means the driver settings are unsafe and startup fails.
+    """
+    engines = [("primary", engine)]
+    if replica_engine is not None:
+        engines.append(("replica", replica_engine))
+    for label, target in engines:
+        try:
+            await _probe_prepared_statements(target)
+        except DBAPIError as exc:
+            raise RuntimeError(
+                f"Prepared statements are not transaction-pooling safe on the {label} database: {exc.orig}"
+            ) from exc
+        logger.info("Transaction pooling compatibility verified for %s database", label)
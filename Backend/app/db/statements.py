@@ -0,0 +1,95 @@
+"""Registry of tenant-scoped SQL statements rendered with schema-qualified names.
+
+Tenancy relies on a per-transaction search_path, so the same SQL text can mean
+different tables for different tenants and asyncpg's prepared-statement cache
+(keyed by SQL text) cannot be trusted across tenants. Repositories register
+their statements once with a ``{schema}.`` placeholder; each tenant gets its own
+schema-qualified SQL text, which makes the driver cache tenant-safe and lets hot
+queries skip parse/plan.
+"""
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.table_versions import mark_tables_written
+from app.db.utils import tenant_schema_of
+
+SCHEMA_PLACEHOLDER = "{schema}."
+_SIMPLE_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+_WRITE_TARGET = re.compile(r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+\{schema\}\.(\w+)", re.IGNORECASE)
+
+
+def _qualifier(schema: Optional[str]) -> str:
+    if not schema:
+        # Unknown tenant: fall back to search_path resolution
+        return ""
+    if _SIMPLE_IDENTIFIER.match(schema):
+        return f"{schema}."
+    return '"' + schema.replace('"', '""') + '".'
+
+
+class StatementRegistry:
+    """Named SQL templates plus an LRU of rendered (schema, statement) clauses."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._templates: Dict[str, str] = {}
+        # Tables written by each template, marked on the session for table_versions
+        self._writes: Dict[str, tuple[str, ...]] = {}
+        self._rendered: OrderedDict[tuple[Optional[str], str], TextClause] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name: str, sql: str) -> str:
+        existing = self._templates.get(name)
+        if existing is not None and existing != sql:
+            raise ValueError(f"Statement '{name}' already registered with different SQL")
+        self._templates[name] = sql
+        self._writes[name] = tuple(dict.fromkeys(m.lower() for m in _WRITE_TARGET.findall(sql)))
+        return name
+
+    def get(self, name: str, schema: Optional[str]) -> TextClause:
+        key = (schema, name)
+        clause = self._rendered.get(key)
+        if clause is not None:
+            self._rendered.move_to_end(key)
+            self.hits += 1
+            return clause
+        self.misses += 1
+        clause = text(self._templates[name].replace(SCHEMA_PLACEHOLDER, _qualifier(schema)))
+        self._rendered[key] = clause
+        while len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+        return clause
+
+    def for_session(self, name: str, session: AsyncSession) -> TextClause:
+        schema = tenant_schema_of(session)
+        written = self._writes.get(name)
+        if written:
+            mark_tables_written(session, *written, schema=schema)
+        return self.get(name, schema)
+
+    def invalidate(self, schema: Optional[str] = None) -> None:
+        if schema is None:
+            self._rendered.clear()
+            return
+        for key in [key for key in self._rendered if key[0] == schema]:
+            del self._rendered[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._rendered),
+            "templates": len(self._templates),
+        }
+
+
+statements = StatementRegistry(settings.statement_registry_max_entries)
@@ -0,0 +1,100 @@
+"""Per-tenant table version counters used to invalidate cached query results.
+
+Writers mark the tables they touch on their session (``mark_tables_written``);
+just before the transaction commits, the matching rows of
+``tenant_admin.tb_table_version`` are bumped in that same transaction, so a
+rolled back write never bumps and every worker (and anything else writing
+through SQL, e.g. a trigger calling the same upsert) sees the new version as
+soon as the data itself is visible. Readers compare against those rows with a
+single indexed lookup.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.utils import tenant_schema_of
+
+WRITTEN_TABLES_KEY = "nexus_written_tables"
+TENANT_ADMIN = settings.tenant_admin_schema
+
+# Also created by migration 20251117_000010; kept here for tests and fresh databases
+CREATE_STATEMENT = f"""
+    CREATE TABLE IF NOT EXISTS {TENANT_ADMIN}.tb_table_version (
+        schema_name TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        version BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (schema_name, table_name)
+    )
+"""
+
+_BUMP = text(
+    f"""
+    INSERT INTO {TENANT_ADMIN}.tb_table_version AS v (schema_name, table_name, version)
+    SELECT s, t, 1 FROM unnest(CAST(:schemas AS text[]), CAST(:tables AS text[])) AS w(s, t)
+    ON CONFLICT (schema_name, table_name) DO UPDATE SET version = v.version + 1
+    """
+)
+
+_SNAPSHOT = text(
+    f"""
+    SELECT table_name, version FROM {TENANT_ADMIN}.tb_table_version
+    WHERE schema_name = :schema AND table_name = ANY(CAST(:tables AS text[]))
+    """
+)
+
+
+class TableVersions:
+    def __init__(self) -> None:
+        self.bumps = 0
+        self.lookups = 0
+
+    def bump(self, session: Session, written: Iterable[tuple[str, str]]) -> None:
+        """Bump versions inside the session's open transaction (sync: called from before_commit)."""
+        # Sorted so concurrent writers lock the rows in the same order
+        pairs = sorted(set(written))
+        if not pairs:
+            return
+        session.connection().execute(
+            _BUMP, {"schemas": [schema for schema, _ in pairs], "tables": [table for _, table in pairs]}
+        )
+        self.bumps += len(pairs)
+
+    async def snapshot(self, session: AsyncSession, schema: str, tables: Iterable[str]) -> tuple[int, ...]:
+        """Current versions of ``tables`` (in the given order) for a tenant schema."""
+        tables = tuple(tables)
+        self.lookups += 1
+        res = await session.execute(_SNAPSHOT, {"schema": schema, "tables": list(tables)})
+        current = dict(res.all())
+        return tuple(current.get(table, 0) for table in tables)
+
+    def stats(self) -> Dict[str, int]:
+        return {"bumps": self.bumps, "lookups": self.lookups}
+
+
+table_versions = TableVersions()
+
+
+def mark_tables_written(session: AsyncSession, *tables: str, schema: Optional[str] = None) -> None:
+    """Record tables written in the current transaction; versions bump when it commits."""
+    schema = schema or tenant_schema_of(session)
+    if not schema:
+        return
+    pending = session.info.setdefault(WRITTEN_TABLES_KEY, set())
+    pending.update((schema, table.lower()) for table in tables)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_written_tables(session: Session) -> None:
+    written = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if written:
+        table_versions.bump(session, written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session: Session) -> None:
+    session.info.pop(WRITTEN_TABLES_KEY, None)
@@ -1,5 +1,155 @@
-from sqlalchemy import text
+from typing import Any, Optional
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.config import settings
+
+
+# Key in AsyncSession.info recording which tenant state was applied to which transaction
+TENANT_BOOTSTRAP_KEY = "nexus_tenant_bootstrap"
+# Key in AsyncSession.info holding the (schema, sql_safe) a deferred bootstrap applies on begin
+TENANT_DEFERRED_KEY = "nexus_tenant_deferred"
+
+
+def _search_path(tenant_schema: str, sql_safe: bool) -> str:
+    # SQL Studio only sees the tenant schema; regular requests also reach tenant_admin
+    return tenant_schema if sql_safe else f"{tenant_schema}, tenant_admin"
+
+
+def _current_bootstrap(session: AsyncSession) -> Optional[tuple[str, bool]]:
+    """Return (schema, sql_safe) applied to the *current* transaction, if any."""
+    state = session.info.get(TENANT_BOOTSTRAP_KEY)
+    if not state:
+        return None
+    transaction, schema, sql_safe = state
+    # set_config(..., true) only lives until commit/rollback, so a new transaction needs it again
+    if transaction is None or transaction is not session.sync_session.get_transaction():
+        return None
+    return schema, sql_safe
+
+
+def tenant_schema_of(session: AsyncSession) -> Optional[str]:
+    """Tenant schema bootstrapped (or deferred) on this session (survives commits), if any."""
+    state = session.info.get(TENANT_BOOTSTRAP_KEY)
+    if state:
+        return state[1]
+    deferred = session.info.get(TENANT_DEFERRED_KEY)
+    return deferred[0] if deferred else None
+
+
+def _mark_bootstrapped(session: AsyncSession, tenant_schema: str, sql_safe: bool) -> None:
+    session.info[TENANT_BOOTSTRAP_KEY] = (session.sync_session.get_transaction(), tenant_schema, sql_safe)
+
+
+def _bootstrap_statement(tenant_schema: str, sql_safe: bool) -> tuple[Any, dict[str, str]]:
+    if sql_safe:
+        return (
+            text(
+                "SELECT set_config('search_path', :path, true), "
+                "set_config('statement_timeout', :timeout, true)"
+            ),
+            {
+                "path": _search_path(tenant_schema, True),
+                "timeout": str(settings.sql_studio_statement_timeout_ms),
+            },
+        )
+    return text("SELECT set_config('search_path', :path, true)"), {"path": _search_path(tenant_schema, False)}
+
+
+async def bootstrap_tenant_session(
+    session: AsyncSession,
+    tenant_schema: str,
+    *,
+    sql_safe: bool = False,
+) -> None:
+    """Apply the tenant search_path (and SQL Studio timeout) in a single statement.
+
+    Idempotent per transaction: stacked dependencies calling this again with the
+    same schema/mode do not issue another round trip.
+    """
+    if _current_bootstrap(session) == (tenant_schema, sql_safe):
+        return
+    await session.execute(*_bootstrap_statement(tenant_schema, sql_safe))
+    _mark_bootstrapped(session, tenant_schema, sql_safe)
+
+
+async def bootstrap_job_session(session: AsyncSession, tenant_schema: str, timeout_ms: int) -> int:
+    """SQL-safe bootstrap for a Studio job with its own timeout; returns the backend pid.
+
+    The pid is what pg_cancel_backend needs to cancel the job later.
+    """
+    res = await session.execute(
+        text(
+            "SELECT pg_backend_pid(), set_config('search_path', :path, true), "
+            "set_config('statement_timeout', :timeout, true)"
+        ),
+        {"path": _search_path(tenant_schema, True), "timeout": str(timeout_ms)},
+    )
+    _mark_bootstrapped(session, tenant_schema, True)
+    return int(res.scalar_one())
+
+
+async def resolve_and_bootstrap_tenant(session: AsyncSession, tenant_id: str) -> Optional[str]:
+    """Look up the tenant schema and apply its search_path in one round trip.
+
+    Returns None (and leaves search_path untouched) when the tenant does not exist.
+    """
+    res = await session.execute(
+        text(
+            """
+            SELECT t.schema_name,
+                   set_config('search_path', t.schema_name || ', tenant_admin', true)
+            FROM tenant_admin.tb_tenant t
+            WHERE t.id = :tenant_id
+            LIMIT 1
+            """
+        ),
+        {"tenant_id": tenant_id},
+    )
+    row = res.first()
+    if row is None:
+        return None
+    schema_name = row[0]
+    _mark_bootstrapped(session, schema_name, False)
+    return schema_name
+
+
+async def ensure_statement_timeout(session: AsyncSession) -> None:
+    """Apply the SQL Studio statement_timeout unless the SQL-safe bootstrap already did (or will)."""
+    state = _current_bootstrap(session)
+    if state and state[1]:
+        return
+    deferred = session.info.get(TENANT_DEFERRED_KEY)
+    if deferred and deferred[1] and not session.in_transaction():
+        # The deferred SQL-safe bootstrap sets it as the next statement begins
+        return
+    await session.execute(
+        text("SELECT set_config('statement_timeout', :timeout, true)"),
+        {"timeout": str(settings.sql_studio_statement_timeout_ms)},
+    )
+
+
+def _bootstrap_on_begin(session: Session, transaction: SessionTransaction, connection) -> None:
+    deferred = session.info.get(TENANT_DEFERRED_KEY)
+    if deferred is None or transaction.parent is not None:
+        return
+    tenant_schema, sql_safe = deferred
+    connection.execute(*_bootstrap_statement(tenant_schema, sql_safe))
+    session.info[TENANT_BOOTSTRAP_KEY] = (session.get_transaction(), tenant_schema, sql_safe)
+
+
+def defer_tenant_bootstrap(session: AsyncSession, tenant_schema: str, *, sql_safe: bool = False) -> None:
+    """Apply the tenant search_path when a statement first begins a transaction.
+
+    Nothing is executed here, so a session that never runs a statement never
+    checks out a pooled connection; every later transaction is bootstrapped too.
+    The session must not be inside a transaction yet (see in_transaction()).
+    """
+    session.info[TENANT_DEFERRED_KEY] = (tenant_schema, sql_safe)
+    if not event.contains(session.sync_session, "after_begin", _bootstrap_on_begin):
+        event.listen(session.sync_session, "after_begin", _bootstrap_on_begin)
 
 
 async def set_tenant_search_path(session: AsyncSession, tenant_schema: str) -> None:
@@ -9,7 +159,4 @@ async def set_tenant_search_path(session: AsyncSession, tenant_schema: str) -> N
     """
     # Postgres nao aceita bind parameters em SET LOCAL search_path.
     # Usamos set_config com is_local=True para efeito transacional e parametro seguro.
-    await session.execute(
-        text("SELECT set_config('search_path', :path, true)"),
-        {"path": f"{tenant_schema}, tenant_admin"},
-    )
+    await bootstrap_tenant_session(session, tenant_schema)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
-from app.db.utils import set_tenant_search_path
+from app.db.session import get_read_session, get_session
+from app.db.utils import bootstrap_tenant_session, defer_tenant_bootstrap
 from app.security.jwt_tenancy import validar_jwt_e_tenant
 
 
@@ -12,10 +12,65 @@ async def get_tenant_session(
     user: dict = Depends(validar_jwt_e_tenant),
     session: AsyncSession = Depends(get_session),
 ) -> AsyncSession:
-    await set_tenant_search_path(session, user["schema_name"])
+    # No-op when validar_jwt_e_tenant already bootstrapped this transaction
+    await bootstrap_tenant_session(session, user["schema_name"])
     return session
 
 
+async def get_tenant_session_lazy(
+    user: dict = Depends(validar_jwt_e_tenant),
+    session: AsyncSession = Depends(get_session),
+) -> AsyncSession:
+    """Primary tenant session that only checks out a connection when first used.
+
+    For the write side of read-replica handlers (and cache-first reads): search_path
+    is applied as the first statement begins its transaction, so a request that
+    never touches it holds no primary connection.
+    """
+    defer_tenant_bootstrap(session, user["schema_name"])
+    return session
+
+
+async def get_tenant_read_session(
+    user: dict = Depends(validar_jwt_e_tenant),
+    session: AsyncSession = Depends(get_read_session),
+) -> AsyncSession:
+    """Tenant-scoped session on the read replica (primary when none is configured).
+
+    Only for read-only handlers. Routes that must see their own writes (e.g. right
+    after a POST in the same flow) opt out by depending on get_tenant_session.
+    """
+    await bootstrap_tenant_session(session, user["schema_name"])
+    return session
+
+
+async def get_optional_tenant_read_session(
+    request: Request,
+    primary: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+) -> AsyncSession | None:
+    """get_tenant_read_session for routes that also serve header-context callers.
+
+    None when the request carries no usable JWT (missing, invalid or unknown
+    tenant); the route then answers from the header context as before.
+    """
+    try:
+        user = await validar_jwt_e_tenant(request, primary)
+    except HTTPException:
+        return None
+    await bootstrap_tenant_session(session, user["schema_name"])
+    return session
+
+
+async def _defer_sqlsafe_bootstrap(session: AsyncSession, tenant_schema: str) -> None:
+    if session.in_transaction():
+        # Already holds a connection (e.g. a tenant-cache miss on the shared primary
+        # session): restrict it right away
+        await bootstrap_tenant_session(session, tenant_schema, sql_safe=True)
+    else:
+        defer_tenant_bootstrap(session, tenant_schema, sql_safe=True)
+
+
 async def get_tenant_session_sqlsafe(
     user: dict = Depends(validar_jwt_e_tenant),
     session: AsyncSession = Depends(get_session),
@@ -23,20 +78,19 @@ async def get_tenant_session_sqlsafe(
     """Tenant-scoped session restricted for SQL Studio.
 
     - search_path only to tenant schema (no tenant_admin)
-    - set statement_timeout to 3s for safety
+    - statement_timeout (settings.sql_studio_statement_timeout_ms) for safety
+    Both are applied in a single set_config statement, deferred to the first
+    query: requests waiting for a studio_limiter slot or served from the result
+    cache do not hold a pooled connection.
     """
-    # Restrict search_path to tenant schema only
-    await session.execute(
-        __import__("sqlalchemy", fromlist=["text"]).text(
-            "SELECT set_config('search_path', :path, true)"
-        ),
-        {"path": f"{user['schema_name']}"},
-    )
-    # Set a conservative statement_timeout (in ms)
-    await session.execute(
-        __import__("sqlalchemy", fromlist=["text"]).text(
-            "SET LOCAL statement_timeout = :ms"
-        ),
-        {"ms": 3000},
-    )
+    await _defer_sqlsafe_bootstrap(session, user["schema_name"])
+    return session
+
+
+async def get_tenant_read_session_sqlsafe(
+    user: dict = Depends(validar_jwt_e_tenant),
+    session: AsyncSession = Depends(get_read_session),
+) -> AsyncSession:
+    """SQL Studio restrictions of get_tenant_session_sqlsafe on the read replica."""
+    await _defer_sqlsafe_bootstrap(session, user["schema_name"])
     return session
@@ -4,8 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import auth, dados, health, marketing, solucoes, admin_config
 from app.core.config import settings
+from app.db.session import verify_transaction_pooling_compatibility
 from app.middleware import ResponseTimeMiddleware
 from app.security.jwt_tenancy import validar_jwt_e_tenant
+from app.services import data_store
 from app.modules.trade.router import router as trade_router
 from app.modules.data.router import router as data_router
 from app.modules.proofs.router import router as proofs_router
@@ -38,6 +40,13 @@ def get_application() -> FastAPI:
 
     app.add_middleware(ResponseTimeMiddleware)
 
+    if settings.db_pgbouncer_transaction_mode:
+        app.add_event_handler("startup", verify_transaction_pooling_compatibility)
+
+    if settings.data_store_wal_dir:
+        app.add_event_handler("startup", data_store.start_journal)
+        app.add_event_handler("shutdown", data_store.close_journal)
+
     app.include_router(health.router, tags=["Health"])  # public
     app.include_router(auth.router, prefix="/auth", tags=["Authentication"])  # public
 
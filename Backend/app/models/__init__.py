@@ -10,6 +10,7 @@ from .data import (
     CampaignResponse,
     CheckEmailRequest,
     CheckEmailResponse,
+    ColumnSchema,
     ContactCreate,
     ContactResponse,
     DashboardListResponse,
@@ -19,6 +20,7 @@ from .data import (
     EmailTemplateCreate,
     EmailTemplateResponse,
     FunnelStage,
+    IndexSchema,
     KPIItem,
     LeadCreate,
     LeadResponse,
@@ -34,9 +36,12 @@ from .data import (
     SchemasResponse,
     SegmentCreate,
     SegmentResponse,
+    SQLExportRequest,
+    SQLJobResponse,
     SQLTestRequest,
     SQLTestResponse,
     SupportTicket,
+    TableSchema,
     TokenRequest,
     TokenResponse,
     TradeVisit,
@@ -59,6 +64,7 @@ __all__ = [
     "CampaignResponse",
     "CheckEmailRequest",
     "CheckEmailResponse",
+    "ColumnSchema",
     "ContactCreate",
     "ContactResponse",
     "DashboardListResponse",
@@ -68,6 +74,7 @@ __all__ = [
     "EmailTemplateCreate",
     "EmailTemplateResponse",
     "FunnelStage",
+    "IndexSchema",
     "KPIItem",
     "LeadCreate",
     "LeadResponse",
@@ -83,9 +90,12 @@ __all__ = [
     "SchemasResponse",
     "SegmentCreate",
     "SegmentResponse",
+    "SQLExportRequest",
+    "SQLJobResponse",
     "SQLTestRequest",
     "SQLTestResponse",
     "SupportTicket",
+    "TableSchema",
     "TokenRequest",
     "TokenResponse",
     "TradeVisit",
@@ -12,15 +12,42 @@ class UserProfile(BaseModel):
     name: str
 
 
+class ColumnSchema(BaseModel):
+    nome: str
+    tipo: str
+    anulavel: bool = True
+
+
+class IndexSchema(BaseModel):
+    nome: str
+    definicao: str
+    unico: bool = False
+    primario: bool = False
+
+
+class TableSchema(BaseModel):
+    nome: str
+    tipo: str = "TABLE"
+    linhasEstimadas: int = 0
+    colunas: List[ColumnSchema] = Field(default_factory=list)
+    indices: List[IndexSchema] = Field(default_factory=list)
+
+
 class SchemasResponse(BaseModel):
     tabelasBase: List[str] = Field(default_factory=list)
     objetosCustom: List[str] = Field(default_factory=list)
+    tabelas: List[TableSchema] = Field(default_factory=list)
 
 
 class SQLTestRequest(BaseModel):
     query: str = Field(..., description="SQL query that must be validated (SELECT only).")
 
 
+class SQLExportRequest(BaseModel):
+    query: str = Field(..., description="SQL query to export (SELECT only, no row cap).")
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+
 class SQLTestResponse(BaseModel):
     isValid: bool = Field(alias="isValid")
     rowsAffected: int = 0
@@ -28,6 +55,23 @@ class SQLTestResponse(BaseModel):
     message: str | None = None
     time: str | None = None
     results: List[dict[str, Any]] = Field(default_factory=list)
+    estimatedCost: float | None = None
+    estimatedRows: float | None = None
+    # Set when the query was too expensive for interactive execution and runs as a job
+    jobId: str | None = None
+
+
+class SQLJobResponse(BaseModel):
+    jobId: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    rowCount: int = 0
+    truncated: bool = False
+    columns: List[str] = Field(default_factory=list)
+    results: List[dict[str, Any]] = Field(default_factory=list)
+    offset: int = 0
+    limit: int = 0
+    error: str | None = None
+    time: str | None = None
 
 
 class MetaObjectCreate(BaseModel):
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext, get_tenant_context
-from app.dependencies.tenancy import get_tenant_session
+from app.dependencies.tenancy import get_tenant_read_session, get_tenant_session, get_tenant_session_lazy
 from app.modules.data.schemas import ImportSalesResponse, SupplierReport
 from app.modules.data.services.comparison import SalesComparisonService
 from app.modules.data.services.importer import SalesImportService
@@ -35,12 +35,14 @@ import_service = SalesImportService()
 async def get_supplier_report(
     supplier_id: str,
     context: TenantContext = Depends(get_tenant_context),
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
+    write_session: AsyncSession = Depends(get_tenant_session_lazy),
 ) -> SupplierReport:
     return await performance_service.generate_supplier_report(
         session,
         supplier_id,
         tenant_id=context.tenant_id,
+        write_session=write_session,
     )
 
 
@@ -11,6 +11,7 @@ from fastapi import UploadFile
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.table_versions import mark_tables_written
 from app.modules.data.schemas import ImportSalesResponse, SalesImportSummary
 
 
@@ -103,6 +104,7 @@ class SalesImportService:
                 updated_at = NOW()
             """
         )
+        mark_tables_written(session, "trade_suppliers")
         await session.execute(
             stmt,
             {
@@ -156,6 +158,7 @@ class SalesImportService:
                 jbp_plan_id = COALESCE(EXCLUDED.jbp_plan_id, trade_supplier_sales.jbp_plan_id)
             """
         )
+        mark_tables_written(session, "trade_supplier_sales")
         await session.execute(
             stmt,
             {
@@ -201,6 +204,7 @@ class SalesImportService:
                 rotation_speed = EXCLUDED.rotation_speed
             """
         )
+        mark_tables_written(session, "trade_supplier_products")
         await session.execute(
             stmt,
             {
@@ -239,6 +243,7 @@ class SalesImportService:
             )
             """
         )
+        mark_tables_written(session, "trade_product_sales")
         await session.execute(
             stmt,
             {
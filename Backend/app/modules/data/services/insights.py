@@ -9,6 +9,7 @@ from uuid import uuid4
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.table_versions import mark_tables_written
 from app.modules.data.schemas import Insight
 
 
@@ -128,6 +129,7 @@ class InsightEngineService:
             )
             """
         )
+        mark_tables_written(session, "trade_supplier_insights")
         for insight in insights:
             await session.execute(
                 stmt,
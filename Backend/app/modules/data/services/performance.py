@@ -48,7 +48,16 @@ class SupplierPerformanceService:
         *,
         tenant_id: str,
         period_label: str = "current_week",
+        write_session: AsyncSession | None = None,
     ) -> SupplierReport:
+        """Build the supplier report.
+
+        ``session`` serves every read (it may be a read-replica session); generated
+        insights are persisted and committed through ``write_session`` when given.
+        Every read happens first, so a lazily bootstrapped ``write_session`` only
+        holds a primary connection for the insert and commit.
+        """
+        writer = write_session or session
         supplier = await get_supplier(session, supplier_id, tenant_id=tenant_id)
         if not supplier:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fornecedor nao encontrado.")
@@ -71,13 +80,12 @@ class SupplierPerformanceService:
             "market_share": summary.market_share,
             "growth_percentage": summary.growth_percentage,
         }
+        comparison = await self.comparison_service.get_supplier_vs_market(session, supplier.id, tenant_id=tenant_id)
         insights_raw = await self.insight_engine.generate_supplier_insights(
-            session, supplier.id, tenant_id=tenant_id, context=insight_context
+            writer, supplier.id, tenant_id=tenant_id, context=insight_context
         )
         ranked_insights = self.prioritization_service.rank_insights(insights_raw)
-
-        comparison = await self.comparison_service.get_supplier_vs_market(session, supplier.id, tenant_id=tenant_id)
-        await session.commit()
+        await writer.commit()
 
         return SupplierReport(
             supplier=supplier,
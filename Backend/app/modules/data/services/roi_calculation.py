@@ -8,6 +8,7 @@ from typing import Any, Mapping
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.table_versions import mark_tables_written
 from app.modules.data.schemas import ROIComputation
 
 
@@ -244,6 +245,7 @@ class ROICalculationService:
             )
             """
         )
+        mark_tables_written(session, "trade_roi_calculations")
         await session.execute(
             stmt,
             {
@@ -15,6 +15,8 @@ from PyPDF2 import PdfReader
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.table_versions import mark_tables_written
+
 from .config import IMAGE_CONFIG, STORAGE_CONFIG, VALIDATION_CONFIG
 
 
@@ -57,6 +59,7 @@ async def create_proof_record(
         RETURNING *
         """
     )
+    mark_tables_written(session, "asset_proofs")
     result = await session.execute(
         stmt,
         {
@@ -93,6 +96,7 @@ async def create_validation_record(
         )
         """
     )
+    mark_tables_written(session, "proof_validations")
     await session.execute(
         stmt,
         {
@@ -113,6 +117,7 @@ async def update_proof_status(session: AsyncSession, *, proof_id: str, status: s
         WHERE id = :proof_id
         """
     )
+    mark_tables_written(session, "asset_proofs")
     await session.execute(stmt, {"status": status, "proof_id": proof_id})
 
 
@@ -270,6 +275,7 @@ async def _persist_metadata(
         WHERE id = :proof_id
         """
     )
+    mark_tables_written(session, "asset_proofs")
     await session.execute(
         stmt,
         {
@@ -290,6 +296,7 @@ async def _persist_metadata(
         """
     )
     dims = metadata.get("dimensions", {}).get("original", {})
+    mark_tables_written(session, "proof_metadata")
     await session.execute(
         stmt_meta,
         {
@@ -353,4 +360,5 @@ async def _update_processing_status(session: AsyncSession, proof_id: str, status
         WHERE id = :proof_id
         """
     )
+    mark_tables_written(session, "asset_proofs")
     await session.execute(stmt, {"status": status, "proof_id": proof_id})
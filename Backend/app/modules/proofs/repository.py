@@ -4,13 +4,206 @@ from __future__ import annotations
 import json
 from typing import Any, Iterable
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.statements import statements
 from app.modules.proofs import schemas
 from app.modules.proofs.catalog import DEFAULT_ASSETS_CATALOG
 
 
+_CREATE_CONTRACT = statements.register(
+    "proofs.create_contract",
+    """
+    INSERT INTO {schema}.trade_jbp_contracts (
+        id, tenant_id, supplier_id, title, status, total_investment,
+        start_date, end_date, proof_status, completion_percentage
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :supplier_id, :title, :status, :total_investment,
+        :start_date, :end_date, 'pending', 0
+    )
+    RETURNING *
+    """,
+)
+
+_CREATE_CONTRACT_ASSET = statements.register(
+    "proofs.create_contract_asset",
+    """
+    INSERT INTO {schema}.trade_jbp_contract_assets (
+        id, tenant_id, contract_id, asset_catalog_id, asset_name,
+        placement, duration_days, cost, scheduled_start, scheduled_end,
+        status, proofs_required, metrics
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :contract_id, :asset_catalog_id, :asset_name,
+        :placement, :duration_days, :cost, :scheduled_start, :scheduled_end,
+        'scheduled', :proofs_required::jsonb, :metrics::jsonb
+    )
+    """,
+)
+
+_LIST_CONTRACTS = statements.register(
+    "proofs.list_contracts",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_contracts
+    WHERE tenant_id = :tenant_id
+    ORDER BY created_at DESC
+    """,
+)
+
+_LIST_CONTRACTS_BY_SUPPLIER = statements.register(
+    "proofs.list_contracts_by_supplier",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_contracts
+    WHERE tenant_id = :tenant_id AND supplier_id = :supplier_id
+    ORDER BY created_at DESC
+    """,
+)
+
+_GET_CONTRACT = statements.register(
+    "proofs.get_contract",
+    """
+    SELECT c.*, s.name AS supplier_name
+    FROM {schema}.trade_jbp_contracts c
+    LEFT JOIN {schema}.trade_suppliers s
+      ON s.id = c.supplier_id AND s.tenant_id = c.tenant_id
+    WHERE c.id = :contract_id AND c.tenant_id = :tenant_id
+    """,
+)
+
+_LIST_CONTRACT_ASSETS = statements.register(
+    "proofs.list_contract_assets",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_contract_assets
+    WHERE contract_id = :contract_id AND tenant_id = :tenant_id
+    ORDER BY scheduled_start
+    """,
+)
+
+_GET_ASSET = statements.register(
+    "proofs.get_asset",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_contract_assets
+    WHERE id = :asset_id AND tenant_id = :tenant_id
+    """,
+)
+
+_LIST_ASSET_PROOFS = statements.register(
+    "proofs.list_asset_proofs",
+    """
+    SELECT *
+    FROM {schema}.trade_asset_proofs
+    WHERE contract_asset_id = :asset_id AND tenant_id = :tenant_id
+    ORDER BY uploaded_at DESC
+    """,
+)
+
+_ADD_ASSET_PROOF = statements.register(
+    "proofs.add_asset_proof",
+    """
+    INSERT INTO {schema}.trade_asset_proofs (
+        id, tenant_id, contract_asset_id, proof_type, url, description, uploaded_by
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :asset_id, :proof_type, :url, :description, :uploaded_by
+    )
+    RETURNING *
+    """,
+)
+
+_COUNT_ASSET_PROOFS = statements.register(
+    "proofs.count_asset_proofs",
+    """
+    SELECT COUNT(*) AS total
+    FROM {schema}.trade_asset_proofs
+    WHERE contract_asset_id = :asset_id AND tenant_id = :tenant_id
+    """,
+)
+
+_UPDATE_ASSET_STATUS = statements.register(
+    "proofs.update_asset_status",
+    """
+    UPDATE {schema}.trade_jbp_contract_assets
+    SET status = :status
+    WHERE id = :asset_id AND tenant_id = :tenant_id
+    """,
+)
+
+_RECORD_AUTOMATED_PROOF = statements.register(
+    "proofs.record_automated_proof",
+    """
+    INSERT INTO {schema}.trade_asset_automated_proofs (
+        id, tenant_id, contract_asset_id, source, metric, target_value,
+        value, capture_schedule, metadata
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :asset_id, :source, :metric, :target_value,
+        :value, :capture_schedule, :metadata::jsonb
+    )
+    """,
+)
+
+_SCHEDULE_NOTIFICATION = statements.register(
+    "proofs.schedule_notification",
+    """
+    INSERT INTO {schema}.trade_proof_notifications (
+        id, tenant_id, contract_asset_id, message, send_at, channel
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :asset_id, :message, :send_at, :channel
+    )
+    """,
+)
+
+_GET_ASSETS_FOR_CONTRACT = statements.register(
+    "proofs.get_assets_for_contract",
+    """
+    SELECT id, asset_name, scheduled_start, scheduled_end
+    FROM {schema}.trade_jbp_contract_assets
+    WHERE contract_id = :contract_id AND tenant_id = :tenant_id
+    """,
+)
+
+_GET_OVERDUE_ASSETS = statements.register(
+    "proofs.get_overdue_assets",
+    """
+    SELECT a.id, a.asset_name, a.scheduled_end,
+           EXTRACT(DAY FROM (NOW() - a.scheduled_end))::INT AS days_overdue
+    FROM {schema}.trade_jbp_contract_assets a
+    LEFT JOIN {schema}.trade_asset_proofs p ON p.contract_asset_id = a.id
+    JOIN {schema}.trade_jbp_contracts c ON c.id = a.contract_id
+    WHERE a.tenant_id = :tenant_id
+      AND (:supplier_id IS NULL OR c.supplier_id = :supplier_id)
+      AND a.scheduled_end < NOW()
+    GROUP BY a.id
+    HAVING COUNT(p.id) = 0
+    """,
+)
+
+_LIST_PROOF_HISTORY = statements.register(
+    "proofs.list_proof_history",
+    """
+    SELECT c.id AS contract_id,
+           a.asset_name,
+           p.proof_type,
+           p.url,
+           p.uploaded_at,
+           CASE WHEN p.verified THEN 'approved' ELSE 'submitted' END AS status
+    FROM {schema}.trade_asset_proofs p
+    JOIN {schema}.trade_jbp_contract_assets a ON a.id = p.contract_asset_id
+    JOIN {schema}.trade_jbp_contracts c ON c.id = a.contract_id
+    WHERE p.tenant_id = :tenant_id
+      AND (:supplier_id IS NULL OR c.supplier_id = :supplier_id)
+    ORDER BY p.uploaded_at DESC
+    LIMIT 200
+    """,
+)
+
+
 def _dump(obj: Any) -> str:
     return json.dumps(obj or {})
 
@@ -21,19 +214,7 @@ async def create_contract(
     *,
     tenant_id: str,
 ) -> schemas.JBPContract:
-    stmt = text(
-        """
-        INSERT INTO trade_jbp_contracts (
-            id, tenant_id, supplier_id, title, status, total_investment,
-            start_date, end_date, proof_status, completion_percentage
-        )
-        VALUES (
-            gen_random_uuid(), :tenant_id, :supplier_id, :title, :status, :total_investment,
-            :start_date, :end_date, 'pending', 0
-        )
-        RETURNING *
-        """
-    )
+    stmt = statements.for_session(_CREATE_CONTRACT, session)
     result = await session.execute(
         stmt,
         {
@@ -56,20 +237,7 @@ async def create_contract(
         proofs_required = [req.__dict__ for req in catalog_entry.proof_requirements] if catalog_entry else []
         metrics = {"expected_metrics": catalog_entry.expected_metrics} if catalog_entry else {}
         await session.execute(
-            text(
-                """
-                INSERT INTO trade_jbp_contract_assets (
-                    id, tenant_id, contract_id, asset_catalog_id, asset_name,
-                    placement, duration_days, cost, scheduled_start, scheduled_end,
-                    status, proofs_required, metrics
-                )
-                VALUES (
-                    gen_random_uuid(), :tenant_id, :contract_id, :asset_catalog_id, :asset_name,
-                    :placement, :duration_days, :cost, :scheduled_start, :scheduled_end,
-                    'scheduled', :proofs_required::jsonb, :metrics::jsonb
-                )
-                """
-            ),
+            statements.for_session(_CREATE_CONTRACT_ASSET, session),
             {
                 "tenant_id": tenant_id,
                 "contract_id": contract_id,
@@ -106,19 +274,13 @@ async def list_contracts(
     tenant_id: str,
     supplier_id: str | None = None,
 ) -> list[schemas.JBPContract]:
-    where = ["tenant_id = :tenant_id"]
     params: dict[str, Any] = {"tenant_id": tenant_id}
+    # One fixed statement per filter combination keeps the prepared-statement cache effective
     if supplier_id:
-        where.append("supplier_id = :supplier_id")
         params["supplier_id"] = supplier_id
-    stmt = text(
-        f"""
-        SELECT *
-        FROM trade_jbp_contracts
-        WHERE {' AND '.join(where)}
-        ORDER BY created_at DESC
-        """
-    )
+        stmt = statements.for_session(_LIST_CONTRACTS_BY_SUPPLIER, session)
+    else:
+        stmt = statements.for_session(_LIST_CONTRACTS, session)
     rows = (await session.execute(stmt, params)).mappings().all()
     return [
         schemas.JBPContract(
@@ -144,15 +306,7 @@ async def get_contract(
     *,
     tenant_id: str,
 ) -> schemas.JBPContract | None:
-    stmt = text(
-        """
-        SELECT c.*, s.name AS supplier_name
-        FROM trade_jbp_contracts c
-        LEFT JOIN trade_suppliers s
-          ON s.id = c.supplier_id AND s.tenant_id = c.tenant_id
-        WHERE c.id = :contract_id AND c.tenant_id = :tenant_id
-        """
-    )
+    stmt = statements.for_session(_GET_CONTRACT, session)
     row = (await session.execute(stmt, {"contract_id": contract_id, "tenant_id": tenant_id})).mappings().first()
     if not row:
         return None
@@ -179,14 +333,7 @@ async def list_contract_assets(
     *,
     tenant_id: str,
 ) -> list[schemas.JBPAsset]:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_jbp_contract_assets
-        WHERE contract_id = :contract_id AND tenant_id = :tenant_id
-        ORDER BY scheduled_start
-        """
-    )
+    stmt = statements.for_session(_LIST_CONTRACT_ASSETS, session)
     rows = (await session.execute(stmt, {"contract_id": contract_id, "tenant_id": tenant_id})).mappings().all()
     assets: list[schemas.JBPAsset] = []
     for row in rows:
@@ -218,13 +365,7 @@ async def get_asset(
     *,
     tenant_id: str,
 ) -> schemas.JBPAsset | None:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_jbp_contract_assets
-        WHERE id = :asset_id AND tenant_id = :tenant_id
-        """
-    )
+    stmt = statements.for_session(_GET_ASSET, session)
     row = (await session.execute(stmt, {"asset_id": asset_id, "tenant_id": tenant_id})).mappings().first()
     if not row:
         return None
@@ -253,14 +394,7 @@ async def list_asset_proofs(
     *,
     tenant_id: str,
 ) -> list[schemas.AssetProof]:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_asset_proofs
-        WHERE contract_asset_id = :asset_id AND tenant_id = :tenant_id
-        ORDER BY uploaded_at DESC
-        """
-    )
+    stmt = statements.for_session(_LIST_ASSET_PROOFS, session)
     rows = (await session.execute(stmt, {"asset_id": asset_id, "tenant_id": tenant_id})).mappings().all()
     return [
         schemas.AssetProof(
@@ -286,17 +420,7 @@ async def add_asset_proof(
     tenant_id: str,
     user_id: str,
 ) -> schemas.AssetProof:
-    stmt = text(
-        """
-        INSERT INTO trade_asset_proofs (
-            id, tenant_id, contract_asset_id, proof_type, url, description, uploaded_by
-        )
-        VALUES (
-            gen_random_uuid(), :tenant_id, :asset_id, :proof_type, :url, :description, :uploaded_by
-        )
-        RETURNING *
-        """
-    )
+    stmt = statements.for_session(_ADD_ASSET_PROOF, session)
     row = (
         await session.execute(
             stmt,
@@ -325,25 +449,13 @@ async def add_asset_proof(
 
 
 async def _update_asset_status(session: AsyncSession, asset_id: str, *, tenant_id: str) -> None:
-    proof_count_stmt = text(
-        """
-        SELECT COUNT(*) AS total
-        FROM trade_asset_proofs
-        WHERE contract_asset_id = :asset_id AND tenant_id = :tenant_id
-        """
-    )
+    proof_count_stmt = statements.for_session(_COUNT_ASSET_PROOFS, session)
     count = (
         await session.execute(proof_count_stmt, {"asset_id": asset_id, "tenant_id": tenant_id})
     ).mappings().one()["total"]
     status = "verified" if count else "executed"
     await session.execute(
-        text(
-            """
-            UPDATE trade_jbp_contract_assets
-            SET status = :status
-            WHERE id = :asset_id AND tenant_id = :tenant_id
-            """
-        ),
+        statements.for_session(_UPDATE_ASSET_STATUS, session),
         {"status": status, "asset_id": asset_id, "tenant_id": tenant_id},
     )
 
@@ -361,18 +473,7 @@ async def record_automated_proof(
     metadata: dict[str, Any] | None = None,
 ) -> None:
     await session.execute(
-        text(
-            """
-            INSERT INTO trade_asset_automated_proofs (
-                id, tenant_id, contract_asset_id, source, metric, target_value,
-                value, capture_schedule, metadata
-            )
-            VALUES (
-                gen_random_uuid(), :tenant_id, :asset_id, :source, :metric, :target_value,
-                :value, :capture_schedule, :metadata::jsonb
-            )
-            """
-        ),
+        statements.for_session(_RECORD_AUTOMATED_PROOF, session),
         {
             "tenant_id": tenant_id,
             "asset_id": asset_id,
@@ -396,16 +497,7 @@ async def schedule_notification(
     channel: str = "email",
 ) -> None:
     await session.execute(
-        text(
-            """
-            INSERT INTO trade_proof_notifications (
-                id, tenant_id, contract_asset_id, message, send_at, channel
-            )
-            VALUES (
-                gen_random_uuid(), :tenant_id, :asset_id, :message, :send_at, :channel
-            )
-            """
-        ),
+        statements.for_session(_SCHEDULE_NOTIFICATION, session),
         {"tenant_id": tenant_id, "asset_id": asset_id, "message": message, "send_at": send_at, "channel": channel},
     )
 
@@ -416,13 +508,7 @@ async def get_assets_for_contract(
     *,
     tenant_id: str,
 ) -> Iterable[dict[str, Any]]:
-    stmt = text(
-        """
-        SELECT id, asset_name, scheduled_start, scheduled_end
-        FROM trade_jbp_contract_assets
-        WHERE contract_id = :contract_id AND tenant_id = :tenant_id
-        """
-    )
+    stmt = statements.for_session(_GET_ASSETS_FOR_CONTRACT, session)
     return (await session.execute(stmt, {"contract_id": contract_id, "tenant_id": tenant_id})).mappings().all()
 
 
@@ -432,20 +518,7 @@ async def get_overdue_assets(
     tenant_id: str,
     supplier_id: str | None = None,
 ) -> list[dict[str, Any]]:
-    stmt = text(
-        """
-        SELECT a.id, a.asset_name, a.scheduled_end,
-               EXTRACT(DAY FROM (NOW() - a.scheduled_end))::INT AS days_overdue
-        FROM trade_jbp_contract_assets a
-        LEFT JOIN trade_asset_proofs p ON p.contract_asset_id = a.id
-        JOIN trade_jbp_contracts c ON c.id = a.contract_id
-        WHERE a.tenant_id = :tenant_id
-          AND (:supplier_id IS NULL OR c.supplier_id = :supplier_id)
-          AND a.scheduled_end < NOW()
-        GROUP BY a.id
-        HAVING COUNT(p.id) = 0
-        """
-    )
+    stmt = statements.for_session(_GET_OVERDUE_ASSETS, session)
     rows = (
         await session.execute(stmt, {"tenant_id": tenant_id, "supplier_id": supplier_id})
     ).mappings().all()
@@ -458,23 +531,7 @@ async def list_proof_history(
     tenant_id: str,
     supplier_id: str | None = None,
 ) -> list[schemas.ProofHistoryEntry]:
-    stmt = text(
-        """
-        SELECT c.id AS contract_id,
-               a.asset_name,
-               p.proof_type,
-               p.url,
-               p.uploaded_at,
-               CASE WHEN p.verified THEN 'approved' ELSE 'submitted' END AS status
-        FROM trade_asset_proofs p
-        JOIN trade_jbp_contract_assets a ON a.id = p.contract_asset_id
-        JOIN trade_jbp_contracts c ON c.id = a.contract_id
-        WHERE p.tenant_id = :tenant_id
-          AND (:supplier_id IS NULL OR c.supplier_id = :supplier_id)
-        ORDER BY p.uploaded_at DESC
-        LIMIT 200
-        """
-    )
+    stmt = statements.for_session(_LIST_PROOF_HISTORY, session)
     rows = (
         await session.execute(stmt, {"tenant_id": tenant_id, "supplier_id": supplier_id})
     ).mappings().all()
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext, get_tenant_context
-from app.dependencies.tenancy import get_tenant_session
+from app.dependencies.tenancy import get_tenant_read_session, get_tenant_session, get_tenant_session_lazy
 from app.modules.proofs import catalog, repository, schemas
 from app.modules.proofs.services import (
     AutomatedProofService,
@@ -173,7 +173,7 @@ async def setup_automated(
 @router.get("/proofs/history", response_model=schemas.ProofHistoryResponse)
 async def list_proof_history(
     supplier_id: str | None = None,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
     context: TenantContext = Depends(get_tenant_context),
 ) -> schemas.ProofHistoryResponse:
     entries = await repository.list_proof_history(
@@ -187,16 +187,19 @@ async def list_proof_history(
 @router.get("/suppliers/{supplier_id}/portal", response_model=schemas.SupplierPortalResponse)
 async def get_supplier_portal(
     supplier_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
+    write_session: AsyncSession = Depends(get_tenant_session_lazy),
     context: TenantContext = Depends(get_tenant_context),
 ) -> schemas.SupplierPortalResponse:
-    return await portal_service.build_portal_view(session, supplier_id, tenant_id=context.tenant_id)
+    return await portal_service.build_portal_view(
+        session, supplier_id, tenant_id=context.tenant_id, write_session=write_session
+    )
 
 
 @router.get("/suppliers/{supplier_id}/alerts", response_model=list[schemas.SupplierAlert])
 async def get_supplier_alerts(
     supplier_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
     context: TenantContext = Depends(get_tenant_context),
 ) -> list[schemas.SupplierAlert]:
     return await alert_service.generate_alerts(session, supplier_id, tenant_id=context.tenant_id)
@@ -205,10 +208,13 @@ async def get_supplier_alerts(
 @router.post("/suppliers/{supplier_id}/reports/weekly", response_model=schemas.WeeklyEmailReport)
 async def build_weekly_email(
     supplier_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
+    write_session: AsyncSession = Depends(get_tenant_session_lazy),
     context: TenantContext = Depends(get_tenant_context),
 ) -> schemas.WeeklyEmailReport:
-    portal = await portal_service.build_portal_view(session, supplier_id, tenant_id=context.tenant_id)
+    portal = await portal_service.build_portal_view(
+        session, supplier_id, tenant_id=context.tenant_id, write_session=write_session
+    )
     supplier = await get_supplier(session, supplier_id, tenant_id=context.tenant_id)
     supplier_name = supplier.name if supplier else "Fornecedor"
     return portal_service.build_weekly_email(portal, supplier_name)
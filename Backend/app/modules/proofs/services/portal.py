@@ -29,11 +29,13 @@ class SupplierPortalService:
         supplier_id: str,
         *,
         tenant_id: str,
+        write_session: AsyncSession | None = None,
     ) -> schemas.SupplierPortalResponse:
         report = await self.performance_service.generate_supplier_report(
             session,
             supplier_id,
             tenant_id=tenant_id,
+            write_session=write_session,
         )
 
         contracts = await repository.list_contracts(session, tenant_id=tenant_id, supplier_id=supplier_id)
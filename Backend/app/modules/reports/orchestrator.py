@@ -9,6 +9,8 @@ from typing import Any
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.table_versions import mark_tables_written
+
 from .config import REPORT_TYPES
 from .pdf_generator import generate_pdf
 
@@ -116,6 +118,7 @@ class ReportOrchestratorService:
             RETURNING id
             """
         )
+        mark_tables_written(session, "supplier_reports")
         result = await session.execute(
             stmt,
             {
@@ -157,4 +160,5 @@ class ReportOrchestratorService:
             WHERE id = :report_id
             """
         )
+        mark_tables_written(session, "supplier_reports")
         await session.execute(stmt, {"report_id": report_id})
@@ -8,7 +8,7 @@ from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext, get_tenant_context
-from app.dependencies.tenancy import get_tenant_session
+from app.dependencies.tenancy import get_tenant_session, get_tenant_session_lazy
 from app.middleware import report_cache
 from .orchestrator import ReportOrchestratorService
 
@@ -36,9 +36,11 @@ async def generate_report(
 @router.get("/{report_id}")
 async def report_detail(
     report_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_session_lazy),
     context: TenantContext = Depends(get_tenant_context),
 ):
+    # Stays on the primary (clients poll right after /generate), but lazily: a
+    # report cache hit does not check out a connection
     cache_key = f"report:{report_id}:{context.tenant_id}"
     cached = report_cache.get(cache_key)
     if cached:
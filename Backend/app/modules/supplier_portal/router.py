@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext, get_tenant_context
-from app.dependencies.tenancy import get_tenant_session
+from app.dependencies.tenancy import get_tenant_read_session, get_tenant_session_lazy
 from app.modules.supplier_portal import SupplierPortalFacade
 
 router = APIRouter()
@@ -17,16 +17,22 @@ facade = SupplierPortalFacade()
 @router.get("/dashboard")
 async def supplier_dashboard(
     supplier_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
+    write_session: AsyncSession = Depends(get_tenant_session_lazy),
     context: TenantContext = Depends(get_tenant_context),
 ):
-    return await facade.get_dashboard(session, supplier_id, tenant_id=context.tenant_id)
+    return await facade.get_dashboard(
+        session, supplier_id, tenant_id=context.tenant_id, write_session=write_session
+    )
 
 
 @router.post("/reports/weekly")
 async def supplier_weekly_report(
     supplier_id: str,
-    session: AsyncSession = Depends(get_tenant_session),
+    session: AsyncSession = Depends(get_tenant_read_session),
+    write_session: AsyncSession = Depends(get_tenant_session_lazy),
     context: TenantContext = Depends(get_tenant_context),
 ):
-    return await facade.generate_weekly_report(session, supplier_id, tenant_id=context.tenant_id)
+    return await facade.generate_weekly_report(
+        session, supplier_id, tenant_id=context.tenant_id, write_session=write_session
+    )
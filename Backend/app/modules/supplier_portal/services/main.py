@@ -24,8 +24,11 @@ class SupplierPortalFacade:
         supplier_id: str,
         *,
         tenant_id: str,
+        write_session: AsyncSession | None = None,
     ) -> supplier_portal_schemas.SupplierDashboard:
-        portal = await self.proof_portal.build_portal_view(session, supplier_id, tenant_id=tenant_id)
+        portal = await self.proof_portal.build_portal_view(
+            session, supplier_id, tenant_id=tenant_id, write_session=write_session
+        )
         alerts = await self.alert_service.generate_alerts(session, supplier_id, tenant_id=tenant_id)
         return supplier_portal_schemas.SupplierDashboard(
             executive_summary={
@@ -77,7 +80,10 @@ class SupplierPortalFacade:
         supplier_id: str,
         *,
         tenant_id: str,
+        write_session: AsyncSession | None = None,
     ) -> proof_schemas.WeeklyEmailReport:
-        portal = await self.proof_portal.build_portal_view(session, supplier_id, tenant_id=tenant_id)
+        portal = await self.proof_portal.build_portal_view(
+            session, supplier_id, tenant_id=tenant_id, write_session=write_session
+        )
         supplier_name = "Fornecedor"
         return self.proof_portal.build_weekly_email(portal, supplier_name)
@@ -4,12 +4,62 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.statements import statements
 from app.modules.trade import schemas
 
 
+_GET_SUPPLIER = statements.register(
+    "trade.get_supplier",
+    """
+    SELECT *
+    FROM {schema}.trade_suppliers
+    WHERE id = :supplier_id AND tenant_id = :tenant_id
+    """,
+)
+
+_CREATE_JBP_PLAN = statements.register(
+    "trade.create_jbp_plan",
+    """
+    INSERT INTO {schema}.trade_jbp_plans (
+        id, tenant_id, supplier_id, title, description,
+        start_date, end_date, investment_value, investment_type,
+        expected_roi, counter_parties, exclusive_benefits, status,
+        sales_target, growth_target
+    )
+    VALUES (
+        gen_random_uuid(), :tenant_id, :supplier_id, :title, :description,
+        :start_date, :end_date, :investment_value, :investment_type,
+        :expected_roi, :counter_parties::jsonb, :exclusive_benefits::jsonb, :status,
+        :sales_target, :growth_target
+    )
+    RETURNING *
+    """,
+)
+
+_GET_JBP_PLAN = statements.register(
+    "trade.get_jbp_plan",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_plans
+    WHERE id = :jbp_id AND tenant_id = :tenant_id
+    """,
+)
+
+_LIST_ACTIVE_JBPS = statements.register(
+    "trade.list_active_jbps",
+    """
+    SELECT *
+    FROM {schema}.trade_jbp_plans
+    WHERE tenant_id = :tenant_id
+      AND status IN ('approved', 'active')
+    ORDER BY start_date DESC
+    LIMIT :limit
+    """,
+)
+
+
 def _json_dump(value: list[str] | None) -> str:
     return json.dumps(value or [])
 
@@ -27,13 +77,7 @@ def _row_to_supplier(row: Any) -> schemas.Supplier:
 
 
 async def get_supplier(session: AsyncSession, supplier_id: str, *, tenant_id: str) -> schemas.Supplier | None:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_suppliers
-        WHERE id = :supplier_id AND tenant_id = :tenant_id
-        """
-    )
+    stmt = statements.for_session(_GET_SUPPLIER, session)
     result = await session.execute(stmt, {"supplier_id": supplier_id, "tenant_id": tenant_id})
     row = result.mappings().first()
     if not row:
@@ -47,23 +91,7 @@ async def create_jbp_plan(
     *,
     tenant_id: str,
 ) -> schemas.JBPPlan:
-    stmt = text(
-        """
-        INSERT INTO trade_jbp_plans (
-            id, tenant_id, supplier_id, title, description,
-            start_date, end_date, investment_value, investment_type,
-            expected_roi, counter_parties, exclusive_benefits, status,
-            sales_target, growth_target
-        )
-        VALUES (
-            gen_random_uuid(), :tenant_id, :supplier_id, :title, :description,
-            :start_date, :end_date, :investment_value, :investment_type,
-            :expected_roi, :counter_parties::jsonb, :exclusive_benefits::jsonb, :status,
-            :sales_target, :growth_target
-        )
-        RETURNING *
-        """
-    )
+    stmt = statements.for_session(_CREATE_JBP_PLAN, session)
     params = {
         "tenant_id": tenant_id,
         "supplier_id": payload.supplier_id,
@@ -86,13 +114,7 @@ async def create_jbp_plan(
 
 
 async def get_jbp_plan(session: AsyncSession, jbp_id: str, *, tenant_id: str) -> schemas.JBPPlan | None:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_jbp_plans
-        WHERE id = :jbp_id AND tenant_id = :tenant_id
-        """
-    )
+    stmt = statements.for_session(_GET_JBP_PLAN, session)
     result = await session.execute(stmt, {"jbp_id": jbp_id, "tenant_id": tenant_id})
     row = result.mappings().first()
     if not row:
@@ -106,15 +128,6 @@ async def list_active_jbps(
     tenant_id: str,
     limit: int = 50,
 ) -> list[schemas.JBPPlan]:
-    stmt = text(
-        """
-        SELECT *
-        FROM trade_jbp_plans
-        WHERE tenant_id = :tenant_id
-          AND status IN ('approved', 'active')
-        ORDER BY start_date DESC
-        LIMIT :limit
-        """
-    )
+    stmt = statements.for_session(_LIST_ACTIVE_JBPS, session)
     result = await session.execute(stmt, {"tenant_id": tenant_id, "limit": limit})
     return [_row_to_plan(row) for row in result.mappings().all()]
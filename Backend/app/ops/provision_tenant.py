@@ -9,6 +9,11 @@ Usage (PowerShell):
 Notes:
 - Assumes you already ran the SQL in docs/sql: 01_enable_extensions.sql, 02_create_schemas.sql, 03_tenant_admin_tables.sql, 04_template_schema_tables.sql, 05_clone_from_template.sql
 - Password should be a precomputed hash; integrate with your auth later.
+- Running API workers need no signal: unknown tenant ids are never cached, so a
+  new tenant resolves on its first request, and the schema browser revalidates
+  its catalog signature every SCHEMA_CATALOG_REVALIDATE_SECONDS. Changing the
+  schema_name of an existing tenant only takes effect after
+  TENANT_SCHEMA_CACHE_TTL_SECONDS (or a worker restart).
 """
 from __future__ import annotations
 
@@ -19,6 +24,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from app.core.config import settings
+from app.security.jwt_tenancy import hash_password_async
 
 
 async def clone_schema(session: AsyncSession, schema_name: str) -> None:
@@ -62,7 +68,16 @@ async def create_admin_user(
     return str(user_id)
 
 
-async def main(company: str, schema: str, admin_email: Optional[str], password_hash: Optional[str]) -> None:
+async def main(
+    company: str,
+    schema: str,
+    admin_email: Optional[str],
+    password_hash: Optional[str],
+    password_plain: Optional[str] = None,
+) -> None:
+    if not password_hash and password_plain:
+        # bcrypt runs on the shared hashing pool, off the event loop
+        password_hash = await hash_password_async(password_plain)
     engine = create_async_engine(settings.database_url, echo=False)
     async with engine.begin() as conn:
         session = AsyncSession(bind=conn)
@@ -97,11 +112,5 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     import asyncio
-    from passlib.context import CryptContext
 
-    password_hash = args.password
-    if not password_hash and args.password_plain:
-        ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        password_hash = ctx.hash(args.password_plain)
-
-    asyncio.run(main(args.company, args.schema, args.admin_email, password_hash))
+    asyncio.run(main(args.company, args.schema, args.admin_email, args.password, args.password_plain))
@@ -2,12 +2,33 @@ from __future__ import annotations
 
 from typing import Any
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.statements import statements
 from app.models import ContactCreate, ContactResponse
 
 
+_LIST_CONTACTS = statements.register(
+    "contacts.list_contacts",
+    """
+    SELECT c.id, c.nome, c.email, c.telefone, a.nome AS conta_nome
+    FROM {schema}.tb_contato c
+    LEFT JOIN {schema}.tb_conta a ON a.id = c.conta_id
+    ORDER BY c.updated_at DESC NULLS LAST, c.created_at DESC
+    LIMIT 200
+    """,
+)
+
+_CREATE_CONTACT = statements.register(
+    "contacts.create_contact",
+    """
+    INSERT INTO {schema}.tb_contato (nome, email, telefone, cargo, origem, status_lead)
+    VALUES (:nome, :email, :telefone, :cargo, :origem, :status)
+    RETURNING id, nome, email, telefone
+    """,
+)
+
+
 def _row_to_response(row: dict[str, Any]) -> ContactResponse:
     return ContactResponse(
         id=str(row["id"]),
@@ -19,27 +40,13 @@ def _row_to_response(row: dict[str, Any]) -> ContactResponse:
 
 
 async def list_contacts(session: AsyncSession) -> list[ContactResponse]:
-    q = text(
-        """
-        SELECT c.id, c.nome, c.email, c.telefone, a.nome AS conta_nome
-        FROM tb_contato c
-        LEFT JOIN tb_conta a ON a.id = c.conta_id
-        ORDER BY c.updated_at DESC NULLS LAST, c.created_at DESC
-        LIMIT 200
-        """
-    )
+    q = statements.for_session(_LIST_CONTACTS, session)
     res = await session.execute(q)
     return [_row_to_response(dict(r)) for r in res.mappings().all()]
 
 
 async def create_contact(session: AsyncSession, payload: ContactCreate) -> ContactResponse:
-    q = text(
-        """
-        INSERT INTO tb_contato (nome, email, telefone, cargo, origem, status_lead)
-        VALUES (:nome, :email, :telefone, :cargo, :origem, :status)
-        RETURNING id, nome, email, telefone
-        """
-    )
+    q = statements.for_session(_CREATE_CONTACT, session)
     params = {
         "nome": payload.nome,
         "email": payload.email,
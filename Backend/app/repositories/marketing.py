@@ -4,10 +4,10 @@ from datetime import date
 from typing import List
 from uuid import uuid4
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import TenantContext
+from app.db.statements import statements
 from app.models import (
     CampaignCreate,
     CampaignResponse,
@@ -16,6 +16,45 @@ from app.models import (
 )
 
 
+_LIST_CAMPAIGNS = statements.register(
+    "marketing.list_campaigns",
+    """
+    SELECT id, nome, status, investimento, inicio, fim
+    FROM {schema}.marketing_campaigns
+    ORDER BY created_at DESC
+    LIMIT 200
+    """,
+)
+
+_CREATE_CAMPAIGN = statements.register(
+    "marketing.create_campaign",
+    """
+    INSERT INTO {schema}.marketing_campaigns (nome, status, investimento, inicio, fim, owner_user_id)
+    VALUES (:nome, :status, :invest, :inicio, :fim, :owner)
+    RETURNING id, nome, status, investimento, inicio, fim
+    """,
+)
+
+_LIST_SEGMENTS = statements.register(
+    "marketing.list_segments",
+    """
+    SELECT id, nome, regra, tamanho
+    FROM {schema}.marketing_segments
+    ORDER BY created_at DESC
+    LIMIT 200
+    """,
+)
+
+_CREATE_SEGMENT = statements.register(
+    "marketing.create_segment",
+    """
+    INSERT INTO {schema}.marketing_segments (nome, regra, tamanho)
+    VALUES (:nome, :regra, :tamanho)
+    RETURNING id, nome, regra, tamanho
+    """,
+)
+
+
 class MarketingRepository:
     def __init__(self, session: AsyncSession, context: TenantContext) -> None:
         self.session = session
@@ -23,14 +62,7 @@ class MarketingRepository:
 
     # Campaigns -------------------------------------------------------
     async def list_campaigns(self) -> List[CampaignResponse]:
-        q = text(
-            """
-            SELECT id, nome, status, investimento, inicio, fim
-            FROM marketing_campaigns
-            ORDER BY created_at DESC
-            LIMIT 200
-            """
-        )
+        q = statements.for_session(_LIST_CAMPAIGNS, self.session)
         res = await self.session.execute(q)
         rows = res.mappings().all()
         return [
@@ -46,13 +78,7 @@ class MarketingRepository:
         ]
 
     async def create_campaign(self, payload: CampaignCreate) -> CampaignResponse:
-        q = text(
-            """
-            INSERT INTO marketing_campaigns (nome, status, investimento, inicio, fim, owner_user_id)
-            VALUES (:nome, :status, :invest, :inicio, :fim, :owner)
-            RETURNING id, nome, status, investimento, inicio, fim
-            """
-        )
+        q = statements.for_session(_CREATE_CAMPAIGN, self.session)
         params = {
             "nome": payload.nome,
             "status": payload.status,
@@ -75,14 +101,7 @@ class MarketingRepository:
 
     # Segments --------------------------------------------------------
     async def list_segments(self) -> List[SegmentResponse]:
-        q = text(
-            """
-            SELECT id, nome, regra, tamanho
-            FROM marketing_segments
-            ORDER BY created_at DESC
-            LIMIT 200
-            """
-        )
+        q = statements.for_session(_LIST_SEGMENTS, self.session)
         res = await self.session.execute(q)
         rows = res.mappings().all()
         return [
@@ -93,13 +112,7 @@ class MarketingRepository:
         ]
 
     async def create_segment(self, payload: SegmentCreate) -> SegmentResponse:
-        q = text(
-            """
-            INSERT INTO marketing_segments (nome, regra, tamanho)
-            VALUES (:nome, :regra, :tamanho)
-            RETURNING id, nome, regra, tamanho
-            """
-        )
+        q = statements.for_session(_CREATE_SEGMENT, self.session)
         params = {
             "nome": payload.nome,
             "regra": payload.regra,
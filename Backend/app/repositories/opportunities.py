@@ -3,12 +3,79 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.statements import statements
 from app.models import OpportunityCreate, OpportunityResponse
 
 
+_LIST_OPPORTUNITIES = statements.register(
+    "opportunities.list_opportunities",
+    """
+    SELECT id,
+           nome,
+           valor,
+           estagio,
+           probabilidade,
+           updated_at
+    FROM {schema}.tb_oportunidade
+    ORDER BY updated_at DESC NULLS LAST, created_at DESC
+    LIMIT 200
+    """,
+)
+
+_GET_OPPORTUNITY = statements.register(
+    "opportunities.get_opportunity",
+    """
+    SELECT id,
+           nome,
+           valor,
+           estagio,
+           probabilidade,
+           updated_at
+    FROM {schema}.tb_oportunidade
+    WHERE id = :id
+    LIMIT 1
+    """,
+)
+
+_CREATE_OPPORTUNITY = statements.register(
+    "opportunities.create_opportunity",
+    """
+    INSERT INTO {schema}.tb_oportunidade (
+        nome,
+        valor,
+        estagio,
+        probabilidade
+    ) VALUES (
+        :nome,
+        :valor,
+        :estagio,
+        :prob
+    ) RETURNING id, nome, valor, estagio, probabilidade, updated_at
+    """,
+)
+
+_UPDATE_OPPORTUNITY = statements.register(
+    "opportunities.update_opportunity",
+    """
+    UPDATE {schema}.tb_oportunidade
+    SET nome = :nome,
+        valor = :valor,
+        estagio = :estagio,
+        probabilidade = :prob,
+        updated_at = NOW()
+    WHERE id = :id
+    RETURNING id, nome, valor, estagio, probabilidade, updated_at
+    """,
+)
+
+_DELETE_OPPORTUNITY = statements.register(
+    "opportunities.delete_opportunity",
+    "DELETE FROM {schema}.tb_oportunidade WHERE id = :id",
+)
+
+
 # Mapping between API "stage" labels and DB allowed values
 _STAGE_TO_DB = {
     "Propostas": "PROPOSTA",
@@ -51,38 +118,14 @@ def _row_to_response(row: dict[str, Any]) -> OpportunityResponse:
 
 
 async def list_opportunities(session: AsyncSession) -> list[OpportunityResponse]:
-    q = text(
-        """
-        SELECT id,
-               nome,
-               valor,
-               estagio,
-               probabilidade,
-               updated_at
-        FROM tb_oportunidade
-        ORDER BY updated_at DESC NULLS LAST, created_at DESC
-        LIMIT 200
-        """
-    )
+    q = statements.for_session(_LIST_OPPORTUNITIES, session)
     res = await session.execute(q)
     rows = [dict(r) for r in res.mappings().all()]
     return [_row_to_response(r) for r in rows]
 
 
 async def get_opportunity(session: AsyncSession, op_id: str) -> OpportunityResponse | None:
-    q = text(
-        """
-        SELECT id,
-               nome,
-               valor,
-               estagio,
-               probabilidade,
-               updated_at
-        FROM tb_oportunidade
-        WHERE id = :id
-        LIMIT 1
-        """
-    )
+    q = statements.for_session(_GET_OPPORTUNITY, session)
     res = await session.execute(q, {"id": op_id})
     row = res.mappings().first()
     return _row_to_response(dict(row)) if row else None
@@ -91,21 +134,7 @@ async def get_opportunity(session: AsyncSession, op_id: str) -> OpportunityRespo
 async def create_opportunity(
     session: AsyncSession, tenant_id: str, payload: OpportunityCreate
 ) -> OpportunityResponse:
-    q = text(
-        """
-        INSERT INTO tb_oportunidade (
-            nome,
-            valor,
-            estagio,
-            probabilidade
-        ) VALUES (
-            :nome,
-            :valor,
-            :estagio,
-            :prob
-        ) RETURNING id, nome, valor, estagio, probabilidade, updated_at
-        """
-    )
+    q = statements.for_session(_CREATE_OPPORTUNITY, session)
     params = {
         "nome": payload.nome,
         "valor": float(payload.valor),
@@ -122,18 +151,7 @@ async def create_opportunity(
 async def update_opportunity(
     session: AsyncSession, op_id: str, payload: OpportunityCreate
 ) -> OpportunityResponse | None:
-    q = text(
-        """
-        UPDATE tb_oportunidade
-        SET nome = :nome,
-            valor = :valor,
-            estagio = :estagio,
-            probabilidade = :prob,
-            updated_at = NOW()
-        WHERE id = :id
-        RETURNING id, nome, valor, estagio, probabilidade, updated_at
-        """
-    )
+    q = statements.for_session(_UPDATE_OPPORTUNITY, session)
     params = {
         "id": op_id,
         "nome": payload.nome,
@@ -151,7 +169,7 @@ async def update_opportunity(
 
 
 async def delete_opportunity(session: AsyncSession, op_id: str) -> bool:
-    q = text("DELETE FROM tb_oportunidade WHERE id = :id")
+    q = statements.for_session(_DELETE_OPPORTUNITY, session)
     res = await session.execute(q, {"id": op_id})
     # When using text, rowcount is available
     return (res.rowcount or 0) > 0
@@ -1,6 +1,11 @@
 """JWT authentication and tenant search_path dependency."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 from uuid import UUID
@@ -13,7 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_session
-from app.db.utils import set_tenant_search_path
+from app.db.utils import resolve_and_bootstrap_tenant
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,6 +31,67 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt so login bursts do not block the event loop.
+
+    ``max_workers`` caps concurrent hash computations; at most ``max_pending``
+    calls may be queued or running, beyond that callers get a 503.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nexus-bcrypt")
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servico de autenticacao ocupado, tente novamente.",
+            )
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.password_hash_max_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await password_hash_pool.run(pwd_context.hash, plain_password)
+
+
 def create_access_token(data: Dict[str, Any], expires_minutes: Optional[int] = None) -> str:
     # Ensure JWT claims are JSON-serializable (e.g., UUID -> str)
     to_encode = {
@@ -40,6 +106,91 @@ def create_access_token(data: Dict[str, Any], expires_minutes: Optional[int] = N
     return token
 
 
+class VerifiedTokenCache:
+    """LRU of verified JWT claims keyed by the SHA-256 digest of the token.
+
+    Entries are valid until the token's ``exp``; at most ``max_entries`` digests are
+    kept (tokens larger than ``max_token_bytes`` are never cached), which bounds
+    memory. Raw tokens are not retained.
+    """
+
+    def __init__(self, max_entries: int, max_token_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_token_bytes = max_token_bytes
+        self._store: OrderedDict[bytes, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._digest(token)
+        record = self._store.get(key)
+        if record is None:
+            self.misses += 1
+            return None
+        exp, claims = record
+        if exp <= time.time():
+            # Expired: let jwt.decode raise the usual error
+            self._store.pop(key, None)
+            self.misses += 1
+            return None
+        self._store.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)) or len(token) > self.max_token_bytes:
+            return
+        key = self._digest(token)
+        self._store[key] = (float(exp), claims)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._store),
+        }
+
+
+verified_token_cache = VerifiedTokenCache(
+    max_entries=settings.jwt_cache_max_entries,
+    max_token_bytes=settings.jwt_cache_max_token_bytes,
+)
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify and decode a JWT, reusing claims of tokens already verified in this worker."""
+    payload = verified_token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+        verified_token_cache.set(token, payload)
+    return payload
+
+
+def _single_user(rows: list) -> Optional[Dict[str, Any]]:
+    # lower(email) is unique (migration 20251116_000009); refuse to guess if a
+    # database without that index has users differing only by case
+    if len(rows) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email associado a mais de um usuario. Contate o administrador.",
+        )
+    return dict(rows[0]) if rows else None
+
+
 async def get_user_by_email(session: AsyncSession, email: str) -> Optional[Dict[str, Any]]:
     """Fetch user and tenant info by email from tenant_admin schema."""
     q = text(
@@ -53,43 +204,119 @@ async def get_user_by_email(session: AsyncSession, email: str) -> Optional[Dict[
                t.nome_empresa
         FROM tenant_admin.tb_usuario u
         JOIN tenant_admin.tb_tenant t ON t.id = u.tenant_id
-        WHERE u.email = :email
-        LIMIT 1
+        WHERE lower(u.email) = lower(:email)
+        LIMIT 2
         """
     )
     res = await session.execute(q, {"email": email})
-    row = res.mappings().first()
-    return dict(row) if row else None
+    return _single_user(res.mappings().all())
 
 
-async def get_roles_for_user(session: AsyncSession, user_id: str) -> list[str]:
-    """Return role names (lowercased) assigned to a user via tenant_admin.user_roles.
+async def get_login_context(session: AsyncSession, email: str) -> Optional[Dict[str, Any]]:
+    """Fetch user, tenant branding and lowercased role names in a single round trip.
 
-    Falls back to empty list if RBAC tables are not present.
+    Uses the unique ``lower(email)`` index on tb_usuario; ``roles`` is an empty
+    list when the user has no RBAC assignment.
     """
     schema = settings.tenant_admin_schema
     q = text(
         f"""
-        SELECT lower(r.name) AS role_name
-        FROM {schema}.user_roles ur
-        JOIN {schema}.roles r ON r.role_id = ur.role_id
-        WHERE ur.user_id = :user_id
+        SELECT u.id AS user_id,
+               u.email,
+               u.senha_hash,
+               u.perfil,
+               u.tenant_id,
+               t.schema_name,
+               t.nome_empresa,
+               COALESCE(r.roles, ARRAY[]::text[]) AS roles
+        FROM {schema}.tb_usuario u
+        JOIN {schema}.tb_tenant t ON t.id = u.tenant_id
+        LEFT JOIN LATERAL (
+            SELECT array_agg(lower(ro.name) ORDER BY ro.name) AS roles
+            FROM {schema}.user_roles ur
+            JOIN {schema}.roles ro ON ro.role_id = ur.role_id
+            WHERE ur.user_id = u.id
+        ) r ON true
+        WHERE lower(u.email) = lower(:email)
+        LIMIT 2
         """
     )
-    try:
-        res = await session.execute(q, {"user_id": user_id})
-        return [row[0] for row in res.all()]
-    except Exception:
-        # If schema/tables are missing in a dev environment, do not break login
-        return []
+    res = await session.execute(q, {"email": email})
+    ctx = _single_user(res.mappings().all())
+    if ctx is None:
+        return None
+    ctx["roles"] = list(ctx["roles"] or [])
+    return ctx
+
+
+class TenantSchemaCache:
+    """Bounded TTL cache for tenant_id -> schema_name lookups.
+
+    Entries expire after ``ttl_seconds``; when ``max_entries`` is reached the
+    least recently used tenant is dropped. The cache is per worker and nothing
+    signals it across processes: misses are not cached (a new tenant is found on
+    its first request) and a tenant whose schema_name changes is picked up once
+    its entry expires, so keep the TTL short enough for that.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._store: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant_id: str) -> Optional[str]:
+        record = self._store.get(tenant_id)
+        if record is None:
+            self.misses += 1
+            return None
+        expires_at, schema_name = record
+        if expires_at < time.monotonic():
+            self._store.pop(tenant_id, None)
+            self.misses += 1
+            return None
+        self._store.move_to_end(tenant_id)
+        self.hits += 1
+        return schema_name
+
+    def set(self, tenant_id: str, schema_name: str) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._store[tenant_id] = (time.monotonic() + self.ttl_seconds, schema_name)
+        self._store.move_to_end(tenant_id)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Drop one tenant (or every tenant when ``tenant_id`` is None)."""
+        if tenant_id is None:
+            self._store.clear()
+        else:
+            self._store.pop(str(tenant_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._store)}
+
+
+tenant_schema_cache = TenantSchemaCache(
+    ttl_seconds=settings.tenant_schema_cache_ttl_seconds,
+    max_entries=settings.tenant_schema_cache_max_entries,
+)
 
 
 async def get_tenant_schema_by_id(session: AsyncSession, tenant_id: str) -> Optional[str]:
+    cached = tenant_schema_cache.get(tenant_id)
+    if cached is not None:
+        return cached
     q = text(
         "SELECT schema_name FROM tenant_admin.tb_tenant WHERE id = :tenant_id LIMIT 1"
     )
     res = await session.execute(q, {"tenant_id": tenant_id})
     schema = res.scalar_one_or_none()
+    if schema:
+        # Unknown tenants are not cached so a freshly provisioned tenant is found immediately
+        tenant_schema_cache.set(tenant_id, schema)
     return schema
 
 
@@ -97,8 +324,11 @@ async def validar_jwt_e_tenant(
     request: Request, session: AsyncSession = Depends(get_session)
 ) -> Dict[str, Any]:
     """
-    Dependency for securing routes: validates JWT, resolves tenant schema,
-    and applies search_path for the duration of the request transaction.
+    Dependency for securing routes: validates JWT and resolves tenant schema.
+
+    search_path is applied by get_tenant_session / get_tenant_read_session on the
+    session that actually runs the queries (only a tenant-cache miss touches the
+    primary here, applying search_path in the same lookup statement).
     """
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.lower().startswith("bearer "):
@@ -106,7 +336,7 @@ async def validar_jwt_e_tenant(
 
     token = auth_header.split(" ", 1)[1]
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+        payload = decode_access_token(token)
         user_id: str | None = payload.get("user_id")
         tenant_id: str | None = payload.get("tenant_id")
         perfil: str | None = payload.get("perfil")
@@ -115,11 +345,14 @@ async def validar_jwt_e_tenant(
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalido ou expirado") from None
 
-    schema_name = await get_tenant_schema_by_id(session, tenant_id)
+    # Cache hit: no statement here; the session dependency (primary or replica) applies
+    # search_path. Miss: lookup + set_config on the primary in the same statement.
+    schema_name = tenant_schema_cache.get(tenant_id)
     if not schema_name:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant nao encontrado")
-
-    await set_tenant_search_path(session, schema_name)
+        schema_name = await resolve_and_bootstrap_tenant(session, tenant_id)
+        if not schema_name:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant nao encontrado")
+        tenant_schema_cache.set(tenant_id, schema_name)
 
     # Tornar o contexto disponivel para outras dependencias (ex.: get_tenant_context)
     # sem precisar decodificar o JWT novamente.
@@ -1,6 +1,6 @@
 """Service layer utilities."""
 
 from .data_store import data_store
-from .sql_guard import validar_e_executar_sql_seguro
+from .sql_guard import validar_e_executar_sql_seguro, validar_sql
 
-__all__ = ["data_store", "validar_e_executar_sql_seguro"]
+__all__ = ["data_store", "validar_e_executar_sql_seguro", "validar_sql"]
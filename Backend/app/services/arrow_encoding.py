@@ -0,0 +1,94 @@
+"""Optional Arrow IPC encoding for tabular SQL Studio / widget results.
+
+pyarrow is an optional dependency: without it clients asking for Arrow simply
+get the regular JSON response.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Sequence
+
+try:  # optional: pip install pyarrow
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# Media types that let the server pick JSON instead
+_JSON_MEDIA_TYPES = frozenset({"application/json", "application/*", "*/*"})
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def wants_arrow(request: Request, row_count: int | None = None) -> bool:
+    """True when the client asked for Arrow IPC and pyarrow is installed.
+
+    Clients accepting only Arrow always get it. With a ``row_count`` (widget
+    results, whose size is unbounded), clients that also accept JSON get Arrow
+    from ``arrow_min_rows`` rows up: below that, building the Arrow batch costs
+    more than serializing a small JSON body. Without one (/query/test, capped
+    at 100 rows, well under the threshold) listing Arrow is enough.
+    """
+    if pa is None:
+        return False
+    accepted = {part.split(";", 1)[0].strip().lower() for part in request.headers.get("accept", "").split(",")}
+    if ARROW_STREAM_MEDIA_TYPE not in accepted:
+        return False
+    if row_count is None or accepted.isdisjoint(_JSON_MEDIA_TYPES):
+        return True
+    return row_count >= settings.arrow_min_rows
+
+
+def _text_value(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return str(value)
+
+
+def _column_array(values: Sequence[Any]) -> "pa.Array":
+    """Arrow array for one column; values pyarrow cannot type become strings.
+
+    Covers JSONB columns mixing objects and scalars, inet, out-of-range
+    integers and any other Postgres type without an Arrow mapping.
+    """
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+        return pa.array([_text_value(value) for value in values], type=pa.string())
+
+
+def encode_arrow_stream(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Encode row tuples as a single-batch Arrow IPC stream.
+
+    Rows are transposed into columns with zip(*rows), so no per-row dict is
+    built; pyarrow infers each column type (see _column_array).
+    """
+    if rows:
+        arrays = [_column_array(column) for column in zip(*rows)]
+    else:
+        arrays = [pa.array([], type=pa.null()) for _ in columns]
+    batch = pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_response(
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    headers: dict[str, str] | None = None,
+) -> Response:
+    return Response(
+        content=encode_arrow_stream(columns, rows),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -1,12 +1,27 @@
 """In-memory, per-tenant data store used during the MVP."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+import asyncio
+from bisect import bisect_left, bisect_right, insort_right
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from itertools import count
+import os
+import pickle
 import secrets
-from typing import Dict, List, Optional
-from uuid import uuid4
-
+import sqlite3
+import sys
+import tempfile
+import time
+import weakref
+from typing import Dict, Iterator, List, Optional
+from uuid import NAMESPACE_URL, uuid4, uuid5
+import zlib
+
+from app.core.config import settings
+from app.services.store_journal import StoreJournal
 from app.models import (
     AccountCreate,
     AccountResponse,
@@ -56,11 +71,50 @@ BASE_TABLES = [
     "tb_segmento",
 ]
 
+# Collections filled by the seed template; tenants share them until their first write
+SEEDED_COLLECTIONS = (
+    "meta_objects",
+    "dashboards",
+    "widgets",
+    "leads",
+    "opportunities",
+    "accounts",
+    "contacts",
+    "campaigns",
+    "segments",
+    "activities",
+    "products",
+    "trade_visits",
+    "support_tickets",
+    "workflows",
+    "triggers",
+    "email_templates",
+    "widgets_by_target",
+    "meta_by_profile",
+    "stage_totals",
+    "activities_by_due",
+)
+# Secondary indexes: key -> {id: record}; copied two levels deep on first write
+_NESTED_INDEXES = frozenset({"widgets_by_target", "meta_by_profile"})
+
+# Residency estimate for the eviction budget (measured with tracemalloc): empty
+# copy-on-write store, slotted records and pydantic models incl. their dict slot
+_STORE_BASE_BYTES = 1200
+_SLOTTED_RECORD_BYTES = 400
+_MODEL_RECORD_BYTES = 1400
+_SLOTTED_COLLECTIONS = frozenset({"leads", "opportunities", "contacts", "campaigns", "activities"})
+
+# Seed ids are derived from this namespace so they are identical in every worker
+# and after restarts; journaled updates to seeded records must find them again
+_SEED_NAMESPACE = uuid5(NAMESPACE_URL, "https://nexuscrm/data-store/seed")
+
 
 @dataclass
 class MetaObjectRecord:
     meta_id: str
     payload: MetaObjectResponse
+    # Creation order; index buckets are merged back into it for listings
+    position: int = 0
 
     def to_response(self) -> MetaObjectResponse:
         return self.payload
@@ -76,6 +130,233 @@ class WidgetRecord:
         return self.payload
 
 
+def _meta_position(record: MetaObjectRecord) -> int:
+    return record.position
+
+
+# Compact records ----------------------------------------------------------
+# High-volume entities are kept as __slots__ dataclasses (no per-instance
+# __dict__, no pydantic field-set bookkeeping) and only become response models
+# when an endpoint reads them. Low-cardinality strings are interned so
+# thousands of tenants share one copy of "Novo", "Propostas", owners, etc.
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class LeadRecord:
+    id: str
+    nome: str
+    email: str
+    status: str
+    origem: Optional[str]
+    owner: str
+    created_at: datetime
+
+    @classmethod
+    def from_payload(cls, lead_id: str, payload: LeadCreate, created_at: datetime) -> "LeadRecord":
+        return cls(
+            id=lead_id,
+            nome=payload.nome,
+            email=payload.email,
+            status=_intern(payload.status),
+            origem=_intern(payload.origem),
+            owner=_intern(payload.owner),
+            created_at=created_at,
+        )
+
+    def to_response(self) -> LeadResponse:
+        return LeadResponse.model_construct(
+            id=self.id,
+            nome=self.nome,
+            email=self.email,
+            status=self.status,
+            origem=self.origem,
+            owner=self.owner,
+            createdAt=self.created_at,
+        )
+
+
+@dataclass(slots=True)
+class OpportunityRecord:
+    id: str
+    nome: str
+    stage: str
+    valor: float
+    probabilidade: float
+    owner: str
+    updated_at: datetime
+
+    @classmethod
+    def from_payload(cls, op_id: str, payload: OpportunityCreate, updated_at: datetime) -> "OpportunityRecord":
+        return cls(
+            id=op_id,
+            nome=payload.nome,
+            stage=_intern(payload.stage),
+            valor=payload.valor,
+            probabilidade=payload.probabilidade,
+            owner=_intern(payload.owner),
+            updated_at=updated_at,
+        )
+
+    def to_response(self) -> OpportunityResponse:
+        return OpportunityResponse.model_construct(
+            id=self.id,
+            nome=self.nome,
+            stage=self.stage,
+            valor=self.valor,
+            probabilidade=self.probabilidade,
+            owner=self.owner,
+            updatedAt=self.updated_at,
+        )
+
+
+@dataclass(slots=True)
+class ContactRecord:
+    id: str
+    nome: str
+    email: str
+    telefone: Optional[str]
+    conta: Optional[str]
+
+    @classmethod
+    def from_payload(cls, contact_id: str, payload: ContactCreate) -> "ContactRecord":
+        return cls(
+            id=contact_id,
+            nome=payload.nome,
+            email=payload.email,
+            telefone=payload.telefone,
+            conta=_intern(payload.conta),
+        )
+
+    def to_response(self) -> ContactResponse:
+        return ContactResponse.model_construct(
+            id=self.id,
+            nome=self.nome,
+            email=self.email,
+            telefone=self.telefone,
+            conta=self.conta,
+        )
+
+
+@dataclass(slots=True)
+class CampaignRecord:
+    id: str
+    nome: str
+    status: str
+    investimento: float
+    inicio: str
+    fim: str
+
+    @classmethod
+    def from_payload(cls, campaign_id: str, payload: CampaignCreate) -> "CampaignRecord":
+        return cls(
+            id=campaign_id,
+            nome=payload.nome,
+            status=_intern(payload.status),
+            investimento=payload.investimento,
+            inicio=_intern(payload.inicio),
+            fim=_intern(payload.fim),
+        )
+
+    def to_response(self) -> CampaignResponse:
+        return CampaignResponse.model_construct(
+            id=self.id,
+            nome=self.nome,
+            status=self.status,
+            investimento=self.investimento,
+            inicio=self.inicio,
+            fim=self.fim,
+        )
+
+
+@dataclass(slots=True)
+class ActivityRecord:
+    id: str
+    customer: str
+    action: str
+    status: str
+    badge: str
+    due_date: datetime
+
+    @classmethod
+    def from_item(cls, item: ActivityItem) -> "ActivityRecord":
+        return cls(
+            id=item.id,
+            customer=_intern(item.customer),
+            action=item.action,
+            status=_intern(item.status),
+            badge=_intern(item.badge),
+            due_date=item.dueDate,
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return self.status.lower() != "concluido"
+
+    def to_item(self) -> ActivityItem:
+        return ActivityItem.model_construct(
+            id=self.id,
+            customer=self.customer,
+            action=self.action,
+            status=self.status,
+            badge=self.badge,
+            dueDate=self.due_date,
+        )
+
+
+def _due_date(activity: ActivityRecord) -> datetime:
+    return activity.due_date
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    # Due dates are stored as naive UTC (datetime.utcnow); align aware query bounds
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(slots=True)
+class _JournalLink:
+    journal: StoreJournal
+    tenant_id: str
+    template: TenantMemoryStore
+
+
+def _journaled(method):
+    """Log a store mutation to the tenant's WAL so it can be replayed after a restart.
+
+    The entry is the call itself plus the ids/timestamps it generated (via
+    _new_id/_now), which replay feeds back so the result is identical.
+    """
+
+    @wraps(method)
+    def wrapper(self: TenantMemoryStore, *args, **kwargs):
+        link = self._journal
+        if link is None or self._generated is not None or self._replayed is not None:
+            return method(self, *args, **kwargs)
+        # Encoded before running: some methods fill generated ids into their payloads
+        call = pickle.dumps((method.__name__, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        with link.journal.lock(link.tenant_id):
+            if link.journal.shared:
+                # Other workers' writes come first so every copy applies the same order
+                self._catch_up(locked=True)
+            self._generated = []
+            try:
+                result = method(self, *args, **kwargs)
+                entry = pickle.dumps((call, self._generated), protocol=pickle.HIGHEST_PROTOCOL)
+            finally:
+                self._generated = None
+            link.journal.append(link.tenant_id, entry)
+            if link.journal.should_compact(link.tenant_id):
+                link.journal.compact(link.tenant_id, self.snapshot())
+        return result
+
+    return wrapper
+
+
 @dataclass
 class DashboardRecord:
     dashboard_id: str
@@ -101,56 +382,193 @@ class DashboardRecord:
 
 
 class TenantMemoryStore:
-    def __init__(self) -> None:
+    _thumbnail_palette = (
+        "0f172a/63ffb6",
+        "101827/f4f6fb",
+        "111b2f/6ee7b7",
+        "081229/3b82f6",
+        "0f192f/facc15",
+    )
+
+    def __init__(self, template: Optional[TenantMemoryStore] = None) -> None:
         self.meta_objects: Dict[str, MetaObjectRecord] = {}
         self.dashboards: Dict[str, DashboardRecord] = {}
         self.widgets: Dict[str, WidgetRecord] = {}
         self.available_profiles = DEFAULT_PROFILES.copy()
-        self.leads: Dict[str, LeadResponse] = {}
-        self.opportunities: Dict[str, OpportunityResponse] = {}
+        self.leads: Dict[str, LeadRecord] = {}
+        self.opportunities: Dict[str, OpportunityRecord] = {}
         self.accounts: Dict[str, AccountResponse] = {}
-        self.contacts: Dict[str, ContactResponse] = {}
-        self.campaigns: Dict[str, CampaignResponse] = {}
+        self.contacts: Dict[str, ContactRecord] = {}
+        self.campaigns: Dict[str, CampaignRecord] = {}
         self.segments: Dict[str, SegmentResponse] = {}
-        self.activities: List[ActivityItem] = []
+        self.activities: List[ActivityRecord] = []
         self.products: Dict[str, ProductResponse] = {}
         self.trade_visits: List[TradeVisit] = []
         self.support_tickets: List[SupportTicket] = []
         self.workflows: Dict[str, WorkflowResponse] = {}
         self.triggers: Dict[str, AutomationTriggerResponse] = {}
         self.email_templates: Dict[str, EmailTemplateResponse] = {}
-        self._thumbnail_palette = [
-            "0f172a/63ffb6",
-            "101827/f4f6fb",
-            "111b2f/6ee7b7",
-            "081229/3b82f6",
-            "0f192f/facc15",
-        ]
         self.dashboard_favorites: Dict[str, set[str]] = {}
+        # Secondary indexes, kept in sync by the write methods below
+        self.widgets_by_target: Dict[str, Dict[str, WidgetRecord]] = {}
+        self.meta_by_profile: Dict[str, Dict[str, MetaObjectRecord]] = {}
+        # Running /inicio aggregates: stage -> (valor, count) and open activities
+        self.stage_totals: Dict[str, tuple[float, int]] = {}
+        self.open_activities = 0
+        # Activities ordered by due date (ties keep insertion order) for range queries
+        self.activities_by_due: List[ActivityRecord] = []
+        # Seeded collections still pointing at the template (copy-on-write)
+        self._shared: set[str] = set()
+        if template is not None:
+            for name in SEEDED_COLLECTIONS:
+                setattr(self, name, getattr(template, name))
+            self._shared.update(SEEDED_COLLECTIONS)
+            self.open_activities = template.open_activities
+        # Journal state: WAL binding, values generated by the call being logged,
+        # values being fed back during replay, deterministic ids/clock for the seed
+        self._journal: _JournalLink | None = None
+        self._generated: List[object] | None = None
+        self._replayed: deque | None = None
+        self._seed_ids: Iterator[int] | None = None
+        self._seed_time: datetime | None = None
+
+    def _new_id(self) -> str:
+        if self._replayed is not None:
+            return self._replayed.popleft()
+        if self._seed_ids is not None:
+            return str(uuid5(_SEED_NAMESPACE, str(next(self._seed_ids))))
+        value = str(uuid4())
+        if self._generated is not None:
+            self._generated.append(value)
+        return value
+
+    def _now(self) -> datetime:
+        if self._replayed is not None:
+            return self._replayed.popleft()
+        if self._seed_time is not None:
+            return self._seed_time
+        value = datetime.utcnow()
+        if self._generated is not None:
+            self._generated.append(value)
+        return value
+
+    def _replay(self, entry: bytes) -> None:
+        call, generated = pickle.loads(entry)
+        name, args, kwargs = pickle.loads(call)
+        self._replayed = deque(generated)
+        try:
+            getattr(type(self), name).__wrapped__(self, *args, **kwargs)
+        finally:
+            self._replayed = None
+
+    def _reload(self) -> None:
+        """Rebuild this store in place from the journal (latest snapshot + WAL)."""
+        link = self._journal
+        snapshot, entries = link.journal.open(link.tenant_id)
+        fresh = TenantMemoryStore.restore(snapshot, link.template) if snapshot else TenantMemoryStore(link.template)
+        for entry in entries:
+            fresh._replay(entry)
+        fresh._journal = link
+        # In place: request handlers may already hold a reference to this store
+        self.__dict__.update(fresh.__dict__)
+
+    def _catch_up(self, *, locked: bool = False) -> None:
+        """Apply entries other workers appended to the shared WAL since the last read."""
+        link = self._journal
+        entries = link.journal.read_new(link.tenant_id, locked=locked)
+        if entries is None:
+            self._reload()
+            return
+        for entry in entries:
+            self._replay(entry)
+
+    def _own(self, name: str):
+        """Return a seeded collection this tenant may write to, copying the template on first use.
+
+        Copies are shallow: records are replaced on update, never mutated in place,
+        so template records stay shared until a tenant rewrites them.
+        """
+        if name in self._shared:
+            self._shared.discard(name)
+            collection = getattr(self, name)
+            if name in _NESTED_INDEXES:
+                setattr(self, name, {key: bucket.copy() for key, bucket in collection.items()})
+            else:
+                setattr(self, name, collection.copy())
+        return getattr(self, name)
+
+    def _index(self, name: str, keys: List[str], record_id: str, record: object) -> None:
+        index = self._own(name)
+        for key in keys:
+            index.setdefault(key, {})[record_id] = record
+
+    def _unindex(self, name: str, keys: List[str], record_id: str) -> None:
+        index = self._own(name)
+        for key in keys:
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(record_id, None)
+                if not bucket:
+                    del index[key]
+
+    def estimated_bytes(self) -> int:
+        """Rough resident size; collections still shared with the template cost nothing."""
+        size = _STORE_BASE_BYTES
+        for name in SEEDED_COLLECTIONS:
+            if name not in self._shared:
+                per_record = _SLOTTED_RECORD_BYTES if name in _SLOTTED_COLLECTIONS else _MODEL_RECORD_BYTES
+                size += len(getattr(self, name)) * per_record
+        size += sum(len(favorites) for favorites in self.dashboard_favorites.values()) * _SLOTTED_RECORD_BYTES
+        return size
+
+    def snapshot(self) -> bytes:
+        """Serialize the tenant's private state (template-shared collections are skipped)."""
+        state = {
+            "collections": {name: getattr(self, name) for name in SEEDED_COLLECTIONS if name not in self._shared},
+            "favorites": self.dashboard_favorites,
+            "open_activities": self.open_activities,
+        }
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def restore(cls, payload: bytes, template: TenantMemoryStore) -> TenantMemoryStore:
+        # Only reads snapshots this service wrote to its spill file or journal directory
+        state = pickle.loads(payload)
+        store = cls(template=template)
+        for name, collection in state["collections"].items():
+            setattr(store, name, collection)
+            store._shared.discard(name)
+        store.dashboard_favorites = state["favorites"]
+        store.open_activities = state["open_activities"]
+        return store
 
     def _generate_thumbnail(self, seed: str) -> str:
-        palette = self._thumbnail_palette[hash(seed) % len(self._thumbnail_palette)]
+        # Stable across processes (unlike hash()), so replayed dashboards keep their thumbnail
+        palette = self._thumbnail_palette[zlib.crc32(seed.encode()) % len(self._thumbnail_palette)]
         return f"https://placehold.co/600x360/{palette}?text=Dashboard"
 
     # Meta objetos -----------------------------------------------------
     def list_meta_objects(self) -> List[MetaObjectResponse]:
         return [record.to_response() for record in self.meta_objects.values()]
 
+    def get_meta_object(self, meta_id: str) -> MetaObjectResponse | None:
+        record = self.meta_objects.get(meta_id)
+        return record.to_response() if record else None
+
     def list_meta_objects_for_roles(self, role_ids: List[str]) -> List[MetaObjectResponse]:
-        if not role_ids:
-            return []
-        normalized = {role.lower() for role in role_ids}
-        allowed: List[MetaObjectResponse] = []
-        for record in self.meta_objects.values():
-            if not record.payload.profiles:
-                continue
-            profile_ids = {profile.id.lower() for profile in record.payload.profiles}
-            if normalized.intersection(profile_ids):
-                allowed.append(record.to_response())
-        return allowed
+        allowed: Dict[str, MetaObjectRecord] = {}
+        for role in {role.lower() for role in role_ids}:
+            allowed.update(self.meta_by_profile.get(role, {}))
+        # Same order as list_meta_objects, whatever the role iteration order was
+        return [record.to_response() for record in sorted(allowed.values(), key=_meta_position)]
+
+    @staticmethod
+    def _profile_keys(record: MetaObjectRecord) -> List[str]:
+        return [profile.id.lower() for profile in record.payload.profiles]
 
+    @_journaled
     def create_meta_object(self, payload: MetaObjectCreate) -> MetaObjectResponse:
-        meta_id = str(uuid4())
+        meta_id = self._new_id()
         response = MetaObjectResponse(
             metaId=meta_id,
             nomeAmigavel=payload.nomeAmigavel,
@@ -161,22 +579,32 @@ class TenantMemoryStore:
             profiles=[],
             fields=payload.fields,
         )
-        self.meta_objects[meta_id] = MetaObjectRecord(meta_id=meta_id, payload=response)
+        meta_objects = self._own("meta_objects")
+        # Insertion order is creation order, so the last record holds the highest position
+        position = next(reversed(meta_objects.values())).position + 1 if meta_objects else 0
+        meta_objects[meta_id] = MetaObjectRecord(meta_id=meta_id, payload=response, position=position)
         return response
 
+    @_journaled
     def update_permissions(self, meta_id: str, profile_ids: List[str]) -> MetaObjectResponse:
         if meta_id not in self.meta_objects:
             raise KeyError(meta_id)
         profiles = [profile for profile in self.available_profiles if profile.id in profile_ids]
-        record = self.meta_objects[meta_id]
-        record.payload.profiles = profiles
-        return record.payload
-
+        previous = self.meta_objects[meta_id]
+        payload = previous.payload.model_copy(update={"profiles": profiles})
+        record = MetaObjectRecord(meta_id=meta_id, payload=payload, position=previous.position)
+        self._own("meta_objects")[meta_id] = record
+        self._unindex("meta_by_profile", self._profile_keys(previous), meta_id)
+        self._index("meta_by_profile", self._profile_keys(record), meta_id, record)
+        return payload
+
+    @_journaled
     def delete_meta_object(self, meta_id: str) -> None:
         if meta_id not in self.meta_objects:
             raise KeyError(meta_id)
         # Em um futuro proximo, poderiamos validar dependencias com widgets/dashboards
-        del self.meta_objects[meta_id]
+        record = self._own("meta_objects").pop(meta_id)
+        self._unindex("meta_by_profile", self._profile_keys(record), meta_id)
 
     # Widgets / Dashboards ---------------------------------------------
     def list_dashboards(self) -> List[DashboardSaveRequest]:
@@ -187,6 +615,7 @@ class TenantMemoryStore:
             return False
         return dashboard_id in self.dashboard_favorites.get(user_id, set())
 
+    @_journaled
     def set_favorite(self, user_id: str, dashboard_id: str, favorite: bool) -> None:
         favorites = self.dashboard_favorites.setdefault(user_id, set())
         if favorite:
@@ -198,11 +627,15 @@ class TenantMemoryStore:
         dashboard = self.dashboards.get(dashboard_id)
         return dashboard.to_response() if dashboard else None
 
+    @_journaled
     def save_dashboard(self, payload: DashboardSaveRequest) -> DashboardSaveRequest:
-        dashboard_id = payload.id or str(uuid4())
-        dashboard = self.dashboards.get(
-            dashboard_id,
-            DashboardRecord(
+        dashboard_id = payload.id or self._new_id()
+        existing = self.dashboards.get(dashboard_id)
+        if existing is not None:
+            # May be a template record shared with other tenants; edit a private copy
+            dashboard = replace(existing)
+        else:
+            dashboard = DashboardRecord(
                 dashboard_id=dashboard_id,
                 name=payload.name,
                 layout=payload.layout or [],
@@ -210,17 +643,21 @@ class TenantMemoryStore:
                 owner_name=payload.ownerName,
                 shared_with=list(payload.sharedWith or []),
                 thumbnail_url=payload.thumbnailUrl or self._generate_thumbnail(dashboard_id),
-            ),
-        )
+            )
 
-        # Replace widgets for this dashboard
+        # Replace widgets for this dashboard (previous ones leave the store and indexes)
+        widgets = self._own("widgets")
+        for previous in dashboard.widgets.values():
+            widgets.pop(previous.widget_id, None)
+            self._unindex("widgets_by_target", previous.payload.publishTargets, previous.widget_id)
         dashboard.widgets = {}
         for widget in payload.widgets:
-            widget_id = widget.id or str(uuid4())
+            widget_id = widget.id or self._new_id()
             widget.id = widget_id
             record = WidgetRecord(widget_id=widget_id, dashboard_id=dashboard_id, payload=widget)
             dashboard.widgets[widget_id] = record
-            self.widgets[widget_id] = record
+            widgets[widget_id] = record
+            self._index("widgets_by_target", widget.publishTargets, widget_id, record)
 
         dashboard.name = payload.name
         dashboard.layout = payload.layout or []
@@ -230,210 +667,445 @@ class TenantMemoryStore:
         dashboard.thumbnail_url = payload.thumbnailUrl or dashboard.thumbnail_url or self._generate_thumbnail(
             dashboard_id
         )
-        self.dashboards[dashboard_id] = dashboard
+        self._own("dashboards")[dashboard_id] = dashboard
         return dashboard.to_response()
 
     def list_widgets_for_target(self, target: str) -> List[WidgetPayload]:
-        return [
-            record.to_payload()
-            for record in self.widgets.values()
-            if target in record.payload.publishTargets
-        ]
+        return [record.to_payload() for record in self.widgets_by_target.get(target, {}).values()]
 
     # Sales data -------------------------------------------------------
     def list_leads(self) -> List[LeadResponse]:
-        return list(self.leads.values())
+        return [lead.to_response() for lead in self.leads.values()]
 
+    @_journaled
     def create_lead(self, payload: LeadCreate) -> LeadResponse:
-        lead_id = str(uuid4())
-        lead = LeadResponse(id=lead_id, createdAt=datetime.utcnow(), **payload.model_dump())
-        self.leads[lead_id] = lead
-        return lead
+        lead_id = self._new_id()
+        lead = LeadRecord.from_payload(lead_id, payload, self._now())
+        self._own("leads")[lead_id] = lead
+        return lead.to_response()
 
     def get_lead(self, lead_id: str) -> LeadResponse:
         if lead_id not in self.leads:
             raise KeyError(lead_id)
-        return self.leads[lead_id]
+        return self.leads[lead_id].to_response()
 
+    @_journaled
     def update_lead(self, lead_id: str, payload: LeadCreate) -> LeadResponse:
-        lead = self.get_lead(lead_id)
-        updated = lead.model_copy(update=payload.model_dump())
-        self.leads[lead_id] = updated
-        return updated
+        if lead_id not in self.leads:
+            raise KeyError(lead_id)
+        updated = LeadRecord.from_payload(lead_id, payload, self.leads[lead_id].created_at)
+        self._own("leads")[lead_id] = updated
+        return updated.to_response()
 
+    @_journaled
     def delete_lead(self, lead_id: str) -> None:
         if lead_id not in self.leads:
             raise KeyError(lead_id)
-        del self.leads[lead_id]
+        del self._own("leads")[lead_id]
 
     def list_opportunities(self) -> List[OpportunityResponse]:
-        return list(self.opportunities.values())
+        return [opportunity.to_response() for opportunity in self.opportunities.values()]
 
+    @_journaled
     def create_opportunity(self, payload: OpportunityCreate) -> OpportunityResponse:
-        op_id = str(uuid4())
-        opportunity = OpportunityResponse(
-            id=op_id,
-            updatedAt=datetime.utcnow(),
-            **payload.model_dump(),
-        )
-        self.opportunities[op_id] = opportunity
-        return opportunity
+        op_id = self._new_id()
+        opportunity = OpportunityRecord.from_payload(op_id, payload, self._now())
+        self._own("opportunities")[op_id] = opportunity
+        self._count_opportunity(opportunity, 1)
+        return opportunity.to_response()
 
     def get_opportunity(self, op_id: str) -> OpportunityResponse:
         if op_id not in self.opportunities:
             raise KeyError(op_id)
-        return self.opportunities[op_id]
+        return self.opportunities[op_id].to_response()
 
+    @_journaled
     def update_opportunity(self, op_id: str, payload: OpportunityCreate) -> OpportunityResponse:
-        opportunity = self.get_opportunity(op_id)
-        updated = opportunity.model_copy(update={**payload.model_dump(), "updatedAt": datetime.utcnow()})
-        self.opportunities[op_id] = updated
-        return updated
+        if op_id not in self.opportunities:
+            raise KeyError(op_id)
+        updated = OpportunityRecord.from_payload(op_id, payload, self._now())
+        self._count_opportunity(self.opportunities[op_id], -1)
+        self._own("opportunities")[op_id] = updated
+        self._count_opportunity(updated, 1)
+        return updated.to_response()
 
+    @_journaled
     def delete_opportunity(self, op_id: str) -> None:
         if op_id not in self.opportunities:
             raise KeyError(op_id)
-        del self.opportunities[op_id]
+        self._count_opportunity(self._own("opportunities").pop(op_id), -1)
+
+    def _count_opportunity(self, opportunity: OpportunityRecord, sign: int) -> None:
+        totals = self._own("stage_totals")
+        valor, count = totals.get(opportunity.stage, (0.0, 0))
+        count += sign
+        # Empty stages keep their entry (and so their funnel position) with the float
+        # residue reset; pipeline_by_stage hides them
+        totals[opportunity.stage] = (valor + sign * opportunity.valor, count) if count else (0.0, 0)
 
     def list_accounts(self) -> List[AccountResponse]:
         return list(self.accounts.values())
 
+    @_journaled
     def create_account(self, payload: AccountCreate) -> AccountResponse:
-        account_id = str(uuid4())
+        account_id = self._new_id()
         account = AccountResponse(id=account_id, **payload.model_dump())
-        self.accounts[account_id] = account
+        self._own("accounts")[account_id] = account
         return account
 
     def list_contacts(self) -> List[ContactResponse]:
-        return list(self.contacts.values())
+        return [contact.to_response() for contact in self.contacts.values()]
 
+    @_journaled
     def create_contact(self, payload: ContactCreate) -> ContactResponse:
-        contact_id = str(uuid4())
-        contact = ContactResponse(id=contact_id, **payload.model_dump())
-        self.contacts[contact_id] = contact
-        return contact
+        contact_id = self._new_id()
+        contact = ContactRecord.from_payload(contact_id, payload)
+        self._own("contacts")[contact_id] = contact
+        return contact.to_response()
 
     # Product catalog -------------------------------------------------
     def list_products(self) -> List[ProductResponse]:
         return list(self.products.values())
 
+    @_journaled
     def create_product(self, payload: ProductCreate) -> ProductResponse:
-        product_id = str(uuid4())
+        product_id = self._new_id()
         product = ProductResponse(id=product_id, **payload.model_dump())
-        self.products[product_id] = product
+        self._own("products")[product_id] = product
         return product
 
     # Marketing data ---------------------------------------------------
     def list_campaigns(self) -> List[CampaignResponse]:
-        return list(self.campaigns.values())
+        return [campaign.to_response() for campaign in self.campaigns.values()]
 
+    @_journaled
     def create_campaign(self, payload: CampaignCreate) -> CampaignResponse:
-        campaign_id = str(uuid4())
-        campaign = CampaignResponse(id=campaign_id, **payload.model_dump())
-        self.campaigns[campaign_id] = campaign
-        return campaign
+        campaign_id = self._new_id()
+        campaign = CampaignRecord.from_payload(campaign_id, payload)
+        self._own("campaigns")[campaign_id] = campaign
+        return campaign.to_response()
 
     def list_segments(self) -> List[SegmentResponse]:
         return list(self.segments.values())
 
+    @_journaled
     def create_segment(self, payload: SegmentCreate) -> SegmentResponse:
-        segment_id = str(uuid4())
+        segment_id = self._new_id()
         segment = SegmentResponse(id=segment_id, **payload.model_dump())
-        self.segments[segment_id] = segment
+        self._own("segments")[segment_id] = segment
         return segment
 
     # Solucoes (Trade Marketing / Atendimento) -----------------------
     def list_trade_visits(self) -> List[TradeVisit]:
-        return self.trade_visits
+        return list(self.trade_visits)
 
+    @_journaled
     def add_trade_visit(self, visit: TradeVisit) -> None:
-        self.trade_visits.append(visit)
+        self._own("trade_visits").append(visit)
 
     def list_support_tickets(self) -> List[SupportTicket]:
-        return self.support_tickets
+        return list(self.support_tickets)
 
+    @_journaled
     def add_support_ticket(self, ticket: SupportTicket) -> None:
-        self.support_tickets.append(ticket)
+        self._own("support_tickets").append(ticket)
 
     # Automacao -------------------------------------------------------
     def list_workflows(self) -> List[WorkflowResponse]:
         return list(self.workflows.values())
 
+    @_journaled
     def save_workflow(self, payload: WorkflowCreate) -> WorkflowResponse:
-        workflow_id = str(uuid4())
+        workflow_id = self._new_id()
         workflow = WorkflowResponse(id=workflow_id, ultimaExecucao=None, **payload.model_dump())
-        self.workflows[workflow_id] = workflow
+        self._own("workflows")[workflow_id] = workflow
         return workflow
 
+    @_journaled
     def trigger_workflow(self, workflow_id: str) -> WorkflowRunResponse:
         if workflow_id not in self.workflows:
             raise KeyError(workflow_id)
-        triggered_at = datetime.utcnow()
-        workflow = self.workflows[workflow_id]
-        workflow.ultimaExecucao = triggered_at
+        triggered_at = self._now()
+        workflow = self.workflows[workflow_id].model_copy(update={"ultimaExecucao": triggered_at})
+        self._own("workflows")[workflow_id] = workflow
         return WorkflowRunResponse(workflowId=workflow_id, status="triggered", triggeredAt=triggered_at)
 
     def list_triggers(self) -> List[AutomationTriggerResponse]:
         return list(self.triggers.values())
 
+    @_journaled
     def create_trigger(self, payload: AutomationTriggerCreate) -> AutomationTriggerResponse:
-        trigger_id = str(uuid4())
+        trigger_id = self._new_id()
         trigger = AutomationTriggerResponse(id=trigger_id, **payload.model_dump())
-        self.triggers[trigger_id] = trigger
+        self._own("triggers")[trigger_id] = trigger
         return trigger
 
     def list_email_templates(self) -> List[EmailTemplateResponse]:
         return list(self.email_templates.values())
 
+    @_journaled
     def create_email_template(self, payload: EmailTemplateCreate) -> EmailTemplateResponse:
-        template_id = str(uuid4())
+        template_id = self._new_id()
         template = EmailTemplateResponse(
             id=template_id,
-            ultimaAtualizacao=datetime.utcnow(),
+            ultimaAtualizacao=self._now(),
             **payload.model_dump(),
         )
-        self.email_templates[template_id] = template
+        self._own("email_templates")[template_id] = template
         return template
 
     # Inicio dashboard -------------------------------------------------
+    def pipeline_by_stage(self) -> Dict[str, tuple[float, int]]:
+        """Opportunity (valor, count) per non-empty stage, in order of first use."""
+        return {stage: totals for stage, totals in self.stage_totals.items() if totals[1]}
+
+    def count_leads(self) -> int:
+        return len(self.leads)
+
+    def count_open_activities(self) -> int:
+        return self.open_activities
+
     def list_activities(self) -> List[ActivityItem]:
-        return self.activities
+        return [activity.to_item() for activity in self.activities]
 
+    @_journaled
     def add_activity(self, activity: ActivityItem) -> None:
-        self.activities.append(activity)
-
-    def list_reminders(self) -> List[dict[str, str]]:
-        reminders: List[dict[str, str]] = []
-        now = datetime.utcnow()
-        for activity in self.activities:
-            urgency = "Alto" if activity.dueDate <= now + timedelta(days=1) else "Normal"
-            reminders.append(
-                {
-                    "id": activity.id,
-                    "title": activity.action,
-                    "customer": activity.customer,
-                    "dueDate": activity.dueDate.isoformat(),
-                    "status": activity.status,
-                    "badge": activity.badge,
-                    "urgency": urgency,
-                }
-            )
-        reminders.sort(key=lambda item: item["dueDate"])
-        return reminders
+        record = ActivityRecord.from_item(activity)
+        self._own("activities").append(record)
+        insort_right(self._own("activities_by_due"), record, key=_due_date)
+        if record.is_open:
+            self.open_activities += 1
+
+    def _activities_due(
+        self,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int | None,
+    ) -> List[ActivityRecord]:
+        """Activities with start <= dueDate <= end, soonest first: O(log n + result)."""
+        index = self.activities_by_due
+        start, end = _naive_utc(start), _naive_utc(end)
+        lo = bisect_left(index, start, key=_due_date) if start else 0
+        hi = bisect_right(index, end, key=_due_date) if end else len(index)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return index[lo:hi]
+
+    def list_activities_due(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> List[ActivityItem]:
+        return [activity.to_item() for activity in self._activities_due(start, end, limit)]
+
+    def list_reminders(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> List[dict[str, str]]:
+        urgent_until = datetime.utcnow() + timedelta(days=1)
+        return [
+            {
+                "id": activity.id,
+                "title": activity.action,
+                "customer": activity.customer,
+                "dueDate": activity.due_date.isoformat(),
+                "status": activity.status,
+                "badge": activity.badge,
+                "urgency": "Alto" if activity.due_date <= urgent_until else "Normal",
+            }
+            for activity in self._activities_due(start, end, limit)
+        ]
 
 
-class DataStore:
-    """Keeps a TenantMemoryStore per tenant_id."""
+class TenantSnapshotFile:
+    """Local SQLite spill area for evicted tenant stores.
+
+    Not durable storage: the file is private to the process and emptied when
+    opened, it only keeps idle tenants off the heap.
+    """
+
+    def __init__(self, path: str = "") -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self._path or os.path.join(tempfile.mkdtemp(prefix="nexus-datastore-"), "tenants.sqlite3")
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Losing the spill file on a crash loses nothing the in-memory store would have kept
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS tenant_snapshot (tenant_id TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+            conn.execute("DELETE FROM tenant_snapshot")
+            self._conn = conn
+        return self._conn
+
+    def write(self, tenant_id: str, payload: bytes) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO tenant_snapshot (tenant_id, payload) VALUES (?, ?)",
+            (tenant_id, payload),
+        )
+
+    def pop(self, tenant_id: str) -> bytes | None:
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT payload FROM tenant_snapshot WHERE tenant_id = ?", (tenant_id,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("DELETE FROM tenant_snapshot WHERE tenant_id = ?", (tenant_id,))
+        return row[0]
+
+    def count(self) -> int:
+        if self._conn is None:
+            return 0
+        return self._conn.execute("SELECT count(*) FROM tenant_snapshot").fetchone()[0]
 
-    def __init__(self) -> None:
-        self._stores: Dict[str, TenantMemoryStore] = {}
+
+class DataStore:
+    """Keeps a TenantMemoryStore per tenant_id.
+
+    Resident stores are kept in LRU order under an estimated memory budget; the
+    least recently used ones are snapshotted to disk and restored lazily by
+    get_store. Sizes are re-estimated when a store is handed out and again on
+    the following get_store call, which picks up the writes made with it.
+
+    With a journal, every mutation is also written to a per-tenant WAL: stores
+    are rebuilt from it on first access (and after eviction, which then needs no
+    spill file), and in shared mode each access first applies the entries other
+    workers appended.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        snapshot_path: str = "",
+        journal: StoreJournal | None = None,
+    ) -> None:
+        self._stores: OrderedDict[str, TenantMemoryStore] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._resident_bytes = 0
+        self._last_tenant: str | None = None
+        self._budget = memory_budget_bytes
+        self._snapshots = TenantSnapshotFile(snapshot_path)
+        self._evictions = 0
+        # Evicted stores, for as long as a request still holds them
+        self._evicted: weakref.WeakValueDictionary[str, TenantMemoryStore] = weakref.WeakValueDictionary()
+        self._revived = 0
+        self._restores = 0
+        self._restore_ms_total = 0.0
+        self._journal = journal
+        self._fsync_task: asyncio.Task | None = None
         # Legacy in-memory auth removed; JWT stateless is used instead.
+        # Seed data is built once per process; tenants start as copy-on-write views of it
+        self._template = TenantMemoryStore()
+        self._template._seed_ids = count()
+        self._template._seed_time = journal.seed_time() if journal is not None else datetime.utcnow()
+        self._seed_defaults(self._template)
+        self._template._seed_ids = None
+        self._template._seed_time = None
 
     def get_store(self, tenant_id: str) -> TenantMemoryStore:
-        if tenant_id not in self._stores:
-            self._stores[tenant_id] = TenantMemoryStore()
-            self._seed_defaults(self._stores[tenant_id])
-        return self._stores[tenant_id]
+        previous = self._stores.get(self._last_tenant) if self._last_tenant else None
+        if previous is not None:
+            self._track(self._last_tenant, previous.estimated_bytes())
+        self._last_tenant = tenant_id
+        store = self._stores.get(tenant_id)
+        if store is not None:
+            self._stores.move_to_end(tenant_id)
+            if self._journal is not None and self._journal.shared:
+                store._catch_up()
+        else:
+            store = self._revive(tenant_id) or self._load(tenant_id)
+            self._stores[tenant_id] = store
+        self._track(tenant_id, store.estimated_bytes())
+        self._evict()
+        return store
+
+    def _load(self, tenant_id: str) -> TenantMemoryStore:
+        started = time.perf_counter()
+        if self._journal is not None:
+            store = TenantMemoryStore(template=self._template)
+            store._journal = _JournalLink(self._journal, tenant_id, self._template)
+            store._reload()
+            # The WAL stays open while anything (e.g. a request mid-write) still holds the store
+            weakref.finalize(store, self._release_journal, tenant_id)
+        else:
+            payload = self._snapshots.pop(tenant_id)
+            if payload is None:
+                return TenantMemoryStore(template=self._template)
+            store = TenantMemoryStore.restore(payload, self._template)
+        self._restores += 1
+        self._restore_ms_total += (time.perf_counter() - started) * 1000
+        return store
+
+    def _revive(self, tenant_id: str) -> TenantMemoryStore | None:
+        """Take back an evicted store a request still holds, so its writes are not lost."""
+        store = self._evicted.pop(tenant_id, None)
+        if store is None:
+            return None
+        self._revived += 1
+        if self._journal is None:
+            # The spilled copy is older than the live one
+            self._snapshots.pop(tenant_id)
+        elif self._journal.shared:
+            store._catch_up()
+        return store
+
+    def _release_journal(self, tenant_id: str) -> None:
+        if tenant_id not in self._stores and tenant_id not in self._evicted:
+            self._journal.forget(tenant_id)
+
+    def _track(self, tenant_id: str, size: int) -> None:
+        self._resident_bytes += size - self._sizes.get(tenant_id, 0)
+        self._sizes[tenant_id] = size
+
+    def _evict(self) -> None:
+        # The most recently used store (the one being handed out) is never evicted
+        while self._resident_bytes > self._budget and len(self._stores) > 1:
+            tenant_id, store = self._stores.popitem(last=False)
+            self._resident_bytes -= self._sizes.pop(tenant_id)
+            self._evictions += 1
+            self._evicted[tenant_id] = store
+            if self._journal is not None:
+                # Everything is in the WAL already; the store is rebuilt from it on next
+                # access, and its WAL closed once nothing references it any more
+                continue
+            if store._shared.issuperset(SEEDED_COLLECTIONS) and not store.dashboard_favorites:
+                # Never written: recreated from the template on next access
+                continue
+            self._snapshots.write(tenant_id, store.snapshot())
+
+    def stats(self) -> dict[str, float]:
+        stats = {
+            "resident": len(self._stores),
+            "resident_bytes": self._resident_bytes,
+            "budget_bytes": self._budget,
+            "snapshotted": self._snapshots.count(),
+            "evictions": self._evictions,
+            "revived": self._revived,
+            "restores": self._restores,
+            "avg_restore_ms": round(self._restore_ms_total / self._restores, 3) if self._restores else 0.0,
+        }
+        if self._journal is not None:
+            stats.update({f"wal_{key}": value for key, value in self._journal.stats().items()})
+        return stats
+
+    async def start_journal(self) -> None:
+        """Startup hook: begin batched fsyncs of the WAL files."""
+        if self._journal is not None and self._fsync_task is None:
+            self._fsync_task = asyncio.create_task(self._journal.run_fsync_loop())
+
+    async def close_journal(self) -> None:
+        """Shutdown hook: stop the fsync loop and flush/close every WAL."""
+        if self._fsync_task is not None:
+            self._fsync_task.cancel()
+            self._fsync_task = None
+        if self._journal is not None:
+            # Final fsyncs and pending compactions hit the disk: keep them off the event loop
+            await asyncio.to_thread(self._journal.close)
 
     def _seed_defaults(self, store: TenantMemoryStore) -> None:
         # Seed a few meta objects so the UI is populated.
@@ -461,7 +1133,7 @@ class DataStore:
 
         # Simulate an initial widget so the containers render something
         initial_widget = WidgetPayload(
-            id=str(uuid4()),
+            id=store._new_id(),
             title="Vendas por Campanha",
             chartType="bar",
             objectId="obj_vendas_campanha",
@@ -477,7 +1149,7 @@ class DataStore:
             publishTargets=["DASHBOARD_INICIO", "MOD_VENDAS"],
         )
         dashboard = DashboardSaveRequest(
-            id=str(uuid4()),
+            id=store._new_id(),
             name="Painel Comercial",
             widgets=[initial_widget],
             ownerId="aline@nexuscrm.com",
@@ -598,10 +1270,10 @@ class DataStore:
             SegmentCreate(nome="Segmento Nordeste", regra="Contas da regiao Nordeste", tamanho=185)
         )
 
-        now = datetime.utcnow()
+        now = store._now()
         store.add_activity(
             ActivityItem(
-                id=str(uuid4()),
+                id=store._new_id(),
                 customer="Supermercado Lima",
                 action="Enviar proposta Platinum",
                 status="Em andamento",
@@ -611,7 +1283,7 @@ class DataStore:
         )
         store.add_activity(
             ActivityItem(
-                id=str(uuid4()),
+                id=store._new_id(),
                 customer="Rede Clinic+",
                 action="Agendar follow-up",
                 status="Aguardando cliente",
@@ -621,7 +1293,7 @@ class DataStore:
         )
         store.add_activity(
             ActivityItem(
-                id=str(uuid4()),
+                id=store._new_id(),
                 customer="Grupo Aurora",
                 action="Revisar metas do trimestre",
                 status="Planejado",
@@ -632,7 +1304,7 @@ class DataStore:
 
         store.add_trade_visit(
             TradeVisit(
-                id=str(uuid4()),
+                id=store._new_id(),
                 cliente="Rede Norte Atacado",
                 canal="Cash&Carry",
                 objetivo="Auditar ponta extra",
@@ -644,7 +1316,7 @@ class DataStore:
         )
         store.add_trade_visit(
             TradeVisit(
-                id=str(uuid4()),
+                id=store._new_id(),
                 cliente="Supermercado Lima",
                 canal="Varejo",
                 objetivo="Ativar degustacao premium",
@@ -657,7 +1329,7 @@ class DataStore:
 
         store.add_support_ticket(
             SupportTicket(
-                id=str(uuid4()),
+                id=store._new_id(),
                 cliente="Rede Clinic+",
                 canal="E-mail",
                 assunto="Integracao BI travada",
@@ -669,7 +1341,7 @@ class DataStore:
         )
         store.add_support_ticket(
             SupportTicket(
-                id=str(uuid4()),
+                id=store._new_id(),
                 cliente="Supermercado Lima",
                 canal="Portal",
                 assunto="Erro ao sincronizar contas",
@@ -736,4 +1408,15 @@ class DataStore:
         # Demo user seeding removed (legacy in-memory auth).
 
     
-data_store = DataStore()
+data_store = DataStore(
+    memory_budget_bytes=settings.data_store_memory_budget_mb * 1024 * 1024,
+    snapshot_path=settings.data_store_snapshot_path,
+    journal=StoreJournal(
+        settings.data_store_wal_dir,
+        shared=settings.data_store_wal_shared,
+        fsync_interval_ms=settings.data_store_wal_fsync_interval_ms,
+        compact_bytes=settings.data_store_wal_compact_bytes,
+    )
+    if settings.data_store_wal_dir
+    else None,
+)
@@ -0,0 +1,163 @@
+"""Tenant schema browser backed by cached Postgres catalog introspection."""
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# Tables, views, materialized views, partitioned and foreign tables
+_CATALOG_SQL = text(
+    """
+    SELECT c.relname AS table_name,
+           c.relkind::text AS kind,
+           GREATEST(c.reltuples, 0)::bigint AS row_estimate,
+           COALESCE((
+               SELECT json_agg(json_build_object(
+                          'nome', a.attname,
+                          'tipo', format_type(a.atttypid, a.atttypmod),
+                          'anulavel', NOT a.attnotnull
+                      ) ORDER BY a.attnum)
+               FROM pg_attribute a
+               WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+           ), '[]'::json) AS columns,
+           COALESCE((
+               SELECT json_agg(json_build_object(
+                          'nome', i.relname,
+                          'definicao', pg_get_indexdef(x.indexrelid),
+                          'unico', x.indisunique,
+                          'primario', x.indisprimary
+                      ) ORDER BY i.relname)
+               FROM pg_index x
+               JOIN pg_class i ON i.oid = x.indexrelid
+               WHERE x.indrelid = c.oid
+           ), '[]'::json) AS indexes
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    ORDER BY c.relname
+    """
+)
+
+# Changes whenever DDL touches the schema (new/altered/dropped relations or
+# columns), from any process, including out-of-band migrations. ANALYZE updates
+# pg_class in place and does not change it.
+_SIGNATURE_SQL = text(
+    """
+    SELECT (SELECT count(*)::text || ':' || COALESCE(max(c.xmin::text::bigint), 0)::text
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema)
+           || '/' ||
+           (SELECT count(*)::text || ':' || COALESCE(max(a.xmin::text::bigint), 0)::text
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema)
+    """
+)
+
+_KIND_LABELS = {"r": "TABLE", "p": "TABLE", "v": "VIEW", "m": "MATERIALIZED VIEW", "f": "FOREIGN TABLE"}
+
+
+def _json(value: Any) -> Any:
+    # asyncpg returns json columns as text
+    return json.loads(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class _CatalogEntry:
+    signature: str
+    tables: List[Dict[str, Any]]
+    loaded_at: float
+    checked_at: float
+
+
+class SchemaCatalogCache:
+    """Per tenant schema cache of catalog introspection results.
+
+    Tables are dicts shaped like ``app.models.TableSchema``.
+
+    Entries are served without any query for ``revalidate_seconds``; after that
+    a cheap catalog signature is compared and the full introspection only reruns
+    when DDL changed the schema (or after ``ttl_seconds``, which also refreshes
+    row estimates). The signature is the only invalidation that reaches every
+    worker, so provisioning (a separate process) does not call ``invalidate``.
+    """
+
+    def __init__(self, ttl_seconds: int, revalidate_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CatalogEntry]" = OrderedDict()
+        self.hits = 0
+        self.revalidations = 0
+        self.loads = 0
+
+    async def _signature(self, session: AsyncSession, schema: str) -> str:
+        return (await session.execute(_SIGNATURE_SQL, {"schema": schema})).scalar_one()
+
+    async def _load(self, session: AsyncSession, schema: str) -> List[Dict[str, Any]]:
+        result = await session.execute(_CATALOG_SQL, {"schema": schema})
+        return [
+            {
+                "nome": row["table_name"],
+                "tipo": _KIND_LABELS.get(row["kind"], row["kind"]),
+                "linhasEstimadas": int(row["row_estimate"]),
+                "colunas": _json(row["columns"]),
+                "indices": _json(row["indexes"]),
+            }
+            for row in result.mappings().all()
+        ]
+
+    async def get(self, session: AsyncSession, schema: str) -> List[Dict[str, Any]]:
+        now = time.time()
+        entry = self._entries.get(schema)
+        if entry is not None and now - entry.loaded_at < self.ttl_seconds:
+            if now - entry.checked_at < self.revalidate_seconds:
+                self.hits += 1
+                self._entries.move_to_end(schema)
+                return entry.tables
+            signature = await self._signature(session, schema)
+            if signature == entry.signature:
+                self.revalidations += 1
+                entry.checked_at = now
+                self._entries.move_to_end(schema)
+                return entry.tables
+        else:
+            signature = await self._signature(session, schema)
+
+        self.loads += 1
+        tables = await self._load(session, schema)
+        self._entries[schema] = _CatalogEntry(signature=signature, tables=tables, loaded_at=now, checked_at=now)
+        self._entries.move_to_end(schema)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return tables
+
+    def invalidate(self, schema: Optional[str] = None) -> None:
+        if schema is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(schema, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "loads": self.loads,
+        }
+
+
+schema_catalog_cache = SchemaCatalogCache(
+    ttl_seconds=settings.schema_catalog_ttl_seconds,
+    revalidate_seconds=settings.schema_catalog_revalidate_seconds,
+    max_entries=settings.schema_catalog_max_entries,
+)
@@ -1,113 +1,465 @@
 """Centralized SQL validation helpers for the Estudio SQL module."""
 from __future__ import annotations
 
+import csv
+import hashlib
+import io
+import json
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import time
-from typing import Any, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
 from fastapi import HTTPException, status
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-COMMENT_PATTERN = re.compile(r"(--.*?$)|(/\*.*?\*/)", re.MULTILINE | re.DOTALL)
-FORBIDDEN_COMMANDS = (
-    "INSERT",
-    "UPDATE",
-    "DELETE",
-    "DROP",
-    "ALTER",
-    "CREATE",
-    "TRUNCATE",
-    "GRANT",
-    "REVOKE",
-    "CALL",
-    "EXEC",
-    "PROCEDURE",
-    "SET SEARCH_PATH",
-    "COMMIT",
-    "ROLLBACK",
-    # Additional Postgres commands to block
-    "COPY",
-    "DO",
-    "SECURITY",
-    "ANALYZE",
-    "VACUUM",
-    "EXPLAIN",
+from app.core.config import settings
+from app.db.session import AsyncReadSessionLocal, AsyncSessionLocal, is_replica_session
+from app.db.utils import bootstrap_tenant_session, ensure_statement_timeout, tenant_schema_of
+from app.services.studio_cache import studio_result_cache
+from app.services.studio_limiter import studio_limiter
+
+FORBIDDEN_COMMANDS = frozenset(
+    {
+        "INSERT",
+        "UPDATE",
+        "DELETE",
+        "DROP",
+        "ALTER",
+        "CREATE",
+        "TRUNCATE",
+        "GRANT",
+        "REVOKE",
+        "CALL",
+        "EXEC",
+        "PROCEDURE",
+        "COMMIT",
+        "ROLLBACK",
+        # Additional Postgres commands to block
+        "COPY",
+        "DO",
+        "SECURITY",
+        "ANALYZE",
+        "VACUUM",
+        "EXPLAIN",
+        # SELECT ... INTO creates a table
+        "INTO",
+    }
+)
+# Keyword pairs blocked only when adjacent (e.g. SET SEARCH_PATH)
+FORBIDDEN_SEQUENCES = frozenset({("SET", "SEARCH_PATH")})
+# Functions/keywords whose result changes between runs; queries using them are never cached
+VOLATILE_FUNCTIONS = frozenset(
+    {
+        "NOW",
+        "CURRENT_DATE",
+        "CURRENT_TIME",
+        "CURRENT_TIMESTAMP",
+        "LOCALTIME",
+        "LOCALTIMESTAMP",
+        "CLOCK_TIMESTAMP",
+        "STATEMENT_TIMESTAMP",
+        "TRANSACTION_TIMESTAMP",
+        "TIMEOFDAY",
+        "AGE",
+        "RANDOM",
+        "RANDOM_NORMAL",
+        "SETSEED",
+        "GEN_RANDOM_UUID",
+        "UUID_GENERATE_V4",
+        "NEXTVAL",
+        "CURRVAL",
+        "LASTVAL",
+        "SETVAL",
+        "TXID_CURRENT",
+        "TXID_CURRENT_IF_ASSIGNED",
+        "TXID_CURRENT_SNAPSHOT",
+        "PG_CURRENT_XACT_ID",
+        "PG_CURRENT_SNAPSHOT",
+        "PG_BACKEND_PID",
+        "PG_POSTMASTER_START_TIME",
+        "INET_CLIENT_ADDR",
+        "CURRENT_SETTING",
+        "PG_SLEEP",
+    }
 )
+# Date/time input strings resolved when the query runs (e.g. 'now'::timestamp)
+VOLATILE_LITERALS = frozenset({"'now'", "'today'", "'tomorrow'", "'yesterday'"})
+# Plan nodes reading outside the tables the plan names (set-returning functions, FDWs)
+OPAQUE_PLAN_NODES = frozenset({"Function Scan", "Table Function Scan", "Foreign Scan", "Custom Scan"})
+
+_WORD = re.compile(r"[^\W\d][\w$]*")
+_NUMBER = re.compile(r"\d[\w.]*")
+_DOLLAR_TAG = re.compile(r"\$(?:[^\W\d]\w*)?\$")
+_PARAM = re.compile(r"\$\d+")
+
+# Token kinds
+WORD = "word"
+QUOTED = "quoted"
+LITERAL = "literal"
+PUNCT = "punct"
+
+
+@dataclass(slots=True)
+class PlanEstimate:
+    total_cost: float
+    plan_rows: float
+    # Tables the plan reads (views already expanded to their base tables)
+    relations: tuple[str, ...] = ()
+    # True when some node reads data the relations above do not cover
+    opaque: bool = False
 
 
 @dataclass(slots=True)
 class SQLValidationResult:
     normalized_query: str
     rows_affected: int
-    sample_rows: List[dict[str, Any]]
     execution_time_ms: int
+    # Column names plus row tuples; dicts are only built for JSON (see sample_rows)
+    columns: List[str] = field(default_factory=list)
+    rows: Sequence[Sequence[Any]] = ()
+    plan: Optional[PlanEstimate] = None
+    # True when the planner cost exceeded the interactive limit; nothing was executed
+    routed_to_job: bool = False
+    # True when rows came from the per-tenant result cache
+    cache_hit: bool = False
 
+    @property
+    def sample_rows(self) -> List[dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
 
-def _strip_comments(query: str) -> str:
-    return COMMENT_PATTERN.sub(" ", query)
 
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
-def _normalize_query(raw_query: str) -> str:
-    if not raw_query or not raw_query.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A consulta SQL nao pode ser vazia.",
-        )
 
-    normalized = raw_query.strip()
-    if not normalized.endswith(";"):
-        normalized = f"{normalized};"
-    return normalized
+def _unterminated() -> HTTPException:
+    return _bad_request("Literal, identificador ou comentario SQL nao terminado.")
 
 
-def _ensure_single_statement(query: str) -> None:
-    body = query.rstrip(";")
-    if ";" in body:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Envie apenas uma instrucao SQL por vez.",
-        )
+def _skip_quoted(sql: str, pos: int, quote: str) -> int:
+    """Return the index after a quoted run starting at ``pos`` (doubled quote escapes)."""
+    i = pos + 1
+    while True:
+        i = sql.find(quote, i)
+        if i < 0:
+            raise _unterminated()
+        if sql.startswith(quote, i + 1):
+            i += 2
+            continue
+        return i + 1
 
 
-def _ensure_no_forbidden_keywords(query: str) -> None:
-    normalized = re.sub(r"\s+", " ", _strip_comments(query).upper())
-    for keyword in FORBIDDEN_COMMANDS:
-        pattern = rf"\b{re.escape(keyword)}\b"
-        if re.search(pattern, normalized):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Comando SQL proibido detectado. Apenas SELECT/CTE sao permitidos.",
-            )
+def _skip_escape_string(sql: str, pos: int) -> int:
+    """Return the index after an E'...' literal, honoring backslash escapes."""
+    i = pos + 1
+    n = len(sql)
+    while i < n:
+        c = sql[i]
+        if c == "\\":
+            i += 2
+        elif c == "'":
+            if i + 1 < n and sql[i + 1] == "'":
+                i += 2
+            else:
+                return i + 1
+        else:
+            i += 1
+    raise _unterminated()
 
 
-def _ensure_select_statement(query: str) -> None:
-    stripped = _strip_comments(query).strip()
-    upper = stripped.upper()
-    if not (upper.startswith("SELECT") or upper.startswith("WITH")):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A consulta deve comecar com SELECT ou WITH.",
-        )
+def _skip_block_comment(sql: str, pos: int) -> int:
+    """Return the index after a (possibly nested) /* ... */ comment."""
+    depth = 0
+    i = pos
+    n = len(sql)
+    while i < n:
+        if sql.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif sql.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    raise _unterminated()
+
+
+def tokenize(sql: str) -> List[tuple[str, str, int]]:
+    """Single-pass SQL tokenizer returning ``(kind, value, end_offset)`` tuples.
+
+    Comments and whitespace are dropped; string literals, dollar-quoted bodies
+    and quoted identifiers become opaque tokens (keeping their raw text) so
+    their contents are never mistaken for keywords. Unquoted words are
+    upper-cased.
+    """
+    tokens: List[tuple[str, str, int]] = []
+    i = 0
+    n = len(sql)
+    while i < n:
+        c = sql[i]
+        if c.isspace():
+            i += 1
+        elif c == "-" and sql.startswith("--", i):
+            nl = sql.find("\n", i)
+            i = n if nl < 0 else nl + 1
+        elif c == "/" and sql.startswith("/*", i):
+            i = _skip_block_comment(sql, i)
+        elif c == "'":
+            end = _skip_quoted(sql, i, "'")
+            tokens.append((LITERAL, sql[i:end], end))
+            i = end
+        elif c == '"':
+            end = _skip_quoted(sql, i, '"')
+            tokens.append((QUOTED, sql[i + 1 : end - 1].replace('""', '"'), end))
+            i = end
+        elif c == "$":
+            tag = _DOLLAR_TAG.match(sql, i)
+            if tag:
+                close = sql.find(tag.group(0), tag.end())
+                if close < 0:
+                    raise _unterminated()
+                end = close + len(tag.group(0))
+                tokens.append((LITERAL, sql[i:end], end))
+                i = end
+            else:
+                param = _PARAM.match(sql, i)
+                end = param.end() if param else i + 1
+                tokens.append((PUNCT, sql[i:end], end))
+                i = end
+        elif c.isdigit():
+            end = _NUMBER.match(sql, i).end()
+            tokens.append((LITERAL, sql[i:end], end))
+            i = end
+        else:
+            word = _WORD.match(sql, i)
+            if word is None:
+                i += 1
+                tokens.append((PUNCT, c, i))
+                continue
+            start, i = i, word.end()
+            value = word.group(0).upper()
+            if i < n and sql[i] == "'" and value == "E":
+                i = _skip_escape_string(sql, i)
+                tokens.append((LITERAL, sql[start:i], i))
+            else:
+                tokens.append((WORD, value, i))
+    return tokens
+
+
+def _statement_length(tokens: List[tuple[str, str, int]]) -> int:
+    """Number of tokens before the trailing semicolons."""
+    last = len(tokens)
+    while last and tokens[last - 1][:2] == (PUNCT, ";"):
+        last -= 1
+    return last
+
+
+def _validate_tokens(tokens: List[tuple[str, str, int]]) -> int:
+    """Validate a token stream; return the offset where the statement body ends."""
+    # Trailing semicolons are allowed, anything after a semicolon is not
+    last = _statement_length(tokens)
+    if last == 0:
+        raise _bad_request("A consulta SQL nao pode ser vazia.")
+
+    previous = None
+    for kind, value, _ in tokens[:last]:
+        if kind == PUNCT and value == ";":
+            raise _bad_request("Envie apenas uma instrucao SQL por vez.")
+        if kind == WORD:
+            if value in FORBIDDEN_COMMANDS or (previous, value) in FORBIDDEN_SEQUENCES:
+                raise _bad_request("Comando SQL proibido detectado. Apenas SELECT/CTE sao permitidos.")
+            previous = value
+        else:
+            previous = None
+
+    first_kind, first_value, _ = tokens[0]
+    if first_kind != WORD or first_value not in ("SELECT", "WITH"):
+        raise _bad_request("A consulta deve comecar com SELECT ou WITH.")
+    return tokens[last - 1][2]
+
+
+@dataclass(slots=True, frozen=True)
+class ValidatedQuery:
+    body: str
+    # Hash of the token stream: ignores whitespace, comments and keyword case
+    fingerprint: str
+    # Every identifier the statement mentions (a superset of the tables it reads)
+    tables: tuple[str, ...]
+    # Calls a VOLATILE_FUNCTIONS entry or uses a VOLATILE_LITERALS value
+    volatile: bool = False
+
+
+def _analyze_tokens(raw: str, tokens: List[tuple[str, str, int]]) -> ValidatedQuery:
+    end = _validate_tokens(tokens)
+    statement = tokens[: _statement_length(tokens)]
+    digest = hashlib.sha256()
+    names = set()
+    volatile = False
+    for kind, value, _ in statement:
+        digest.update(f"{kind}\x1f{value}\x1e".encode("utf-8"))
+        if kind == WORD:
+            names.add(value.lower())
+            volatile = volatile or value in VOLATILE_FUNCTIONS
+        elif kind == QUOTED:
+            names.add(value)
+        elif kind == LITERAL:
+            volatile = volatile or value.lower() in VOLATILE_LITERALS
+    return ValidatedQuery(
+        body=raw[:end],
+        fingerprint=digest.hexdigest(),
+        tables=tuple(sorted(names)),
+        volatile=volatile,
+    )
+
+
+class ValidatedQueryCache:
+    """LRU of raw query hashes that already passed validation.
+
+    Only successful validations are stored, so a hit can safely skip the
+    tokenizer; the value is the analyzed statement.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ValidatedQuery]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[ValidatedQuery]:
+        query = self._entries.get(key)
+        if query is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return query
+
+    def set(self, key: str, query: ValidatedQuery) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = query
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+validated_query_cache = ValidatedQueryCache(max_entries=settings.sql_guard_cache_max_entries)
+
+
+def analisar_sql(query_bruta: str) -> ValidatedQuery:
+    """Validate a SQL Studio query and return its body, fingerprint and referenced names.
+
+    Raises HTTPException(400) when the query is not a single SELECT/CTE.
+    """
+    raw = (query_bruta or "").strip()
+    if not raw:
+        raise _bad_request("A consulta SQL nao pode ser vazia.")
+
+    key = validated_query_cache.fingerprint(raw)
+    query = validated_query_cache.get(key)
+    if query is None:
+        query = _analyze_tokens(raw, tokenize(raw))
+        validated_query_cache.set(key, query)
+    return query
+
+
+def validar_sql(query_bruta: str) -> str:
+    """Validate a SQL Studio query and return its body without trailing semicolons/comments."""
+    return analisar_sql(query_bruta).body
+
+
+def limites_de_custo(tenant_id: Optional[str]) -> tuple[float, float]:
+    """Return (interactive, job) planner cost ceilings for a tenant."""
+    interactive = settings.sql_studio_max_plan_cost
+    job = settings.sql_studio_job_max_plan_cost
+    if tenant_id:
+        interactive = settings.sql_studio_tenant_max_plan_cost.get(tenant_id, interactive)
+        job = settings.sql_studio_tenant_job_max_plan_cost.get(tenant_id, job)
+    return interactive, job
+
+
+async def estimar_plano(session: AsyncSession, sql: str) -> PlanEstimate:
+    """Ask the planner (EXPLAIN without ANALYZE, nothing is executed) for cost and rows.
+
+    ``sql`` must already be validated; user-supplied EXPLAIN stays forbidden.
+    """
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    relations = set()
+    opaque = False
+    nodes = [root]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        opaque = opaque or node.get("Node Type") in OPAQUE_PLAN_NODES
+        nodes.extend(node.get("Plans", ()))
+    return PlanEstimate(
+        total_cost=float(root["Total Cost"]),
+        plan_rows=float(root["Plan Rows"]),
+        relations=tuple(sorted(relations)),
+        opaque=opaque,
+    )
+
+
+def custo_excedido(plan: PlanEstimate, limit: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=(
+            f"Consulta rejeitada: custo estimado {plan.total_cost:.0f} "
+            f"(~{plan.plan_rows:.0f} linhas) acima do limite {limit:.0f}."
+        ),
+    )
 
 
 async def validar_e_executar_sql_seguro(
     query_bruta: str,
     session: AsyncSession | None = None,
+    *,
+    tenant_id: Optional[str] = None,
 ) -> SQLValidationResult:
     """
     Multi-layer SQL guard used by the Estudio SQL routes.
 
-    The function validates that the statement is a single SELECT/CTE,
-    blocks destructive keywords and (in the future) will execute the
-    query using the tenant-scoped AsyncSession.
+    The statement is tokenized once (quotes, dollar-quoting and comments
+    aware) to ensure it is a single SELECT/CTE without destructive keywords.
+    Results are served from the per-tenant result cache while the tables the
+    query reads are unchanged; only primary reads of app-written tables
+    without volatile functions are cached (see StudioResultCache). Otherwise a per-tenant/global concurrency
+    slot is taken (see studio_limiter) and the planner cost of the capped
+    query is checked against the tenant limits: above the job ceiling it is
+    rejected (422), above the interactive one it is not executed and
+    ``routed_to_job`` is set. Remaining queries run on the tenant-scoped
+    AsyncSession capped to 100 rows.
     """
 
-    normalized = _normalize_query(query_bruta)
-    _ensure_single_statement(normalized)
-    _ensure_no_forbidden_keywords(normalized)
-    _ensure_select_statement(normalized)
+    query = analisar_sql(query_bruta)
+    body = query.body
+    normalized = f"{body};"
 
     if session is None:
         # Defensive fallback
@@ -116,26 +468,143 @@ async def validar_e_executar_sql_seguro(
             detail="Sessao de banco nao configurada.",
         )
 
-    # Enforce a local statement timeout (defensive; also set in dependency)
-    try:
-        await session.execute(text("SET LOCAL statement_timeout = 3000"))
-    except Exception:
-        pass
+    schema = tenant_schema_of(session)
+    # A lagging replica can return rows older than the version snapshot, and
+    # volatile functions change on every run: neither may be cached
+    cacheable = bool(schema) and not query.volatile and not is_replica_session(session)
+    if cacheable:
+        cached = await studio_result_cache.get(session, schema, query.fingerprint)
+        if cached is not None:
+            return SQLValidationResult(
+                normalized_query=normalized,
+                rows_affected=0,
+                execution_time_ms=0,
+                columns=cached.columns,
+                rows=cached.rows,
+                cache_hit=True,
+            )
+
+    # Fair per-tenant/global queue in front of the database work (429 when saturated)
+    async with studio_limiter.slot(tenant_id or schema or ""):
+        # Enforce a local statement timeout (defensive; skipped when the dependency already set it)
+        try:
+            await ensure_statement_timeout(session)
+        except Exception:
+            pass
+
+        # Wrap the query to cap results to 100 rows
+        capped_query = f"SELECT * FROM ( {body} ) AS q LIMIT 100"
+
+        plan = await estimar_plano(session, capped_query)
+        interactive_limit, job_limit = limites_de_custo(tenant_id)
+        if plan.total_cost > job_limit:
+            raise custo_excedido(plan, job_limit)
+        if plan.total_cost > interactive_limit:
+            return SQLValidationResult(
+                normalized_query=normalized,
+                rows_affected=0,
+                execution_time_ms=0,
+                plan=plan,
+                routed_to_job=True,
+            )
 
-    # Wrap the query to cap results to 100 rows
-    capped_query = f"SELECT * FROM ( {normalized.rstrip(';')} ) AS q LIMIT 100;"
+        cacheable = cacheable and not plan.opaque and studio_result_cache.cacheable(plan.relations)
+        if cacheable:
+            # Snapshot before executing so a write committed meanwhile invalidates the entry
+            versions = await studio_result_cache.versions(session, schema, plan.relations)
 
-    start = time.perf_counter()
-    result = await session.execute(text(capped_query))
-    rows = result.mappings().all()
-    elapsed_ms = int((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        result = await session.execute(text(capped_query))
+        columns = list(result.keys())
+        rows = result.all()
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
 
-    # Convert to plain dicts
-    sample_rows = [dict(r) for r in rows]
+    if cacheable:
+        studio_result_cache.set(schema, query.fingerprint, plan.relations, versions, columns, rows)
 
     return SQLValidationResult(
         normalized_query=normalized,
         rows_affected=0,
-        sample_rows=sample_rows,
         execution_time_ms=elapsed_ms,
+        columns=columns,
+        rows=rows,
+        plan=plan,
     )
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+
+async def exportar_sql_seguro(
+    body: str, tenant_schema: str, fmt: str = "ndjson", *, tenant_id: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """Stream a validated query (see validar_sql) as NDJSON or CSV chunks.
+
+    Runs on its own session because the request-scoped one is closed before a
+    StreamingResponse body is sent. Like /query/test it holds a studio_limiter
+    slot (for the whole stream) and gets the SQL-safe bootstrap (tenant-only
+    search_path and statement_timeout); since an export has no row cap, the
+    planner cost is checked against the tenant's job ceiling instead of the
+    interactive one (422 above it). Rows are fetched through a server-side
+    cursor in chunks of ``sql_studio_export_chunk_rows``, so memory stays flat
+    whatever the row count. The body only ever runs as a subquery.
+    """
+    session_factory = AsyncReadSessionLocal or AsyncSessionLocal
+    chunk_rows = max(1, settings.sql_studio_export_chunk_rows)
+    async with studio_limiter.slot(tenant_id or tenant_schema), session_factory() as session:
+        await bootstrap_tenant_session(session, tenant_schema, sql_safe=True)
+        query = f"SELECT * FROM ( {body} ) AS q"
+        plan = await estimar_plano(session, query)
+        _, job_limit = limites_de_custo(tenant_id)
+        if plan.total_cost > job_limit:
+            raise custo_excedido(plan, job_limit)
+        result = await session.stream(text(query))
+        try:
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(result.keys())
+                async for partition in result.partitions(chunk_rows):
+                    writer.writerows([_csv_value(v) for v in row] for row in partition)
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                if buffer.tell():
+                    yield buffer.getvalue().encode("utf-8")
+            else:
+                async for partition in result.mappings().partitions(chunk_rows):
+                    yield "".join(
+                        json.dumps(dict(row), default=str, ensure_ascii=False) + "\n" for row in partition
+                    ).encode("utf-8")
+        finally:
+            await result.close()
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+
+async def iniciar_exportacao(
+    body: str, tenant_schema: str, fmt: str = "ndjson", *, tenant_id: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """Start exportar_sql_seguro and wait for its first chunk before any response is sent.
+
+    Errors raised while planning or starting the query (syntax, permissions,
+    statement_timeout before the first rows) become a 400 instead of a 200 with
+    a truncated file, and a full Studio queue or a cost above the job ceiling
+    keep their 429/422. A failure further into the stream aborts the transfer.
+    """
+    chunks = exportar_sql_seguro(body, tenant_schema, fmt, tenant_id=tenant_id)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except DBAPIError as exc:
+        await chunks.aclose()
+        raise _bad_request(f"Erro ao executar a consulta: {exc.orig}") from None
+    return _prepend(first, chunks)
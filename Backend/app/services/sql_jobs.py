@@ -0,0 +1,234 @@
+"""Asynchronous SQL Studio jobs: submit, poll, paginate and cancel.
+
+Jobs run on the dedicated Studio pool (``app.db.session.studio_engine``) with a
+longer statement_timeout than the interactive endpoint, and while running hold
+a ``studio_limiter`` slot like every other Studio query (a job that cannot get
+one within the queue timeout fails with the limiter's message). Results stay in this
+worker's memory until ``sql_studio_job_ttl_seconds`` after completion, or until
+finished jobs together hold more than ``sql_studio_job_max_retained_rows`` rows,
+when the oldest are dropped first. Polling must reach the worker that accepted
+the job.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.db.session import StudioSessionLocal, studio_engine
+from app.db.utils import bootstrap_job_session
+from app.services.sql_guard import custo_excedido, estimar_plano, limites_de_custo
+from app.services.studio_limiter import studio_limiter
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+_FINISHED = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+
+@dataclass(slots=True)
+class SQLJob:
+    job_id: str
+    tenant_id: str
+    tenant_schema: str
+    query: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    columns: List[str] = field(default_factory=list)
+    rows: List[Any] = field(default_factory=list)
+    truncated: bool = False
+    error: Optional[str] = None
+    backend_pid: Optional[int] = None
+    cancel_requested: bool = False
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    @property
+    def execution_time_ms(self) -> Optional[int]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return int((end - self.started_at) * 1000)
+
+    def page(self, offset: int, limit: int) -> List[dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows[offset : offset + limit]]
+
+
+class SQLJobManager:
+    """In-process registry of Studio jobs with global and per-tenant concurrency caps."""
+
+    def __init__(
+        self, pool_size: int, max_per_tenant: int, max_rows: int, ttl_seconds: int, max_retained_rows: int
+    ) -> None:
+        self.pool_size = pool_size
+        self.max_per_tenant = max_per_tenant
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self.max_retained_rows = max_retained_rows
+        self._jobs: Dict[str, SQLJob] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.submitted = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished and job.finished_at is not None),
+            key=lambda job: job.finished_at,
+        )
+        retained = sum(len(job.rows) for job in finished)
+        for job in finished:
+            if retained <= self.max_retained_rows:
+                break
+            retained -= len(job.rows)
+            del self._jobs[job.job_id]
+            self.evicted += 1
+
+    def _active_for(self, tenant_id: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.tenant_id == tenant_id and not job.finished)
+
+    def submit(self, tenant_id: str, tenant_schema: str, body: str) -> SQLJob:
+        """Queue an already validated query (see validar_sql) for background execution."""
+        self._purge()
+        if self._active_for(tenant_id) >= self.max_per_tenant:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Limite de consultas em andamento atingido para o tenant.",
+            )
+        job = SQLJob(job_id=str(uuid4()), tenant_id=tenant_id, tenant_schema=tenant_schema, query=body)
+        self._jobs[job.job_id] = job
+        self.submitted += 1
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, tenant_id: str, job_id: str) -> SQLJob:
+        self._purge()
+        job = self._jobs.get(job_id)
+        if job is None or job.tenant_id != tenant_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job nao encontrado.")
+        return job
+
+    async def cancel(self, job: SQLJob) -> SQLJob:
+        """Cancel a job: its task always, and the running statement with pg_cancel_backend.
+
+        The task cancellation covers every point between statements (queued,
+        bootstrapping, planning), where pg_cancel_backend would find nothing to
+        cancel; _run also re-checks ``cancel_requested`` before executing.
+        """
+        if job.finished:
+            return job
+        job.cancel_requested = True
+        pid = job.backend_pid
+        if pid is not None:
+            async with studio_engine.connect() as conn:
+                # The job may have released its connection while we waited for ours
+                if job.backend_pid == pid and not job.finished:
+                    await conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+        if job.task is not None and not job.finished:
+            job.task.cancel()
+        return job
+
+    async def _run(self, job: SQLJob) -> None:
+        try:
+            # Job pool first, then the Studio-wide slot shared with /query/test and exports
+            async with self._semaphore(), studio_limiter.slot(job.tenant_id):
+                job.status = RUNNING
+                job.started_at = time.time()
+                async with StudioSessionLocal() as session:
+                    try:
+                        job.backend_pid = await bootstrap_job_session(
+                            session, job.tenant_schema, settings.sql_studio_job_statement_timeout_ms
+                        )
+                        if job.cancel_requested:
+                            raise asyncio.CancelledError
+                        # One extra row tells whether the result was truncated
+                        capped_query = f"SELECT * FROM ( {job.query} ) AS q LIMIT {self.max_rows + 1}"
+                        plan = await estimar_plano(session, capped_query)
+                        _, job_limit = limites_de_custo(job.tenant_id)
+                        if plan.total_cost > job_limit:
+                            raise custo_excedido(plan, job_limit)
+                        if job.cancel_requested:
+                            raise asyncio.CancelledError
+                        result = await session.execute(text(capped_query))
+                        rows = result.all()
+                        job.columns = list(result.keys())
+                        job.truncated = len(rows) > self.max_rows
+                        job.rows = rows[: self.max_rows]
+                        job.status = SUCCEEDED
+                    finally:
+                        # Before the connection goes back to the pool, where the pid may soon
+                        # belong to another tenant's job
+                        job.backend_pid = None
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except DBAPIError as exc:
+            if job.cancel_requested:
+                job.status = CANCELLED
+            else:
+                job.status = FAILED
+                job.error = str(exc.orig)
+        except HTTPException as exc:
+            job.status = FAILED
+            job.error = exc.detail
+        except Exception as exc:
+            job.status = FAILED
+            job.error = str(exc)
+        finally:
+            job.finished_at = time.time()
+            self._purge()
+
+    def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0}
+        for job in self._jobs.values():
+            if job.status in counts:
+                counts[job.status] += 1
+        return {
+            "jobs": len(self._jobs),
+            "queued": counts[QUEUED],
+            "running": counts[RUNNING],
+            "pool_size": self.pool_size,
+            "max_per_tenant": self.max_per_tenant,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "retained_rows": sum(len(job.rows) for job in self._jobs.values() if job.finished),
+        }
+
+
+sql_jobs = SQLJobManager(
+    pool_size=settings.sql_studio_job_pool_size,
+    max_per_tenant=settings.sql_studio_job_max_per_tenant,
+    max_rows=settings.sql_studio_job_max_rows,
+    ttl_seconds=settings.sql_studio_job_ttl_seconds,
+    max_retained_rows=settings.sql_studio_job_max_retained_rows,
+)
@@ -0,0 +1,386 @@
+"""Write-ahead log and compacted snapshots backing the in-memory DataStore.
+
+Each tenant gets a subdirectory of the journal directory (named after the
+url-quoted tenant id), so recovering one tenant never lists the others:
+
+    <gen>.wal    append-only mutations, replayed in generation order
+    <gen>.snap   compacted state covering every WAL before <gen> (gen 0 has none)
+    lock         flock target serialising writers in shared mode
+
+plus seed.time at the top level, the clock reading every worker and restart
+builds the seed template from, so seeded records replay identically.
+
+A WAL record is a 4-byte length, a 4-byte crc32 and the payload. Recovery
+loads the newest snapshot and replays every WAL from its generation up,
+stopping at the first torn or corrupt record and truncating the tail, so a
+crash mid-append loses at most that record.
+
+Nothing on the request path waits for the disk: appends reach the page cache
+immediately (they survive a process crash), and run_fsync_loop fsyncs them in
+batches, closes WALs retired by compaction or eviction, and finishes
+compactions in a worker thread. Compaction switches writers to the next WAL
+generation at once; the snapshot is fsynced and renamed into place later, and
+only then are the files it replaces deleted.
+
+The journal only deals in opaque payloads; TenantMemoryStore decides what a
+mutation or a snapshot looks like.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
+import zlib
+
+try:  # POSIX only; needed for the multi-worker shared mode
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev machines
+    fcntl = None  # type: ignore[assignment]
+
+
+_HEADER = struct.Struct("<II")
+_BINARY = getattr(os, "O_BINARY", 0)
+
+
+@dataclass(slots=True)
+class _TenantLog:
+    gen: int
+    fd: int
+    # Bytes of the current WAL already applied to the in-memory store
+    offset: int
+    snapshot_bytes: int = 0
+
+
+@dataclass(slots=True)
+class _PendingCompaction:
+    tenant_id: str
+    gen: int
+    snapshot: bytes
+
+
+class StoreJournal:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        shared: bool = False,
+        fsync_interval_ms: int = 50,
+        compact_bytes: int = 1024 * 1024,
+    ) -> None:
+        if shared and fcntl is None:
+            raise RuntimeError("Shared DataStore journal requires POSIX file locks (fcntl)")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shared = shared
+        self._fsync_interval = fsync_interval_ms / 1000
+        self._compact_bytes = compact_bytes
+        self._logs: Dict[str, _TenantLog] = {}
+        # Background work handed over by the request path, guarded by _dirty_lock
+        self._dirty: set[int] = set()
+        # Taken by the running sync(); closing one of these is deferred like a dirty one
+        self._syncing: set[int] = set()
+        self._retired: List[int] = []
+        self._pending: List[_PendingCompaction] = []
+        self._dirty_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # Serialises the compaction thread's renames/unlinks with open() in this process
+        self._files_lock = threading.Lock()
+        self._held: set[str] = set()
+        self._appends = 0
+        self._fsyncs = 0
+        self._compactions = 0
+        self._replayed = 0
+        self._torn_tails = 0
+        self._stale_reloads = 0
+
+    # Paths ------------------------------------------------------------
+    def _tenant_dir(self, tenant_id: str) -> str:
+        return os.path.join(self.directory, quote(tenant_id, safe=""))
+
+    def _wal_path(self, tenant_id: str, gen: int) -> str:
+        return os.path.join(self._tenant_dir(tenant_id), f"{gen}.wal")
+
+    def _snap_path(self, tenant_id: str, gen: int) -> str:
+        return os.path.join(self._tenant_dir(tenant_id), f"{gen}.snap")
+
+    def _generations(self, tenant_id: str) -> tuple[List[int], List[int]]:
+        """Sorted (snapshot, WAL) generations on disk for a tenant."""
+        snaps: List[int] = []
+        wals: List[int] = []
+        try:
+            names = os.listdir(self._tenant_dir(tenant_id))
+        except FileNotFoundError:
+            return snaps, wals
+        for name in names:
+            gen, _, suffix = name.partition(".")
+            if not gen.isdigit():
+                continue
+            if suffix == "snap":
+                snaps.append(int(gen))
+            elif suffix == "wal":
+                wals.append(int(gen))
+        return sorted(snaps), sorted(wals)
+
+    def seed_time(self) -> datetime:
+        """Seed template clock, fixed the first time any worker opens the directory."""
+        path = os.path.join(self.directory, "seed.time")
+        if not os.path.exists(path):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(datetime.utcnow().isoformat())
+                fh.flush()
+                os.fsync(fh.fileno())
+            try:
+                # link() is atomic and refuses to overwrite: the first worker wins
+                os.link(tmp, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(tmp)
+        with open(path, encoding="utf-8") as fh:
+            return datetime.fromisoformat(fh.read().strip())
+
+    # Locking ----------------------------------------------------------
+    def _flock_fd(self, tenant_id: str) -> int:
+        os.makedirs(self._tenant_dir(tenant_id), exist_ok=True)
+        fd = os.open(os.path.join(self._tenant_dir(tenant_id), "lock"), os.O_RDWR | os.O_CREAT | _BINARY, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    @contextmanager
+    def _flock(self, tenant_id: str) -> Iterator[None]:
+        if tenant_id in self._held:
+            # Re-entered by a write that reloads after another worker compacted;
+            # flock on a second descriptor would wait on our own lock forever
+            yield
+            return
+        fd = self._flock_fd(tenant_id)
+        try:
+            self._held.add(tenant_id)
+            yield
+        finally:
+            self._held.discard(tenant_id)
+            os.close(fd)
+
+    def lock(self, tenant_id: str):
+        """Exclusive per-tenant writer lock across workers (no-op unless shared)."""
+        return self._flock(tenant_id) if self.shared else nullcontext()
+
+    # Reading ----------------------------------------------------------
+    def _read_records(self, path: str, offset: int) -> tuple[List[bytes], int, bool]:
+        """Complete records after offset, the offset past the last one, and whether bytes remain."""
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return [], offset, False
+        records: List[bytes] = []
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, pos)
+            end = pos + _HEADER.size + length
+            if end > len(data):
+                break
+            payload = data[pos + _HEADER.size:end]
+            if zlib.crc32(payload) != crc:
+                break
+            records.append(payload)
+            pos = end
+        return records, offset + pos, pos < len(data)
+
+    def _open_wal(self, tenant_id: str, gen: int) -> int:
+        return os.open(self._wal_path(tenant_id, gen), os.O_WRONLY | os.O_APPEND | os.O_CREAT | _BINARY, 0o600)
+
+    def open(self, tenant_id: str) -> tuple[Optional[bytes], List[bytes]]:
+        """Recover a tenant: (latest snapshot payload or None, WAL payloads to replay after it)."""
+        self.forget(tenant_id)
+        os.makedirs(self._tenant_dir(tenant_id), exist_ok=True)
+        with self.lock(tenant_id), self._files_lock:
+            snaps, wals = self._generations(tenant_id)
+            gen = snaps[-1] if snaps else 0
+            snapshot = None
+            if snaps:
+                with open(self._snap_path(tenant_id, gen), "rb") as fh:
+                    snapshot = fh.read()
+            # Leftovers of a compaction interrupted after the new snapshot landed
+            for old in snaps[:-1]:
+                os.unlink(self._snap_path(tenant_id, old))
+            for old in wals:
+                if old < gen:
+                    os.unlink(self._wal_path(tenant_id, old))
+
+            # A compaction not finished yet leaves several WALs after the snapshot
+            records: List[bytes] = []
+            end = 0
+            live = gen
+            for live in [w for w in wals if w >= gen] or [gen]:
+                path = self._wal_path(tenant_id, live)
+                found, end, torn = self._read_records(path, 0)
+                if torn:
+                    # Safe under the writer lock (or single writer): nobody is mid-append
+                    self._torn_tails += 1
+                    os.truncate(path, end)
+                records.extend(found)
+            fd = self._open_wal(tenant_id, live)
+            self._logs[tenant_id] = _TenantLog(gen=live, fd=fd, offset=end, snapshot_bytes=len(snapshot or b""))
+        self._replayed += len(records)
+        return snapshot, records
+
+    def is_live(self, tenant_id: str) -> bool:
+        """True while the tenant's open WAL is still the one writers append to.
+
+        Another worker's compaction makes it stale: a newer WAL or snapshot
+        generation appears, and the old WAL is unlinked (possibly several
+        generations ago if this worker was idle meanwhile).
+        """
+        log = self._logs.get(tenant_id)
+        if log is None:
+            return False
+        try:
+            if os.fstat(log.fd).st_nlink == 0:
+                return False
+        except OSError:
+            return False
+        snaps, wals = self._generations(tenant_id)
+        return log.gen in wals and wals[-1] == log.gen and (not snaps or snaps[-1] <= log.gen)
+
+    def read_new(self, tenant_id: str, *, locked: bool = False) -> Optional[List[bytes]]:
+        """Records other workers appended since the last read; None when the store must reload."""
+        if not self.is_live(tenant_id):
+            self._stale_reloads += 1
+            return None
+        log = self._logs[tenant_id]
+        path = self._wal_path(tenant_id, log.gen)
+        records, end, torn = self._read_records(path, log.offset)
+        if torn and locked:
+            # A writer died mid-record; holding the lock means nobody is still writing it
+            self._torn_tails += 1
+            os.truncate(path, end)
+        log.offset = end
+        self._replayed += len(records)
+        return records
+
+    # Writing ----------------------------------------------------------
+    def append(self, tenant_id: str, payload: bytes) -> None:
+        """Append a record (caller holds lock() and, in shared mode, has caught up)."""
+        log = self._logs.get(tenant_id)
+        if log is None or (self.shared and not self.is_live(tenant_id)):
+            # Writing to a closed or superseded WAL would lose the record silently
+            raise RuntimeError(f"WAL for tenant {tenant_id!r} is not open or no longer current")
+        frame = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        os.write(log.fd, frame)
+        log.offset += len(frame)
+        self._appends += 1
+        with self._dirty_lock:
+            self._dirty.add(log.fd)
+
+    def should_compact(self, tenant_id: str) -> bool:
+        # Also wait for the WAL to outgrow the last snapshot, so rewriting a big
+        # tenant's state stays amortised against the writes that triggered it
+        log = self._logs[tenant_id]
+        return log.offset >= max(self._compact_bytes, log.snapshot_bytes)
+
+    def compact(self, tenant_id: str, snapshot: bytes) -> None:
+        """Start a new WAL generation for the state ``snapshot`` captures (caller holds lock()).
+
+        Only the switch happens here; writing the snapshot and deleting the
+        files it replaces is left to the next sync(). Until then recovery
+        replays the old WAL followed by the new one.
+        """
+        log = self._logs[tenant_id]
+        gen = log.gen + 1
+        fd = self._open_wal(tenant_id, gen)
+        self._close_fd(log.fd)
+        self._logs[tenant_id] = _TenantLog(gen=gen, fd=fd, offset=0, snapshot_bytes=len(snapshot))
+        with self._dirty_lock:
+            self._pending.append(_PendingCompaction(tenant_id, gen, snapshot))
+
+    def _finish_compaction(self, pending: _PendingCompaction) -> None:
+        tenant_id, gen = pending.tenant_id, pending.gen
+        target = self._snap_path(tenant_id, gen)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(pending.snapshot)
+            fh.flush()
+            os.fsync(fh.fileno())
+        fd = self._flock_fd(tenant_id) if self.shared else None
+        try:
+            with self._files_lock:
+                os.replace(tmp, target)
+                # open() may already have removed them
+                for path in (self._wal_path(tenant_id, gen - 1), self._snap_path(tenant_id, gen - 1)):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+        self._compactions += 1
+
+    def forget(self, tenant_id: str) -> None:
+        """Close the tenant's WAL (e.g. when its store is dropped); the files stay on disk."""
+        log = self._logs.pop(tenant_id, None)
+        if log is not None:
+            self._close_fd(log.fd)
+
+    def _close_fd(self, fd: int) -> None:
+        with self._dirty_lock:
+            if fd in self._dirty or fd in self._syncing:
+                # Unsynced appends: sync() fsyncs and closes it off the request path
+                self._dirty.discard(fd)
+                self._retired.append(fd)
+                return
+        os.close(fd)
+
+    # Durability -------------------------------------------------------
+    def sync(self) -> None:
+        """fsync WALs written since the last call (one fsync per file, not per record),
+        close retired ones and finish pending compactions. Blocking: run it in a thread."""
+        with self._sync_lock:
+            with self._dirty_lock:
+                self._syncing, self._dirty = self._dirty, set()
+                retired, self._retired = self._retired, []
+                pending, self._pending = self._pending, []
+            for fd in self._syncing:
+                os.fsync(fd)
+                self._fsyncs += 1
+            with self._dirty_lock:
+                self._syncing = set()
+            for fd in retired:
+                os.fsync(fd)
+                self._fsyncs += 1
+                os.close(fd)
+            for item in pending:
+                self._finish_compaction(item)
+
+    async def run_fsync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._fsync_interval)
+            await asyncio.to_thread(self.sync)
+
+    def close(self) -> None:
+        for tenant_id in list(self._logs):
+            self.forget(tenant_id)
+        self.sync()
+
+    def stats(self) -> dict[str, int]:
+        with self._dirty_lock:
+            pending = len(self._pending)
+        return {
+            "open_tenants": len(self._logs),
+            "appends": self._appends,
+            "fsyncs": self._fsyncs,
+            "compactions": self._compactions,
+            "pending_compactions": pending,
+            "replayed": self._replayed,
+            "torn_tails": self._torn_tails,
+            "stale_reloads": self._stale_reloads,
+        }
@@ -0,0 +1,121 @@
+"""Per-tenant SQL Studio result cache invalidated by table version counters."""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.table_versions import table_versions
+
+
+@dataclass(slots=True)
+class CachedResult:
+    tables: tuple[str, ...]
+    versions: tuple[int, ...]
+    expires_at: float
+    columns: List[str]
+    rows: Sequence[Sequence[Any]]
+
+
+class StudioResultCache:
+    """LRU keyed by (tenant schema, query fingerprint).
+
+    An entry is only served while the versions of every table the query
+    reads are unchanged (see app.db.table_versions; the counters live in
+    Postgres, so writes committed by any worker count) and its TTL has not
+    expired. Only queries reading ``allowed_tables`` exclusively are
+    admitted, since writes those version counters never see (other services,
+    provisioning scripts) would otherwise be served stale until the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, allowed_tables: Iterable[str] = ()) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.allowed_tables = frozenset(allowed_tables)
+        self._entries: "OrderedDict[tuple[str, str], CachedResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.uncacheable = 0
+
+    def cacheable(self, relations: Iterable[str]) -> bool:
+        """True when every table the query reads is app-written (see allowed_tables)."""
+        if self.max_entries > 0 and self.allowed_tables.issuperset(relations):
+            return True
+        self.uncacheable += 1
+        return False
+
+    async def versions(self, session: AsyncSession, schema: str, tables: tuple[str, ...]) -> tuple[int, ...]:
+        """Snapshot to take *before* running the query and pass to ``set``."""
+        return await table_versions.snapshot(session, schema, tables)
+
+    async def get(self, session: AsyncSession, schema: str, fingerprint: str) -> Optional[CachedResult]:
+        key = (schema, fingerprint)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at < time.time() or entry.versions != await table_versions.snapshot(
+            session, schema, entry.tables
+        ):
+            # Compared against the entry we read: a concurrent set() may have replaced it
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        schema: str,
+        fingerprint: str,
+        tables: tuple[str, ...],
+        versions: tuple[int, ...],
+        columns: List[str],
+        rows: Sequence[Sequence[Any]],
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        key = (schema, fingerprint)
+        self._entries[key] = CachedResult(
+            tables=tables,
+            versions=versions,
+            expires_at=time.time() + self.ttl_seconds,
+            columns=columns,
+            rows=rows,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, schema: Optional[str] = None) -> None:
+        if schema is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == schema]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "uncacheable": self.uncacheable,
+        }
+
+
+studio_result_cache = StudioResultCache(
+    max_entries=settings.sql_studio_result_cache_max_entries,
+    ttl_seconds=settings.sql_studio_result_cache_ttl_seconds,
+    allowed_tables=settings.sql_studio_result_cache_tables,
+)
@@ -0,0 +1,154 @@
+"""Per-tenant and global concurrency limiter for SQL Studio queries.
+
+Waiters are queued per tenant and slots are handed out round-robin across
+tenants, so one tenant with many queued queries cannot starve the others.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class StudioConcurrencyLimiter:
+    def __init__(self, global_limit: int, per_tenant_limit: int, max_queued: int, wait_timeout_seconds: float) -> None:
+        self.global_limit = global_limit
+        self.per_tenant_limit = per_tenant_limit
+        self.max_queued = max_queued
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._active: Dict[str, int] = {}
+        self._active_total = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        # Round-robin order of tenants that have waiters
+        self._turns: Deque[str] = deque()
+        self._queued = 0
+        self.granted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _can_run(self, tenant_id: str) -> bool:
+        return self._active_total < self.global_limit and self._active.get(tenant_id, 0) < self.per_tenant_limit
+
+    def _grant(self, tenant_id: str) -> None:
+        self._active[tenant_id] = self._active.get(tenant_id, 0) + 1
+        self._active_total += 1
+        self.granted += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued tenants in round-robin order."""
+        for _ in range(len(self._turns)):
+            if self._active_total >= self.global_limit:
+                return
+            tenant_id = self._turns.popleft()
+            waiters = self._waiters[tenant_id]
+            if self._active.get(tenant_id, 0) < self.per_tenant_limit:
+                future = waiters.popleft()
+                self._queued -= 1
+                self._grant(tenant_id)
+                future.set_result(None)
+            if waiters:
+                self._turns.append(tenant_id)
+            else:
+                del self._waiters[tenant_id]
+
+    def _remove_waiter(self, tenant_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(tenant_id)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        self._queued -= 1
+        if not waiters:
+            del self._waiters[tenant_id]
+            self._turns.remove(tenant_id)
+
+    def _release(self, tenant_id: str) -> None:
+        self._active[tenant_id] -= 1
+        if not self._active[tenant_id]:
+            del self._active[tenant_id]
+        self._active_total -= 1
+        self._dispatch()
+
+    def _record_wait(self, seconds: float) -> None:
+        self.waited += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    async def _acquire(self, tenant_id: str) -> None:
+        # Only skip the queue when nobody of any tenant is waiting, to keep it fair
+        if not self._queued and self._can_run(tenant_id):
+            self._grant(tenant_id)
+            return
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Estudio SQL ocupado, tente novamente em instantes.",
+                headers={"Retry-After": str(max(1, int(self.wait_timeout_seconds)))},
+            )
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        if tenant_id not in self._waiters:
+            self._waiters[tenant_id] = deque()
+            self._turns.append(tenant_id)
+        self._waiters[tenant_id].append(future)
+        self._queued += 1
+        self._dispatch()
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait({future}, timeout=self.wait_timeout_seconds)
+        except asyncio.CancelledError:
+            # Client went away: give back a slot granted meanwhile, else leave the queue
+            if future.done():
+                self._release(tenant_id)
+            else:
+                self._remove_waiter(tenant_id, future)
+            raise
+        finally:
+            self._record_wait(time.perf_counter() - started)
+        if not future.done():
+            self._remove_waiter(tenant_id, future)
+            self.timeouts += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Tempo de espera na fila do Estudio SQL esgotado.",
+                headers={"Retry-After": str(max(1, int(self.wait_timeout_seconds)))},
+            )
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str) -> AsyncIterator[None]:
+        await self._acquire(tenant_id)
+        try:
+            yield
+        finally:
+            self._release(tenant_id)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self._active_total,
+            "queued": self._queued,
+            "global_limit": self.global_limit,
+            "per_tenant_limit": self.per_tenant_limit,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_seconds_total / self.waited * 1000, 2) if self.waited else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2),
+        }
+
+
+studio_limiter = StudioConcurrencyLimiter(
+    global_limit=settings.sql_studio_max_concurrent,
+    per_tenant_limit=settings.sql_studio_max_concurrent_per_tenant,
+    max_queued=settings.sql_studio_max_queued,
+    wait_timeout_seconds=settings.sql_studio_queue_timeout_seconds,
+)
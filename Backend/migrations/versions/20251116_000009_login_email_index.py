@@ -0,0 +1,48 @@
+"""Unique index on tb_usuario lower(email) for the single-query login.
+
+Login matches emails case-insensitively, so two users differing only by case
+would make it ambiguous; the upgrade refuses to run while such rows exist.
+"""
+import os
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251116_000009"
+down_revision = "20251115_000008"
+branch_labels = None
+depends_on = None
+
+TENANT_ADMIN = os.environ.get("TENANT_ADMIN_SCHEMA", "tenant_admin")
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            duplicated TEXT;
+        BEGIN
+            SELECT string_agg(email_lower, ', ') INTO duplicated
+            FROM (
+                SELECT lower(email) AS email_lower
+                FROM {TENANT_ADMIN}.tb_usuario
+                GROUP BY lower(email)
+                HAVING count(*) > 1
+            ) d;
+            IF duplicated IS NOT NULL THEN
+                RAISE EXCEPTION 'tb_usuario has emails differing only by case: %', duplicated;
+            END IF;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tb_usuario_lower_email
+            ON {TENANT_ADMIN}.tb_usuario (lower(email));
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {TENANT_ADMIN}.idx_tb_usuario_lower_email;")
@@ -0,0 +1,33 @@
+"""Shared table version counters for the SQL Studio result cache.
+
+Writers bump (schema_name, table_name) in their own transaction; every worker
+compares cached results against these rows, so a write on one worker
+invalidates the others immediately.
+"""
+import os
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251117_000010"
+down_revision = "20251116_000009"
+branch_labels = None
+depends_on = None
+
+TENANT_ADMIN = os.environ.get("TENANT_ADMIN_SCHEMA", "tenant_admin")
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TENANT_ADMIN}.tb_table_version (
+            schema_name TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            version BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (schema_name, table_name)
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP TABLE IF EXISTS {TENANT_ADMIN}.tb_table_version;")
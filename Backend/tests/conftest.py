@@ -0,0 +1,49 @@
+"""Shared fixtures.
+
+Database tests need a disposable Postgres and are skipped unless
+NEXUS_TEST_DATABASE_URL is set; PgBouncer tests likewise need
+NEXUS_TEST_PGBOUNCER_URL (a transaction-mode pool in front of it).
+Benchmarks only run with --run-benchmarks.
+"""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.core.config import _normalize_async_url
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--run-benchmarks", action="store_true", default=False, help="run timing benchmarks")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark (use --run-benchmarks)")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def _url_from_env(name: str) -> str:
+    url = os.environ.get(name, "")
+    if not url:
+        pytest.skip(f"{name} not set")
+    return _normalize_async_url(url)
+
+
+@pytest.fixture
+def database_url() -> str:
+    return _url_from_env("NEXUS_TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pgbouncer_url() -> str:
+    return _url_from_env("NEXUS_TEST_PGBOUNCER_URL")
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.api.routes.inicio import get_calendar_activities, get_reminders
+from app.core.security import TenantContext
+from app.models import ActivityItem
+from app.services import data_store
+from app.services.data_store import TenantMemoryStore
+
+# Far from the seeded activities (due around now), so windows only see ours
+BASE = datetime(2090, 1, 1, 12, 0)
+
+
+def _activity(key: str, due: datetime) -> ActivityItem:
+    return ActivityItem(id=key, customer="c", action=key, status="Pendente", badge="b", dueDate=due)
+
+
+def _store(*dues: tuple[str, datetime]) -> TenantMemoryStore:
+    store = TenantMemoryStore()
+    for key, due in dues:
+        store.add_activity(_activity(key, due))
+    return store
+
+
+def _ids(store: TenantMemoryStore, *args, **kwargs) -> list[str]:
+    return [activity.id for activity in store.list_activities_due(*args, **kwargs)]
+
+
+def test_window_bounds_are_inclusive() -> None:
+    store = _store(*((f"h{i}", BASE + timedelta(hours=i)) for i in range(5)))
+    assert _ids(store, BASE + timedelta(hours=1), BASE + timedelta(hours=3)) == ["h1", "h2", "h3"]
+    assert _ids(store, BASE + timedelta(hours=2), BASE + timedelta(hours=2)) == ["h2"]
+    assert _ids(store, BASE + timedelta(minutes=61), BASE + timedelta(minutes=179)) == ["h2"]
+    assert _ids(store, end=BASE) == ["h0"]
+    assert _ids(store, start=BASE + timedelta(hours=4)) == ["h4"]
+
+
+def test_aware_bounds_are_compared_in_utc() -> None:
+    store = _store(*((f"h{i}", BASE + timedelta(hours=i)) for i in range(5)))
+    brt = timezone(timedelta(hours=-3))
+    # 10:00-03:00 is 13:00 UTC, i.e. h1; 12:00-03:00 is 15:00 UTC, i.e. h3
+    start = datetime(2090, 1, 1, 10, 0, tzinfo=brt)
+    end = datetime(2090, 1, 1, 12, 0, tzinfo=brt)
+    assert _ids(store, start, end) == ["h1", "h2", "h3"]
+    assert _ids(store, start.astimezone(timezone.utc), end.astimezone(timezone.utc)) == ["h1", "h2", "h3"]
+
+
+def test_limit_counts_from_the_start_of_the_window() -> None:
+    store = _store(*((f"h{i}", BASE + timedelta(hours=i)) for i in range(10)))
+    assert _ids(store, BASE + timedelta(hours=3), limit=2) == ["h3", "h4"]
+    assert _ids(store, BASE + timedelta(hours=3), BASE + timedelta(hours=4), limit=5) == ["h3", "h4"]
+    assert _ids(store, limit=3) == ["h0", "h1", "h2"]
+
+
+def test_same_due_date_keeps_insertion_order() -> None:
+    store = _store(("late", BASE + timedelta(days=1)), ("a", BASE), ("early", BASE - timedelta(days=1)), ("b", BASE))
+    store.add_activity(_activity("c", BASE))
+    assert _ids(store) == ["early", "a", "b", "c", "late"]
+    assert _ids(store, BASE, BASE, limit=2) == ["a", "b"]
+    assert [reminder["id"] for reminder in store.list_reminders(BASE, BASE)] == ["a", "b", "c"]
+
+
+@pytest.mark.anyio
+async def test_calendar_and_reminders_routes_apply_the_window() -> None:
+    tenant = f"window-{uuid4().hex[:8]}"
+    store = data_store.get_store(tenant)
+    for i in range(6):
+        store.add_activity(_activity(f"h{i}", BASE + timedelta(hours=i)))
+    context = TenantContext(tenant_id=tenant, user_id="u1", roles=[])
+    start = datetime(2090, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=-3)))
+
+    calendar = await get_calendar_activities(inicio=start, fim=BASE + timedelta(hours=4), limit=2, context=context)
+    assert [event["title"] for event in calendar["events"]] == ["h1", "h2"]
+    assert calendar["events"][0]["date"] == (BASE + timedelta(hours=1)).isoformat()
+
+    reminders = await get_reminders(inicio=start, fim=BASE + timedelta(hours=4), limit=None, context=context)
+    assert [item["id"] for item in reminders["items"]] == ["h1", "h2", "h3", "h4"]
+    assert {item["urgency"] for item in reminders["items"]} == {"Normal"}
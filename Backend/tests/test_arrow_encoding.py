@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import ipaddress
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.api.routes import dados
+from app.core.config import settings
+from app.core.security import TenantContext
+from app.main import app
+from app.models import SQLTestRequest, SQLTestResponse
+from app.services.arrow_encoding import ARROW_STREAM_MEDIA_TYPE, encode_arrow_stream, wants_arrow
+from app.services.sql_guard import SQLValidationResult
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _decode(payload: bytes) -> "pa.Table":
+    return pa.ipc.open_stream(payload).read_all()
+
+
+def _request(accept: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [(b"accept", accept.encode())]})
+
+
+def test_roundtrip_keeps_native_types() -> None:
+    rows = [(1, "a", 1.5, None), (2, "b", 2.5, True)]
+    table = _decode(encode_arrow_stream(["id", "nome", "valor", "ativo"], rows))
+    assert table.column_names == ["id", "nome", "valor", "ativo"]
+    assert pa.types.is_integer(table.schema.field("id").type)
+    assert table.to_pylist()[1] == {"id": 2, "nome": "b", "valor": 2.5, "ativo": True}
+
+
+def test_untypeable_columns_fall_back_to_strings() -> None:
+    columns = ["dados", "ip", "intervalo", "grande", "preco"]
+    rows = [
+        ({"a": 1}, ipaddress.ip_address("10.0.0.1"), timedelta(days=1), 2**70, Decimal("1.10")),
+        (3, ipaddress.ip_address("::1"), timedelta(seconds=5), 1, None),
+        (None, None, None, None, Decimal("2.00")),
+    ]
+    table = _decode(encode_arrow_stream(columns, rows))
+    assert table.schema.field("dados").type == pa.string()
+    assert table.column("dados").to_pylist() == ['{"a": 1}', "3", None]
+    assert table.column("ip").to_pylist() == ["10.0.0.1", "::1", None]
+    assert table.column("grande").to_pylist() == [str(2**70), "1", None]
+    # Types Arrow does support are kept
+    assert pa.types.is_duration(table.schema.field("intervalo").type)
+    assert pa.types.is_decimal(table.schema.field("preco").type)
+
+
+def test_empty_result_keeps_column_names() -> None:
+    assert _decode(encode_arrow_stream(["a", "b"], [])).column_names == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    ("accept", "rows", "expected"),
+    [
+        (ARROW_STREAM_MEDIA_TYPE, 1, True),
+        ("application/json", 10**6, False),
+        (f"{ARROW_STREAM_MEDIA_TYPE}, application/json;q=0.9", 1, False),
+        (f"{ARROW_STREAM_MEDIA_TYPE}, */*", settings.arrow_min_rows, True),
+        ("", 10**6, False),
+        # No row count: /query/test results, always below the threshold
+        (f"{ARROW_STREAM_MEDIA_TYPE}, application/json;q=0.9", None, True),
+        ("application/json", None, False),
+    ],
+)
+def test_negotiation(accept: str, rows: int | None, expected: bool) -> None:
+    assert wants_arrow(_request(accept), rows) is expected
+
+
+@pytest.mark.anyio
+async def test_query_test_serves_arrow_to_clients_also_accepting_json(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def executed(query, session, tenant_id):
+        return SQLValidationResult(
+            normalized_query=f"{query};", rows_affected=0, execution_time_ms=1, columns=["n"], rows=[(1,), (2,)]
+        )
+
+    monkeypatch.setattr(dados, "validar_e_executar_sql_seguro", executed)
+    res = await dados.test_sql_query(
+        SQLTestRequest(query="SELECT n FROM t"),
+        _request(f"{ARROW_STREAM_MEDIA_TYPE}, application/json"),
+        Response(),
+        session=None,
+        context=TenantContext(tenant_id="t1", user_id="u1", roles=[]),
+    )
+    assert res.media_type == ARROW_STREAM_MEDIA_TYPE
+    assert _decode(res.body).column("n").to_pylist() == [1, 2]
+
+
+@pytest.mark.anyio
+async def test_no_code_endpoint_serves_arrow_when_asked() -> None:
+    transport = httpx.ASGITransport(app=app)
+    body = {"objectId": "o", "groupBy": "grupo", "aggregate": "SUM", "aggregateField": "total"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/api/v1/dados/query/no-code", json=body, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+        assert res.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+        assert _decode(res.content).column_names == ["grupo", "total"]
+
+        res = await client.post(
+            "/api/v1/dados/query/no-code",
+            json=body,
+            headers={"Accept": f"{ARROW_STREAM_MEDIA_TYPE}, application/json"},
+        )
+        assert res.headers["content-type"] == "application/json"
+
+
+@pytest.mark.benchmark
+def test_benchmark_arrow_vs_json() -> None:
+    """Response encoding time for SQL Studio shaped results, JSON body vs Arrow IPC."""
+    rnd = random.Random(7)
+    for n_rows, n_cols in ((100, 10), (100, 200), (1000, 50), (10000, 50)):
+        columns = [f"c{i}" for i in range(n_cols)]
+        rows = [tuple(rnd.random() for _ in range(n_cols)) for _ in range(n_rows)]
+        repeat = max(1, 20000 // n_rows)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            SQLTestResponse(
+                isValid=True,
+                normalizedQuery="SELECT 1;",
+                results=[dict(zip(columns, row)) for row in rows],
+            ).model_dump_json()
+        as_json = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode_arrow_stream(columns, rows)
+        as_arrow = (time.perf_counter() - start) / repeat
+
+        print(f"\n{n_rows} rows x {n_cols} cols: json {as_json * 1000:.2f} ms, arrow {as_arrow * 1000:.2f} ms")
+    assert as_arrow < as_json
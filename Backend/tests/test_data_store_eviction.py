@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime
+
+import pytest
+
+from app.models import ActivityItem, LeadCreate, OpportunityCreate
+from app.services.data_store import DataStore
+from app.services.store_journal import StoreJournal
+
+
+def _write(store, tenant: str) -> None:
+    store.create_lead(LeadCreate(nome=tenant, email=f"{tenant}@x.com", status="Novo", origem=None, owner="Ana"))
+    store.create_opportunity(OpportunityCreate(nome=tenant, stage="Fechamento", valor=10.0, probabilidade=0.9, owner="Ana"))
+    store.add_activity(
+        ActivityItem(id=tenant, customer=tenant, action="Ligar", status="Pendente", badge="Hoje", dueDate=datetime(2030, 1, 1))
+    )
+    store.set_favorite("u1", tenant, True)
+
+
+def _assert_restored(store, template_leads: int, tenant: str) -> None:
+    assert [lead.nome for lead in store.list_leads()][template_leads:] == [tenant]
+    assert store.pipeline_by_stage()["Fechamento"][1] >= 1
+    assert store.list_activities_due(start=datetime(2030, 1, 1))[-1].id == tenant
+    assert store.is_favorite("u1", tenant)
+
+
+@pytest.fixture(params=["spill", "journal"])
+def data_store(request: pytest.FixtureRequest, tmp_path) -> DataStore:
+    journal = StoreJournal(str(tmp_path / "wal")) if request.param == "journal" else None
+    store = DataStore(memory_budget_bytes=20_000, snapshot_path=str(tmp_path / "spill.sqlite3"), journal=journal)
+    yield store
+    if journal is not None:
+        journal.close()
+
+
+def test_evicted_tenants_restore_their_writes(data_store: DataStore) -> None:
+    template_leads = len(data_store.get_store("template-probe").list_leads())
+    tenants = [f"t{i}" for i in range(60)]
+    for tenant in tenants:
+        _write(data_store.get_store(tenant), tenant)
+    data_store.get_store(tenants[-1])  # re-estimate the last writes
+    stats = data_store.stats()
+    assert stats["evictions"] > 0
+    assert stats["resident_bytes"] <= stats["budget_bytes"]
+
+    for tenant in tenants:
+        _assert_restored(data_store.get_store(tenant), template_leads, tenant)
+    assert data_store.stats()["restores"] > 0
+
+
+def test_read_only_tenants_are_not_spilled(tmp_path) -> None:
+    data_store = DataStore(memory_budget_bytes=5_000, snapshot_path=str(tmp_path / "spill.sqlite3"))
+    seeded = data_store.get_store("t0").list_dashboards()
+    for i in range(200):
+        assert data_store.get_store(f"t{i}").list_dashboards() == seeded
+    stats = data_store.stats()
+    assert stats["evictions"] > 0 and stats["snapshotted"] == 0
+
+
+def test_restore_keeps_tenants_isolated(data_store: DataStore) -> None:
+    a = data_store.get_store("a")
+    _write(a, "a")
+    for i in range(60):
+        data_store.get_store(f"filler{i}")
+    b = data_store.get_store("b")
+    assert "a" not in {lead.nome for lead in b.list_leads()}
+    assert not b.is_favorite("u1", "a")
+    assert "a" in {lead.nome for lead in data_store.get_store("a").list_leads()}
+
+
+def test_store_held_across_its_eviction_keeps_its_writes(data_store: DataStore) -> None:
+    held = data_store.get_store("a")
+    for i in range(60):
+        _write(data_store.get_store(f"filler{i}"), f"filler{i}")
+    assert "a" not in data_store._stores
+    _write(held, "a")  # a request that got the store before it was evicted
+    assert data_store.get_store("a") is held
+    assert data_store.stats()["revived"] == 1
+    assert held.is_favorite("u1", "a")
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("mode", ["spill", "journal"])
+def test_benchmark_eviction_with_10k_tenants(tmp_path, mode: str) -> None:
+    """10k tenants with one write each under a budget holding a few % of them, then skewed reads."""
+    journal = StoreJournal(str(tmp_path / "wal")) if mode == "journal" else None
+    data_store = DataStore(memory_budget_bytes=4 * 1024 * 1024, snapshot_path=str(tmp_path / "s.sqlite3"), journal=journal)
+    tenants = [f"t{i}" for i in range(10_000)]
+
+    start = time.perf_counter()
+    for tenant in tenants:
+        _write(data_store.get_store(tenant), tenant)
+    write_s = time.perf_counter() - start
+
+    rnd = random.Random(3)
+    # 80% of reads go to 10% of the tenants
+    hot = tenants[:1000]
+    reads = [rnd.choice(hot) if rnd.random() < 0.8 else rnd.choice(tenants) for _ in range(20_000)]
+    start = time.perf_counter()
+    for tenant in reads:
+        data_store.get_store(tenant).list_leads()
+    read_s = time.perf_counter() - start
+
+    stats = data_store.stats()
+    print(
+        f"\nwrites {write_s / len(tenants) * 1e6:.0f}us/tenant, reads {read_s / len(reads) * 1e6:.0f}us/req, "
+        f"resident {stats['resident']} ({stats['resident_bytes'] / 1024 / 1024:.1f} MB), "
+        f"evictions {stats['evictions']}, restores {stats['restores']}, avg restore {stats['avg_restore_ms']} ms"
+    )
+    assert stats["resident_bytes"] <= stats["budget_bytes"]
+    if journal is not None:
+        journal.close()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import random
+
+from app.models import MetaObjectCreate
+from app.services.data_store import DEFAULT_PROFILES, TenantMemoryStore
+
+
+def _scan(store: TenantMemoryStore, role_ids: list[str]) -> list[str]:
+    """Reference result: full scan in store order, as before the profile index."""
+    roles = {role.lower() for role in role_ids}
+    return [
+        meta.metaId
+        for meta in store.list_meta_objects()
+        if roles.intersection(profile.id.lower() for profile in meta.profiles)
+    ]
+
+
+def _meta(i: int) -> MetaObjectCreate:
+    return MetaObjectCreate(
+        idObjeto=f"obj_{i}",
+        nomeAmigavel=f"Objeto {i}",
+        tipo="CUSTOMIZADO",
+        status="Ativo",
+        descricao="",
+        fields=["ID"],
+    )
+
+
+def test_meta_objects_for_roles_match_a_full_scan_in_store_order() -> None:
+    rnd = random.Random(11)
+    profiles = [profile.id for profile in DEFAULT_PROFILES]
+    store = TenantMemoryStore()
+    ids: list[str] = []
+    for step in range(300):
+        action = rnd.random()
+        if action < 0.4 or not ids:
+            ids.append(store.create_meta_object(_meta(step)).metaId)
+        elif action < 0.9:
+            store.update_permissions(rnd.choice(ids), rnd.sample(profiles, rnd.randint(0, len(profiles))))
+        else:
+            meta_id = ids.pop(rnd.randrange(len(ids)))
+            store.delete_meta_object(meta_id)
+
+        roles = rnd.sample(profiles, rnd.randint(1, len(profiles)))
+        if rnd.random() < 0.5:
+            roles = [role.upper() for role in roles]
+        assert [meta.metaId for meta in store.list_meta_objects_for_roles(roles)] == _scan(store, roles)
+
+
+def test_order_survives_snapshot_restore() -> None:
+    template = TenantMemoryStore()
+    store = TenantMemoryStore(template=template)
+    first = store.create_meta_object(_meta(1)).metaId
+    second = store.create_meta_object(_meta(2)).metaId
+    # Re-indexing the first one must not move it behind the second
+    store.update_permissions(second, ["diretoria"])
+    store.update_permissions(first, ["diretoria", "vendas"])
+    restored = TenantMemoryStore.restore(store.snapshot(), template)
+    assert [meta.metaId for meta in restored.list_meta_objects_for_roles(["vendas", "diretoria"])] == [first, second]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from app.models import (
+    ActivityItem,
+    CampaignCreate,
+    CampaignResponse,
+    ContactCreate,
+    ContactResponse,
+    LeadCreate,
+    LeadResponse,
+    OpportunityCreate,
+    OpportunityResponse,
+)
+from app.services.data_store import (
+    ActivityRecord,
+    CampaignRecord,
+    ContactRecord,
+    LeadRecord,
+    OpportunityRecord,
+    TenantMemoryStore,
+)
+
+NOW = datetime(2025, 11, 16, 12, 0)
+
+
+def _lead(i: int = 0) -> LeadCreate:
+    return LeadCreate(nome=f"Lead {i}", email=f"lead{i}@x.com", status="Novo", origem="Site", owner="Ana")
+
+
+def _opportunity(i: int = 0) -> OpportunityCreate:
+    return OpportunityCreate(nome=f"Op {i}", stage="Propostas", valor=1000.0 + i, probabilidade=0.4, owner="Ana")
+
+
+def _contact(i: int = 0) -> ContactCreate:
+    return ContactCreate(nome=f"Contato {i}", email=f"c{i}@x.com", telefone=None, conta="Nexus")
+
+
+def _campaign(i: int = 0) -> CampaignCreate:
+    return CampaignCreate(nome=f"Camp {i}", status="Ativa", investimento=500.0, inicio="2025-01-01", fim="2025-02-01")
+
+
+def _activity(i: int = 0) -> ActivityItem:
+    return ActivityItem(id=f"a{i}", customer="Nexus", action=f"Ligar {i}", status="Pendente", badge="Hoje", dueDate=NOW)
+
+
+def test_records_convert_to_the_same_responses_as_the_models() -> None:
+    pairs = [
+        (
+            LeadRecord.from_payload("l1", _lead(), NOW).to_response(),
+            LeadResponse(id="l1", createdAt=NOW, **_lead().model_dump()),
+        ),
+        (
+            OpportunityRecord.from_payload("o1", _opportunity(), NOW).to_response(),
+            OpportunityResponse(id="o1", updatedAt=NOW, **_opportunity().model_dump()),
+        ),
+        (
+            ContactRecord.from_payload("c1", _contact()).to_response(),
+            ContactResponse(id="c1", **_contact().model_dump()),
+        ),
+        (
+            CampaignRecord.from_payload("k1", _campaign()).to_response(),
+            CampaignResponse(id="k1", **_campaign().model_dump()),
+        ),
+        (ActivityRecord.from_item(_activity()).to_item(), _activity()),
+    ]
+    for built, expected in pairs:
+        assert type(built) is type(expected)
+        assert built.model_dump() == expected.model_dump()
+        assert built.model_dump_json() == expected.model_dump_json()
+
+
+def test_low_cardinality_strings_are_interned() -> None:
+    a = LeadRecord.from_payload("a", _lead(1), NOW)
+    b = LeadRecord.from_payload("b", LeadCreate.model_validate_json(_lead(2).model_dump_json()), NOW)
+    assert a.status is b.status and a.owner is b.owner
+    assert not hasattr(a, "__dict__")
+
+
+def test_store_round_trip_keeps_record_fields() -> None:
+    store = TenantMemoryStore()
+    created = store.create_lead(_lead())
+    updated = store.update_lead(created.id, _lead(9))
+    assert updated.createdAt == created.createdAt
+    assert store.get_lead(created.id).model_dump() == updated.model_dump()
+    assert isinstance(store.leads[created.id], LeadRecord)
+
+    op = store.create_opportunity(_opportunity())
+    assert store.list_opportunities() == [op]
+
+
+def _traced_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+@pytest.mark.benchmark
+def test_benchmark_bytes_per_record() -> None:
+    """Resident bytes per CRM record, pydantic models vs slotted records (tracemalloc)."""
+    n = 20000
+    leads = [_lead(i) for i in range(n)]
+    ops = [_opportunity(i) for i in range(n)]
+    contacts = [_contact(i) for i in range(n)]
+    campaigns = [_campaign(i) for i in range(n)]
+    activities = [_activity(i) for i in range(n)]
+
+    def as_models():
+        return (
+            [LeadResponse(id=str(i), createdAt=NOW, **p.model_dump()) for i, p in enumerate(leads)],
+            [OpportunityResponse(id=str(i), updatedAt=NOW, **p.model_dump()) for i, p in enumerate(ops)],
+            [ContactResponse(id=str(i), **p.model_dump()) for i, p in enumerate(contacts)],
+            [CampaignResponse(id=str(i), **p.model_dump()) for i, p in enumerate(campaigns)],
+            [ActivityItem(**p.model_dump()) for p in activities],
+        )
+
+    def as_records():
+        return (
+            [LeadRecord.from_payload(str(i), p, NOW) for i, p in enumerate(leads)],
+            [OpportunityRecord.from_payload(str(i), p, NOW) for i, p in enumerate(ops)],
+            [ContactRecord.from_payload(str(i), p) for i, p in enumerate(contacts)],
+            [CampaignRecord.from_payload(str(i), p) for i, p in enumerate(campaigns)],
+            [ActivityRecord.from_item(p) for p in activities],
+        )
+
+    models = _traced_bytes(as_models) / (5 * n)
+    records = _traced_bytes(as_records) / (5 * n)
+    print(f"\nbytes/record: models {models:.0f}, slotted records {records:.0f} ({models / records:.1f}x)")
+    assert records < models
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.utils import bootstrap_tenant_session
+
+
+@pytest.fixture
+def pgbouncer_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "db_pgbouncer_transaction_mode", True)
+
+
+def test_connect_args_default_keeps_statement_cache() -> None:
+    args = db_session._connect_args()
+    assert args == {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+
+
+def test_connect_args_pgbouncer_disables_statement_reuse(pgbouncer_mode: None) -> None:
+    args = db_session._connect_args()
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    names = {args["prepared_statement_name_func"]() for _ in range(1000)}
+    assert len(names) == 1000
+    assert all(re.fullmatch(r"__asyncpg_[0-9a-f-]{36}__", name) for name in names)
+
+
+async def _assert_pooling_safe(url: str) -> None:
+    engine = db_session._build_engine(url, pool_size=8, max_overflow=0)
+    try:
+        await db_session._probe_prepared_statements(engine)
+
+        # Tenant state set by the bootstrap must not outlive its transaction
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            await bootstrap_tenant_session(session, "tenant_probe", sql_safe=True)
+            path = (await session.execute(text("SELECT current_setting('search_path')"))).scalar_one()
+            assert path == "tenant_probe"
+            await session.commit()
+            path = (await session.execute(text("SELECT current_setting('search_path')"))).scalar_one()
+            timeout = (await session.execute(text("SELECT current_setting('statement_timeout')"))).scalar_one()
+            assert "tenant_probe" not in path
+            assert timeout != f"{settings.sql_studio_statement_timeout_ms}ms"
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_pooling_probe_passes_on_postgres(database_url: str, pgbouncer_mode: None) -> None:
+    await _assert_pooling_safe(database_url)
+
+
+@pytest.mark.anyio
+async def test_pooling_probe_passes_through_pgbouncer(pgbouncer_url: str, pgbouncer_mode: None) -> None:
+    await _assert_pooling_safe(pgbouncer_url)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.api.routes.inicio import get_dashboard_kpis
+from app.core.security import TenantContext
+from app.models import ActivityItem, LeadCreate, OpportunityCreate
+from app.services import data_store
+from app.services.data_store import TenantMemoryStore
+
+STAGES = ["Prospects", "Qualificacao", "Propostas", "Fechamento"]
+
+
+def _recompute(store: TenantMemoryStore) -> dict[str, tuple[float, int]]:
+    totals: dict[str, tuple[float, int]] = {}
+    for op in store.list_opportunities():
+        valor, count = totals.get(op.stage, (0.0, 0))
+        totals[op.stage] = (valor + op.valor, count + 1)
+    return totals
+
+
+def _assert_kpis(store: TenantMemoryStore, first_use: list[str]) -> None:
+    incremental = store.pipeline_by_stage()
+    full = _recompute(store)
+    assert incremental.keys() == full.keys()
+    for stage, (valor, count) in full.items():
+        assert incremental[stage][1] == count
+        assert incremental[stage][0] == pytest.approx(valor)
+    # Stages never move once used, however their opportunities change
+    assert list(incremental) == [stage for stage in first_use if stage in full]
+    assert store.count_open_activities() == sum(1 for a in store.list_activities() if a.status.lower() != "concluido")
+    assert store.count_leads() == len(store.list_leads())
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_incremental_kpis_equal_a_full_recompute(seed: int) -> None:
+    rnd = random.Random(seed)
+    template = TenantMemoryStore()
+    store = TenantMemoryStore(template=template)
+    first_use: list[str] = []
+    ids: list[str] = []
+    for step in range(200):
+        action = rnd.random()
+        stage = rnd.choice(STAGES)
+        used = None
+        payload = OpportunityCreate(
+            nome=f"op{step}", stage=stage, valor=round(rnd.uniform(0, 1e5), 2), probabilidade=0.5, owner="Ana"
+        )
+        if action < 0.35 or not ids:
+            ids.append(store.create_opportunity(payload).id)
+            used = stage
+        elif action < 0.6:
+            store.update_opportunity(rnd.choice(ids), payload)
+            used = stage
+        elif action < 0.7:
+            store.delete_opportunity(ids.pop(rnd.randrange(len(ids))))
+        elif action < 0.8:
+            status = rnd.choice(["Pendente", "Concluido", "concluido", "Em andamento"])
+            store.add_activity(
+                ActivityItem(id=str(step), customer="c", action="a", status=status, badge="b", dueDate=datetime(2030, 1, 1))
+            )
+        elif action < 0.9:
+            store.create_lead(LeadCreate(nome="l", email="l@x.com", status="Novo", origem=None, owner="Ana"))
+        else:
+            store = TenantMemoryStore.restore(store.snapshot(), template)
+        if used is not None and used not in first_use:
+            first_use.append(used)
+        _assert_kpis(store, first_use)
+
+
+def test_updating_the_only_opportunity_of_a_stage_keeps_the_funnel_order() -> None:
+    store = TenantMemoryStore()
+    only = store.create_opportunity(OpportunityCreate(nome="a", stage="Prospects", valor=10, probabilidade=0.1, owner="x"))
+    store.create_opportunity(OpportunityCreate(nome="b", stage="Propostas", valor=20, probabilidade=0.5, owner="x"))
+    store.update_opportunity(only.id, OpportunityCreate(nome="a", stage="Prospects", valor=15, probabilidade=0.2, owner="x"))
+    assert list(store.pipeline_by_stage().items()) == [("Prospects", (15.0, 1)), ("Propostas", (20.0, 1))]
+
+
+@pytest.mark.anyio
+async def test_dashboard_activity_cards_keep_overdue_ones() -> None:
+    tenant = f"kpis-{uuid4().hex[:8]}"
+    store = data_store.get_store(tenant)
+    seeded = [activity.action for activity in store.list_activities()]
+    now = datetime.utcnow()
+    store.add_activity(
+        ActivityItem(id="old", customer="c", action="overdue", status="Pendente", badge="b", dueDate=now - timedelta(days=30))
+    )
+    for i in range(30):
+        store.add_activity(
+            ActivityItem(id=str(i), customer="c", action=f"a{i:02d}", status="Pendente", badge="b", dueDate=now + timedelta(hours=i))
+        )
+    summary = await get_dashboard_kpis(TenantContext(tenant_id=tenant, user_id="u1", roles=[]))
+    actions = [card["action"] for card in summary.activities]
+    assert actions == seeded + ["overdue"] + [f"a{i:02d}" for i in range(30)]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from app.core.config import settings
+from app.security import jwt_tenancy
+from app.security.jwt_tenancy import VerifiedTokenCache, create_access_token, decode_access_token
+
+
+@pytest.fixture
+def token_cache(monkeypatch: pytest.MonkeyPatch) -> VerifiedTokenCache:
+    cache = VerifiedTokenCache(max_entries=3, max_token_bytes=settings.jwt_cache_max_token_bytes)
+    monkeypatch.setattr(jwt_tenancy, "verified_token_cache", cache)
+    return cache
+
+
+def _token(user_id: str = "u1", **claims) -> str:
+    return create_access_token({"user_id": user_id, "tenant_id": "t1", **claims})
+
+
+def test_second_decode_is_a_hit(token_cache: VerifiedTokenCache) -> None:
+    token = _token()
+    first = decode_access_token(token)
+    assert decode_access_token(token) is first
+    assert token_cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+
+def test_expired_entry_falls_back_to_verification(token_cache: VerifiedTokenCache) -> None:
+    exp = datetime.now(tz=timezone.utc) + timedelta(seconds=1)
+    token = jwt.encode({"user_id": "u1", "exp": exp}, settings.secret_key, algorithm=settings.jwt_algorithm)
+    decode_access_token(token)
+    # exp has one-second resolution and jose only rejects once now > exp
+    time.sleep(2.1)
+    with pytest.raises(ExpiredSignatureError):
+        decode_access_token(token)
+    assert token_cache.stats()["size"] == 0
+
+
+def test_tampered_token_is_not_served_from_cache(token_cache: VerifiedTokenCache) -> None:
+    token = _token()
+    decode_access_token(token)
+    header, payload, signature = token.split(".")
+    forged = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+    with pytest.raises(JWTError):
+        decode_access_token(forged)
+
+
+def test_entries_are_capped_lru(token_cache: VerifiedTokenCache) -> None:
+    tokens = [_token(f"u{i}") for i in range(4)]
+    for token in tokens[:3]:
+        decode_access_token(token)
+    decode_access_token(tokens[0])  # most recently used survives
+    decode_access_token(tokens[3])
+    assert token_cache.stats()["evictions"] == 1
+    assert token_cache.get(tokens[1]) is None
+    assert token_cache.get(tokens[0]) is not None
+
+
+def test_oversized_tokens_are_not_cached(token_cache: VerifiedTokenCache) -> None:
+    token = _token(padding="x" * settings.jwt_cache_max_token_bytes)
+    decode_access_token(token)
+    decode_access_token(token)
+    assert token_cache.stats()["size"] == 0 and token_cache.stats()["hits"] == 0
+
+
+@pytest.mark.benchmark
+def test_benchmark_decode_cache(token_cache: VerifiedTokenCache) -> None:
+    """CPU per request spent on JWT verification, full decode vs cache hit."""
+    token = _token(roles=["user", "data_admin"], perfil="SUPER_ADMIN")
+    iterations = 5000
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    full = (time.perf_counter() - start) / iterations
+
+    decode_access_token(token)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_access_token(token)
+    cached = (time.perf_counter() - start) / iterations
+
+    print(f"\njwt decode: full {full * 1e6:.1f}us, cached {cached * 1e6:.2f}us ({full / cached:.0f}x)")
+    for rate in (1000, 5000, 10000):
+        saved = (full - cached) * rate
+        print(f"  at {rate} req/s: {saved * 1000:.0f} ms CPU saved per second per worker")
+    assert cached < full
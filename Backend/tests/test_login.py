@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import importlib.util
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.security.jwt_tenancy import get_login_context
+
+pytestmark = pytest.mark.anyio
+
+_MIGRATION = Path(__file__).resolve().parents[1] / "migrations" / "versions" / "20251116_000009_login_email_index.py"
+
+
+def _migration_sql(schema: str) -> list[str]:
+    spec = importlib.util.spec_from_file_location("login_email_index", _MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    statements: list[str] = []
+
+    class _Op:
+        @staticmethod
+        def execute(sql: str) -> None:
+            statements.append(sql)
+
+    module.op = _Op
+    module.TENANT_ADMIN = schema
+    module.upgrade()
+    return statements
+
+
+@pytest.fixture
+async def login_db(database_url: str, monkeypatch: pytest.MonkeyPatch):
+    schema = f"test_login_{uuid4().hex[:8]}"
+    monkeypatch.setattr(settings, "tenant_admin_schema", schema)
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        for ddl in (
+            f"CREATE SCHEMA {schema}",
+            f"CREATE TABLE {schema}.tb_tenant (id uuid PRIMARY KEY, nome_empresa text, schema_name text)",
+            f"""CREATE TABLE {schema}.tb_usuario (
+                id uuid PRIMARY KEY, tenant_id uuid REFERENCES {schema}.tb_tenant(id),
+                email text NOT NULL UNIQUE, senha_hash text NOT NULL, perfil text NOT NULL)""",
+            f"CREATE TABLE {schema}.roles (role_id uuid PRIMARY KEY, name varchar(100) NOT NULL UNIQUE)",
+            f"CREATE TABLE {schema}.user_roles (user_id uuid, role_id uuid, UNIQUE (user_id, role_id))",
+            f"INSERT INTO {schema}.tb_tenant VALUES ('00000000-0000-0000-0000-000000000001', 'Acme', 'tenant_acme')",
+            f"""INSERT INTO {schema}.tb_usuario VALUES
+                ('00000000-0000-0000-0000-0000000000a1', '00000000-0000-0000-0000-000000000001',
+                 'Ana@Acme.com', 'hash', 'GERENTE'),
+                ('00000000-0000-0000-0000-0000000000a2', '00000000-0000-0000-0000-000000000001',
+                 'bia@acme.com', 'hash', 'VENDEDOR')""",
+            f"""INSERT INTO {schema}.roles VALUES
+                ('00000000-0000-0000-0000-0000000000f1', 'Sales'),
+                ('00000000-0000-0000-0000-0000000000f2', 'Data_Admin')""",
+            f"""INSERT INTO {schema}.user_roles VALUES
+                ('00000000-0000-0000-0000-0000000000a1', '00000000-0000-0000-0000-0000000000f1'),
+                ('00000000-0000-0000-0000-0000000000a1', '00000000-0000-0000-0000-0000000000f2')""",
+        ):
+            await conn.execute(text(ddl))
+    try:
+        yield engine, schema
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+async def test_login_context_in_one_statement(login_db) -> None:
+    engine, _ = login_db
+    async with AsyncSession(engine) as session:
+        ctx = await get_login_context(session, "ana@ACME.com")
+        assert ctx["email"] == "Ana@Acme.com"
+        assert ctx["nome_empresa"] == "Acme" and ctx["schema_name"] == "tenant_acme"
+        assert ctx["roles"] == ["data_admin", "sales"]
+        assert (await get_login_context(session, "bia@acme.com"))["roles"] == []
+        assert await get_login_context(session, "nobody@acme.com") is None
+
+
+async def test_case_duplicates_are_rejected_not_guessed(login_db) -> None:
+    engine, schema = login_db
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                f"INSERT INTO {schema}.tb_usuario VALUES ('00000000-0000-0000-0000-0000000000a3', "
+                "'00000000-0000-0000-0000-000000000001', 'ANA@acme.com', 'hash', 'VENDEDOR')"
+            )
+        )
+    async with AsyncSession(engine) as session:
+        with pytest.raises(HTTPException) as exc:
+            await get_login_context(session, "ana@acme.com")
+    assert exc.value.status_code == 409
+
+
+async def test_migration_creates_unique_lower_email_index(login_db) -> None:
+    engine, schema = login_db
+    async with engine.begin() as conn:
+        for sql in _migration_sql(schema):
+            await conn.execute(text(sql))
+    with pytest.raises(DBAPIError, match="idx_tb_usuario_lower_email"):
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    f"INSERT INTO {schema}.tb_usuario VALUES ('00000000-0000-0000-0000-0000000000a3', "
+                    "'00000000-0000-0000-0000-000000000001', 'BIA@acme.com', 'hash', 'VENDEDOR')"
+                )
+            )
+
+
+async def test_migration_refuses_existing_case_duplicates(login_db) -> None:
+    engine, schema = login_db
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                f"INSERT INTO {schema}.tb_usuario VALUES ('00000000-0000-0000-0000-0000000000a3', "
+                "'00000000-0000-0000-0000-000000000001', 'BIA@acme.com', 'hash', 'VENDEDOR')"
+            )
+        )
+    with pytest.raises(DBAPIError, match="differing only by case: bia@acme.com"):
+        async with engine.begin() as conn:
+            for sql in _migration_sql(schema):
+                await conn.execute(text(sql))
+
+
+@pytest.mark.benchmark
+async def test_benchmark_login_lookup(login_db) -> None:
+    """Login lookup latency: combined statement vs the former user + roles round trips."""
+    engine, schema = login_db
+    iterations = 500
+    async with AsyncSession(engine) as session:
+        await get_login_context(session, "ana@acme.com")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await get_login_context(session, "ana@acme.com")
+        combined = (time.perf_counter() - start) / iterations
+
+        user_sql = text(
+            f"""
+            SELECT u.id AS user_id, u.email, u.senha_hash, u.perfil, u.tenant_id, t.schema_name, t.nome_empresa
+            FROM {schema}.tb_usuario u JOIN {schema}.tb_tenant t ON t.id = u.tenant_id
+            WHERE lower(u.email) = lower(:email) LIMIT 1
+            """
+        )
+        roles_sql = text(
+            f"""
+            SELECT lower(r.name) FROM {schema}.user_roles ur JOIN {schema}.roles r ON r.role_id = ur.role_id
+            WHERE ur.user_id = :user_id
+            """
+        )
+        start = time.perf_counter()
+        for _ in range(iterations):
+            user = (await session.execute(user_sql, {"email": "ana@acme.com"})).mappings().first()
+            (await session.execute(roles_sql, {"user_id": user["user_id"]})).scalars().all()
+        separate = (time.perf_counter() - start) / iterations
+
+    print(f"\nlogin lookup: combined {combined * 1e3:.3f}ms, user + roles {separate * 1e3:.3f}ms")
+    assert combined < separate
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.security import TenantContext
+from app.db.table_versions import CREATE_STATEMENT, TENANT_ADMIN
+from app.db.utils import bootstrap_tenant_session
+from app.models import CampaignCreate
+from app.repositories.marketing import MarketingRepository
+
+
+@pytest.fixture
+async def tenant_sessions(database_url: str):
+    schema = f"test_mkt_{uuid4().hex[:8]}"
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {TENANT_ADMIN}"))
+        await conn.execute(text(CREATE_STATEMENT))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(
+            text(
+                f"""
+                CREATE TABLE {schema}.marketing_campaigns (
+                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                    nome TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    investimento NUMERIC(14,2) NOT NULL,
+                    inicio DATE NOT NULL,
+                    fim DATE NOT NULL,
+                    owner_user_id UUID,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ
+                )
+                """
+            )
+        )
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        yield factory, schema
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_create_campaign_inserts_and_lists(tenant_sessions) -> None:
+    factory, schema = tenant_sessions
+    context = TenantContext(tenant_id="t1", user_id=str(uuid4()), roles=[])
+    payload = CampaignCreate(nome="Black Friday", status="Ativa", investimento=1500.5, inicio="2025-11-01", fim="2025-11-30")
+
+    async with factory() as session:
+        await bootstrap_tenant_session(session, schema)
+        created = await MarketingRepository(session, context).create_campaign(payload)
+    assert created.nome == "Black Friday" and created.investimento == 1500.5
+    assert (created.inicio, created.fim) == ("2025-11-01", "2025-11-30")
+
+    async with factory() as session:
+        await bootstrap_tenant_session(session, schema)
+        listed = await MarketingRepository(session, context).list_campaigns()
+    assert [campaign.id for campaign in listed] == [created.id]
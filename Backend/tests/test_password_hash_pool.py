@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import anyio
+import pytest
+from fastapi import HTTPException
+
+from app.security import jwt_tenancy
+from app.security.jwt_tenancy import PasswordHashPool, hash_password_async, verify_password_async
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hash_pool(monkeypatch: pytest.MonkeyPatch) -> PasswordHashPool:
+    pool = PasswordHashPool(max_workers=2, max_pending=8)
+    monkeypatch.setattr(jwt_tenancy, "password_hash_pool", pool)
+    return pool
+
+
+async def test_hash_and_verify_run_on_the_bcrypt_threads(
+    hash_pool: PasswordHashPool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    threads: list[str] = []
+    real_hash, real_verify = jwt_tenancy.pwd_context.hash, jwt_tenancy.verify_password
+
+    def spy(fn):
+        def wrapper(*args):
+            threads.append(threading.current_thread().name)
+            return fn(*args)
+
+        return wrapper
+
+    monkeypatch.setattr(jwt_tenancy.pwd_context, "hash", spy(real_hash))
+    monkeypatch.setattr(jwt_tenancy, "verify_password", spy(real_verify))
+
+    hashed = await hash_password_async("s3nha")
+    assert await verify_password_async("s3nha", hashed)
+    assert not await verify_password_async("outra", hashed)
+    assert len(threads) == 3 and all(name.startswith("nexus-bcrypt") for name in threads)
+    assert threading.current_thread().name not in threads
+    assert hash_pool.stats()["completed"] == 3 and hash_pool.pending == 0
+
+
+async def test_concurrent_calls_never_exceed_the_worker_count(hash_pool: PasswordHashPool) -> None:
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work(i: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return i
+
+    results: list[int] = []
+
+    async def call(i: int) -> None:
+        results.append(await hash_pool.run(work, i))
+
+    async with anyio.create_task_group() as tg:
+        for i in range(6):
+            tg.start_soon(call, i)
+    assert sorted(results) == list(range(6))
+    assert peak == hash_pool.max_workers
+    assert hash_pool.stats() == {"max_workers": 2, "pending": 0, "peak_pending": 6, "completed": 6, "rejected": 0}
+
+
+async def test_calls_beyond_max_pending_get_a_503() -> None:
+    pool = PasswordHashPool(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def call() -> None:
+        await pool.run(release.wait, 5)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(call)
+        tg.start_soon(call)
+        while pool.pending < 2:
+            await anyio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(release.wait, 5)
+        assert exc.value.status_code == 503
+        release.set()
+    assert pool.stats()["rejected"] == 1 and pool.pending == 0 and pool.completed == 2
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.core.security import PermissionCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def rbac_session(database_url: str, monkeypatch: pytest.MonkeyPatch):
+    schema = f"test_rbac_{uuid4().hex[:8]}"
+    monkeypatch.setattr(settings, "tenant_admin_schema", schema)
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        for ddl in (
+            f"CREATE SCHEMA {schema}",
+            f"CREATE TABLE {schema}.roles (role_id int PRIMARY KEY, name text NOT NULL)",
+            f"CREATE TABLE {schema}.permissions (permission_id int PRIMARY KEY, action_key text NOT NULL)",
+            f"CREATE TABLE {schema}.role_permissions (role_id int, permission_id int)",
+            f"INSERT INTO {schema}.roles VALUES (1, 'Sales'), (2, 'Viewer')",
+            f"INSERT INTO {schema}.permissions VALUES (1, 'leads:write'), (2, 'leads:read')",
+            f"INSERT INTO {schema}.role_permissions VALUES (1, 1), (1, 2), (2, 2)",
+        ):
+            await conn.execute(text(ddl))
+    session = AsyncSession(engine)
+    try:
+        yield session, schema, engine
+    finally:
+        await session.close()
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+async def _revoke_elsewhere(engine, schema: str) -> None:
+    # Another worker (or manual SQL): nothing calls bump() in this process
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM {schema}.role_permissions WHERE role_id = 1 AND permission_id = 1"))
+
+
+async def test_compiles_role_map(rbac_session) -> None:
+    session, _, _ = rbac_session
+    cache = PermissionCache(ttl_seconds=300, revalidate_seconds=60)
+    compiled = await cache.get(session)
+    assert compiled == {"sales": frozenset({"leads:write", "leads:read"}), "viewer": frozenset({"leads:read"})}
+    assert await cache.get(session) is compiled
+    assert cache.stats()["loads"] == 1 and cache.stats()["hits"] == 1
+
+
+async def test_revoke_from_another_process_is_seen_after_revalidation(rbac_session) -> None:
+    session, schema, engine = rbac_session
+    cache = PermissionCache(ttl_seconds=300, revalidate_seconds=0)
+    assert "leads:write" in (await cache.get(session))["sales"]
+    await session.commit()
+    assert cache.stats()["revalidations"] == 0
+    await cache.get(session)
+    await session.commit()
+    assert cache.stats()["revalidations"] == 1 and cache.stats()["loads"] == 1
+
+    await _revoke_elsewhere(engine, schema)
+    assert "leads:write" not in (await cache.get(session))["sales"]
+    assert cache.stats()["loads"] == 2
+
+
+async def test_bump_forces_rebuild(rbac_session) -> None:
+    session, schema, engine = rbac_session
+    cache = PermissionCache(ttl_seconds=300, revalidate_seconds=60)
+    await cache.get(session)
+    await session.commit()
+    await _revoke_elsewhere(engine, schema)
+    # Within the revalidation window the compiled map is trusted...
+    assert "leads:write" in (await cache.get(session))["sales"]
+    # ...unless a local admin write bumped the version
+    cache.bump()
+    assert "leads:write" not in (await cache.get(session))["sales"]
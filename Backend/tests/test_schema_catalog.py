@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.session import get_session
+from app.main import app
+from app.security.jwt_tenancy import create_access_token, tenant_schema_cache
+from app.services.data_store import BASE_TABLES
+from app.services.schema_catalog import SchemaCatalogCache
+
+
+@pytest.fixture
+async def catalog_db(database_url: str):
+    schema = f"test_catalog_{uuid4().hex[:8]}"
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text(f"CREATE TABLE {schema}.clientes (id int PRIMARY KEY, nome text NOT NULL, email varchar(80))"))
+        await conn.execute(text(f"CREATE INDEX idx_clientes_email ON {schema}.clientes (email)"))
+        await conn.execute(text(f"CREATE VIEW {schema}.ativos AS SELECT id, nome FROM {schema}.clientes"))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def ddl(sql: str) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(text(sql.format(schema=schema)))
+
+    try:
+        yield factory, schema, ddl
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+async def _get(cache: SchemaCatalogCache, factory, schema: str) -> list[dict]:
+    async with factory() as session:
+        return await cache.get(session, schema)
+
+
+@pytest.mark.anyio
+async def test_catalog_lists_tables_views_columns_and_indexes(catalog_db) -> None:
+    factory, schema, _ = catalog_db
+    tables = await _get(SchemaCatalogCache(ttl_seconds=60, revalidate_seconds=60, max_entries=10), factory, schema)
+    assert [(t["nome"], t["tipo"]) for t in tables] == [("ativos", "VIEW"), ("clientes", "TABLE")]
+    clientes = tables[1]
+    assert clientes["colunas"] == [
+        {"nome": "id", "tipo": "integer", "anulavel": False},
+        {"nome": "nome", "tipo": "text", "anulavel": False},
+        {"nome": "email", "tipo": "character varying(80)", "anulavel": True},
+    ]
+    indexes = {index["nome"]: index for index in clientes["indices"]}
+    assert indexes["clientes_pkey"]["primario"] and indexes["clientes_pkey"]["unico"]
+    assert "(email)" in indexes["idx_clientes_email"]["definicao"] and not indexes["idx_clientes_email"]["unico"]
+    assert tables[0]["indices"] == [] and tables[0]["linhasEstimadas"] == 0
+
+
+@pytest.mark.anyio
+async def test_unchanged_signature_revalidates_without_reloading(catalog_db) -> None:
+    factory, schema, ddl = catalog_db
+    cache = SchemaCatalogCache(ttl_seconds=60, revalidate_seconds=0, max_entries=10)
+    first = await _get(cache, factory, schema)
+    # Row changes and ANALYZE rewrite no catalog row the signature looks at
+    await ddl("INSERT INTO {schema}.clientes VALUES (1, 'a', NULL)")
+    await ddl("ANALYZE {schema}.clientes")
+    assert await _get(cache, factory, schema) is first
+    assert cache.stats()["loads"] == 1 and cache.stats()["revalidations"] == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "change",
+    [
+        "ALTER TABLE {schema}.clientes ADD COLUMN telefone text",
+        "ALTER TABLE {schema}.clientes DROP COLUMN email",
+        "CREATE TABLE {schema}.pedidos (id int)",
+        "DROP VIEW {schema}.ativos",
+    ],
+)
+async def test_ddl_changes_the_signature_and_reloads(catalog_db, change: str) -> None:
+    factory, schema, ddl = catalog_db
+    cache = SchemaCatalogCache(ttl_seconds=60, revalidate_seconds=0, max_entries=10)
+    before = await _get(cache, factory, schema)
+    await ddl(change)
+    after = await _get(cache, factory, schema)
+    assert after != before
+    assert cache.stats()["loads"] == 2
+
+
+@pytest.mark.anyio
+async def test_fresh_entries_are_served_without_queries(catalog_db) -> None:
+    factory, schema, ddl = catalog_db
+    cache = SchemaCatalogCache(ttl_seconds=60, revalidate_seconds=60, max_entries=10)
+    first = await _get(cache, factory, schema)
+    await ddl("CREATE TABLE {schema}.pedidos (id int)")
+    # Within revalidate_seconds even DDL goes unnoticed, unless invalidated
+    assert await _get(cache, factory, schema) is first
+    assert cache.stats()["hits"] == 1
+    cache.invalidate(schema)
+    assert "pedidos" in {t["nome"] for t in await _get(cache, factory, schema)}
+
+
+@pytest.mark.anyio
+async def test_meta_schemas_without_jwt_keeps_the_header_context_response() -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/api/v1/dados/meta/schemas", headers={"X-Tenant-ID": f"t-{uuid4().hex[:8]}"})
+    assert res.status_code == 200
+    assert res.json()["tabelasBase"] == BASE_TABLES and res.json()["tabelas"] == []
+
+
+@pytest.mark.anyio
+async def test_meta_schemas_with_jwt_lists_the_tenant_catalog(catalog_db) -> None:
+    factory, schema, _ = catalog_db
+    tenant = f"t-{uuid4().hex[:8]}"
+    tenant_schema_cache.set(tenant, schema)
+
+    async def session_override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_override
+    token = create_access_token({"user_id": "u1", "tenant_id": tenant, "perfil": "admin"})
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            res = await client.get("/api/v1/dados/meta/schemas", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+    assert res.status_code == 200
+    assert res.json()["tabelasBase"] == ["ativos", "clientes"]
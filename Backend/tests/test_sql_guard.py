@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.main import app
+from app.security.jwt_tenancy import validar_jwt_e_tenant
+from app.services import sql_guard
+from app.core.config import settings
+from app.services.sql_guard import analisar_sql, validar_sql
+from app.services.studio_limiter import StudioConcurrencyLimiter
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * INTO copia FROM leads",
+        "select id into temp t from leads",
+        "WITH x AS (SELECT 1) SELECT * INTO t FROM x",
+        "SELECT 1; SELECT 2",
+        "DELETE FROM leads",
+        "SELECT 1 /* ok */; DROP TABLE leads",
+        "SET search_path TO public",
+    ],
+)
+def test_rejects_non_select_statements(query: str) -> None:
+    with pytest.raises(HTTPException) as exc:
+        validar_sql(query)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT 'insert into x' AS note",
+        'SELECT "into" FROM t',
+        "SELECT $$ DROP $$ -- into\n",
+        "WITH a AS (SELECT 1 AS n) SELECT n FROM a;",
+    ],
+)
+def test_keywords_inside_literals_identifiers_and_comments_pass(query: str) -> None:
+    assert validar_sql(query)
+
+
+def test_fingerprint_ignores_case_whitespace_and_comments() -> None:
+    a = analisar_sql("select id  from Leads -- c")
+    b = analisar_sql("SELECT id\nFROM leads;")
+    assert a.fingerprint == b.fingerprint
+    assert "leads" in a.tables
+
+
+@pytest.fixture
+async def export_client(database_url: str, monkeypatch: pytest.MonkeyPatch):
+    schema = f"test_export_{uuid4().hex[:8]}"
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text(f"CREATE TABLE {schema}.itens AS SELECT g AS id, g % 3 AS grupo FROM generate_series(1, 2500) g"))
+    monkeypatch.setattr(sql_guard, "AsyncReadSessionLocal", None)
+    monkeypatch.setattr(sql_guard, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    app.dependency_overrides[validar_jwt_e_tenant] = lambda: {"tenant_id": "t1", "schema_name": schema}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client, engine, schema
+    finally:
+        app.dependency_overrides.pop(validar_jwt_e_tenant, None)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_export_streams_every_row(export_client) -> None:
+    client, _, _ = export_client
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT id, grupo FROM itens ORDER BY id"})
+    assert res.status_code == 200
+    lines = res.text.splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[-1]) == {"id": 2500, "grupo": 1}
+
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT id FROM itens WHERE id < 3", "format": "csv"})
+    assert res.status_code == 200 and res.text.splitlines() == ["id", "1", "2"]
+
+
+@pytest.mark.anyio
+async def test_export_sql_errors_are_400_not_truncated_200(export_client) -> None:
+    client, _, _ = export_client
+    for query in ("SELECT 1 / 0", "SELECT nao_existe FROM itens", "SELECT * FROM tabela_inexistente"):
+        res = await client.post("/api/v1/dados/query/export", json={"query": query})
+        assert res.status_code == 400, query
+        assert res.json()["detail"].startswith("Erro ao executar a consulta")
+
+
+@pytest.mark.anyio
+async def test_export_cannot_create_tables(export_client) -> None:
+    client, engine, schema = export_client
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT * INTO copia FROM itens"})
+    assert res.status_code == 400
+    # Even past the validator, the body only runs as a subquery
+    with pytest.raises(HTTPException):
+        await sql_guard.iniciar_exportacao("SELECT * INTO copia FROM itens", schema)
+    async with engine.connect() as conn:
+        exists = await conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{schema}.copia"})
+        assert exists.scalar_one() is None
+
+
+@pytest.mark.anyio
+async def test_export_rejects_queries_above_the_job_cost_ceiling(export_client, monkeypatch) -> None:
+    client, _, _ = export_client
+    monkeypatch.setattr(settings, "sql_studio_job_max_plan_cost", 1.0)
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT * FROM itens"})
+    assert res.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_export_takes_a_studio_slot(export_client, monkeypatch) -> None:
+    client, _, _ = export_client
+    full = StudioConcurrencyLimiter(global_limit=0, per_tenant_limit=1, max_queued=0, wait_timeout_seconds=1)
+    monkeypatch.setattr(sql_guard, "studio_limiter", full)
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT id FROM itens"})
+    assert res.status_code == 429 and res.headers["Retry-After"] == "1"
+
+    limiter = StudioConcurrencyLimiter(global_limit=1, per_tenant_limit=1, max_queued=0, wait_timeout_seconds=1)
+    monkeypatch.setattr(sql_guard, "studio_limiter", limiter)
+    res = await client.post("/api/v1/dados/query/export", json={"query": "SELECT id FROM itens"})
+    assert res.status_code == 200 and limiter.stats()["granted"] == 1 and limiter.stats()["active"] == 0
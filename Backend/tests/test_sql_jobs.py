@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services import sql_jobs as sql_jobs_module
+from app.services.sql_jobs import CANCELLED, FAILED, SUCCEEDED, SQLJob, SQLJobManager
+from app.services.studio_limiter import StudioConcurrencyLimiter
+
+
+def _manager(**kw) -> SQLJobManager:
+    options = {"pool_size": 2, "max_per_tenant": 2, "max_rows": 100, "ttl_seconds": 900, "max_retained_rows": 250}
+    options.update(kw)
+    return SQLJobManager(**options)
+
+
+def _finished(job_id: str, rows: int, finished_at: float) -> SQLJob:
+    job = SQLJob(job_id=job_id, tenant_id="t1", tenant_schema="s", query="SELECT 1", status=SUCCEEDED)
+    job.rows = [(i,) for i in range(rows)]
+    job.finished_at = finished_at
+    return job
+
+
+def test_retained_rows_are_capped_oldest_first() -> None:
+    manager = _manager()
+    now = time.time()
+    for index, rows in enumerate((100, 100, 100)):
+        job = _finished(f"j{index}", rows, now + index)
+        manager._jobs[job.job_id] = job
+    manager._purge()
+    assert set(manager._jobs) == {"j1", "j2"}
+    assert manager.stats()["evicted"] == 1 and manager.stats()["retained_rows"] == 200
+
+
+def test_running_jobs_are_never_evicted() -> None:
+    manager = _manager(max_retained_rows=0)
+    running = SQLJob(job_id="r", tenant_id="t1", tenant_schema="s", query="SELECT 1", status="running")
+    manager._jobs["r"] = running
+    manager._jobs["f"] = _finished("f", 10, time.time())
+    manager._purge()
+    assert set(manager._jobs) == {"r"}
+
+
+def test_expired_jobs_are_dropped() -> None:
+    manager = _manager(ttl_seconds=60)
+    manager._jobs["old"] = _finished("old", 1, time.time() - 120)
+    manager._jobs["new"] = _finished("new", 1, time.time())
+    manager._purge()
+    assert set(manager._jobs) == {"new"}
+
+
+class _FinishingEngine:
+    """Studio engine whose connect() completes the job before handing out a connection."""
+
+    def __init__(self, job: SQLJob) -> None:
+        self.job = job
+        self.executed: list[object] = []
+
+    @asynccontextmanager
+    async def connect(self):
+        # Meanwhile the job finished and its pooled connection went to another job
+        self.job.status = SUCCEEDED
+        self.job.backend_pid = None
+        yield self
+
+    async def execute(self, statement, params=None) -> None:
+        self.executed.append(statement)
+
+
+@pytest.mark.anyio
+async def test_cancel_skips_a_pid_released_while_connecting(monkeypatch: pytest.MonkeyPatch) -> None:
+    job = SQLJob(job_id="j", tenant_id="t1", tenant_schema="s", query="SELECT 1", status="running", backend_pid=4242)
+    engine = _FinishingEngine(job)
+    monkeypatch.setattr(sql_jobs_module, "studio_engine", engine)
+    await _manager().cancel(job)
+    assert engine.executed == []
+
+
+@pytest.fixture
+async def studio_db(database_url: str, monkeypatch: pytest.MonkeyPatch):
+    engine = create_async_engine(database_url, pool_size=2, max_overflow=1)
+    monkeypatch.setattr(sql_jobs_module, "StudioSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    monkeypatch.setattr(sql_jobs_module, "studio_engine", engine)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def _wait(job: SQLJob, timeout: float = 5.0) -> None:
+    await asyncio.wait_for(asyncio.shield(job.task), timeout)
+
+
+@pytest.mark.anyio
+async def test_job_runs_and_pages(studio_db) -> None:
+    manager = _manager()
+    job = manager.submit("t1", "public", "SELECT g AS n FROM generate_series(1, 150) g")
+    await _wait(job)
+    assert job.status == SUCCEEDED and job.truncated and len(job.rows) == 100
+    assert job.page(98, 5) == [{"n": 99}, {"n": 100}]
+
+
+@pytest.mark.anyio
+async def test_cancel_while_running(studio_db) -> None:
+    manager = _manager()
+    job = manager.submit("t1", "public", "SELECT pg_sleep(10)")
+    while job.backend_pid is None or job.status != "running":
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    await manager.cancel(job)
+    await _wait(job)
+    assert job.status == CANCELLED
+    assert time.perf_counter() - start < 2
+
+
+@pytest.mark.anyio
+async def test_cancel_between_bootstrap_and_execute_is_not_lost(studio_db, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = _manager()
+    real_plan = sql_jobs_module.estimar_plano
+    holder: dict[str, SQLJob] = {}
+
+    async def plan_then_cancel(session, sql):
+        plan = await real_plan(session, sql)
+        # The cancel lands after planning, when no statement is running for
+        # pg_cancel_backend to interrupt
+        await manager.cancel(holder["job"])
+        return plan
+
+    monkeypatch.setattr(sql_jobs_module, "estimar_plano", plan_then_cancel)
+    holder["job"] = job = manager.submit("t1", "public", "SELECT pg_sleep(10)")
+    start = time.perf_counter()
+    await _wait(job)
+    assert job.status == CANCELLED
+    assert time.perf_counter() - start < 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("query", ["SELECT 1", "SELECT 1/0"])
+async def test_pid_is_cleared_before_the_connection_is_released(studio_db, monkeypatch, query: str) -> None:
+    pids_at_close: list[object] = []
+    holder: dict[str, SQLJob] = {}
+
+    class RecordingSession(AsyncSession):
+        async def close(self) -> None:
+            pids_at_close.append(holder["job"].backend_pid)
+            await super().close()
+
+    monkeypatch.setattr(
+        sql_jobs_module, "StudioSessionLocal", async_sessionmaker(studio_db, class_=RecordingSession, expire_on_commit=False)
+    )
+    manager = _manager()
+    holder["job"] = job = manager.submit("t1", "public", query)
+    await _wait(job)
+    assert pids_at_close == [None]
+
+
+@pytest.mark.anyio
+async def test_running_job_holds_a_studio_slot(studio_db, monkeypatch) -> None:
+    limiter = StudioConcurrencyLimiter(global_limit=1, per_tenant_limit=1, max_queued=0, wait_timeout_seconds=1)
+    monkeypatch.setattr(sql_jobs_module, "studio_limiter", limiter)
+    manager = _manager()
+    job = manager.submit("t1", "public", "SELECT pg_sleep(0.3)")
+    while job.status != "running":
+        await asyncio.sleep(0.01)
+    assert limiter.stats()["active"] == 1
+    # The Studio is full: a second job cannot start and fails with the limiter's message
+    blocked = manager.submit("t2", "public", "SELECT 1")
+    await _wait(blocked)
+    assert blocked.status == FAILED and "ocupado" in blocked.error
+    await _wait(job)
+    assert job.status == SUCCEEDED and limiter.stats()["active"] == 0
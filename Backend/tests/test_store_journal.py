@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from app.models import LeadCreate
+from app.services import store_journal
+from app.services.data_store import DataStore
+from app.services.store_journal import StoreJournal
+
+
+def _lead(nome: str) -> LeadCreate:
+    return LeadCreate(nome=nome, email=f"{nome}@x.com", status="Novo", origem=None, owner="Ana")
+
+
+def _open(directory, **kwargs) -> tuple[StoreJournal, DataStore]:
+    journal = StoreJournal(str(directory), **kwargs)
+    return journal, DataStore(memory_budget_bytes=64 * 1024 * 1024, journal=journal)
+
+
+def _names(data_store: DataStore, tenant: str = "t") -> list[str]:
+    return [lead.nome for lead in data_store.get_store(tenant).list_leads() if lead.nome.startswith("w")]
+
+
+def _wal(directory, tenant: str = "t") -> str:
+    wals = sorted(name for name in os.listdir(directory / tenant) if name.endswith(".wal"))
+    return str(directory / tenant / wals[-1])
+
+
+def test_torn_tail_is_truncated_and_later_writes_replay(tmp_path) -> None:
+    journal, data_store = _open(tmp_path)
+    for i in range(3):
+        data_store.get_store("t").create_lead(_lead(f"w{i}"))
+    journal.close()
+    path = _wal(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "ab") as fh:
+        fh.write(b"\x40\x00\x00\x00\x01\x02")  # header of a record that never finished
+
+    journal, data_store = _open(tmp_path)
+    assert _names(data_store) == ["w0", "w1", "w2"]
+    assert journal.stats()["torn_tails"] == 1
+    assert os.path.getsize(path) == size
+    data_store.get_store("t").create_lead(_lead("w3"))
+    journal.close()
+
+    journal, data_store = _open(tmp_path)
+    assert _names(data_store) == ["w0", "w1", "w2", "w3"]
+    journal.close()
+
+
+def test_replay_stops_at_a_crc_mismatch(tmp_path) -> None:
+    journal, data_store = _open(tmp_path)
+    for i in range(3):
+        data_store.get_store("t").create_lead(_lead(f"w{i}"))
+    journal.close()
+    path = _wal(tmp_path)
+    with open(path, "r+b") as fh:
+        fh.seek(-1, os.SEEK_END)
+        last = fh.read(1)
+        fh.seek(-1, os.SEEK_END)
+        fh.write(bytes([last[0] ^ 0xFF]))
+
+    journal, data_store = _open(tmp_path)
+    assert _names(data_store) == ["w0", "w1"]
+    assert journal.stats()["torn_tails"] == 1
+    journal.close()
+
+
+@pytest.mark.parametrize("finished", [True, False], ids=["synced", "crash-before-sync"])
+def test_replay_after_compaction(tmp_path, finished: bool) -> None:
+    journal, data_store = _open(tmp_path, compact_bytes=1)
+    for i in range(20):
+        data_store.get_store("t").create_lead(_lead(f"w{i}"))
+    assert journal.stats()["pending_compactions"] > 0
+    if finished:
+        journal.sync()
+        assert journal.stats()["compactions"] > 0
+        assert len(os.listdir(tmp_path / "t")) <= 4  # latest snapshot, its WAL, lock and maybe one more WAL
+
+    # A second journal on the directory sees what a restart would
+    other, restarted = _open(tmp_path)
+    assert _names(restarted) == [f"w{i}" for i in range(20)]
+    other.close()
+    journal.close()
+
+
+def test_compaction_and_eviction_do_not_fsync_on_the_request_path(tmp_path, monkeypatch) -> None:
+    journal = StoreJournal(str(tmp_path), compact_bytes=1)
+    data_store = DataStore(memory_budget_bytes=20_000, journal=journal)
+    synced: list[int] = []
+    monkeypatch.setattr(store_journal.os, "fsync", lambda fd: synced.append(fd))
+    for i in range(40):
+        data_store.get_store(f"t{i}").create_lead(_lead(f"w{i}"))
+    assert data_store.stats()["evictions"] > 0 and journal.stats()["pending_compactions"] > 0
+    assert synced == []
+
+    journal.sync()
+    assert synced
+    assert journal.stats()["pending_compactions"] == 0
+    monkeypatch.undo()
+    journal.close()
+
+
+def test_shared_writers_survive_compactions_they_missed(tmp_path) -> None:
+    a_journal, a = _open(tmp_path, shared=True, compact_bytes=1)
+    b_journal, b = _open(tmp_path, shared=True, compact_bytes=1)
+    held = b.get_store("t")
+    held.create_lead(_lead("w0"))
+
+    # A compacts several times while B stays idle, so B's WAL generation is long gone
+    for i in range(1, 10):
+        a.get_store("t").create_lead(_lead(f"w{i}"))
+        a_journal.sync()
+    assert a_journal.stats()["compactions"] >= 2
+
+    # B writes through the store it already held, without going through get_store
+    held.create_lead(_lead("w10"))
+    assert b_journal.stats()["stale_reloads"] > 0
+    expected = [f"w{i}" for i in range(11)]
+    assert [lead.nome for lead in held.list_leads() if lead.nome.startswith("w")] == expected
+    assert _names(a) == expected
+    b_journal.sync()
+
+    c_journal, c = _open(tmp_path, shared=True)
+    assert _names(c) == expected
+    for journal in (a_journal, b_journal, c_journal):
+        journal.close()
+
+
+def _reload_rate(directory, records: int) -> float:
+    journal, data_store = _open(directory)
+    start = time.perf_counter()
+    assert len(_names(data_store)) == records
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return records / elapsed
+
+
+@pytest.mark.benchmark
+def test_benchmark_replay_throughput(tmp_path) -> None:
+    """Records/s rebuilding a tenant on restart, from the WAL alone and from a compacted snapshot."""
+    records = 20_000
+    journal, data_store = _open(tmp_path / "wal", compact_bytes=1 << 40)
+    store = data_store.get_store("t")
+    start = time.perf_counter()
+    for i in range(records):
+        store.create_lead(_lead(f"w{i}"))
+    append_s = time.perf_counter() - start
+    journal.close()
+    wal_rate = _reload_rate(tmp_path / "wal", records)
+
+    journal, data_store = _open(tmp_path / "snap", compact_bytes=1)
+    store = data_store.get_store("t")
+    for i in range(records):
+        store.create_lead(_lead(f"w{i}"))
+    journal.close()
+    snap_rate = _reload_rate(tmp_path / "snap", records)
+
+    print(
+        f"\nappend {append_s / records * 1e6:.1f}us/record, WAL replay {wal_rate:,.0f} records/s, "
+        f"snapshot restore {snap_rate:,.0f} records/s"
+    )
+    assert snap_rate > wal_rate
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.table_versions import CREATE_STATEMENT, TENANT_ADMIN, mark_tables_written
+from app.db.utils import bootstrap_tenant_session
+from app.services import sql_guard
+from app.services.sql_guard import analisar_sql
+from app.services.studio_cache import StudioResultCache
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT now()",
+        "select id, random() from tb_contato",
+        "SELECT nextval('seq')",
+        "SELECT CURRENT_TIMESTAMP",
+        "SELECT txid_current()",
+        "SELECT * FROM tb_contato WHERE criado_em > 'today'::date",
+    ],
+)
+def test_volatile_queries_are_flagged(query: str) -> None:
+    assert analisar_sql(query).volatile
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT id FROM tb_contato",
+        "SELECT 'now is the time' AS frase",
+        'SELECT "now" FROM t',
+    ],
+)
+def test_stable_queries_are_not_flagged(query: str) -> None:
+    assert not analisar_sql(query).volatile
+
+
+def test_only_allowlisted_tables_are_cacheable() -> None:
+    cache = StudioResultCache(max_entries=10, ttl_seconds=60, allowed_tables=["tb_contato", "tb_oportunidade"])
+    assert cache.cacheable(("tb_contato",))
+    assert cache.cacheable(("tb_contato", "tb_oportunidade"))
+    assert not cache.cacheable(("tb_contato", "pg_class"))
+    assert cache.stats()["uncacheable"] == 1
+
+
+@pytest.fixture
+async def studio(database_url: str, monkeypatch: pytest.MonkeyPatch):
+    schema = f"test_cache_{uuid4().hex[:8]}"
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {TENANT_ADMIN}"))
+        await conn.execute(text(CREATE_STATEMENT))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text(f"CREATE TABLE {schema}.tb_contato AS SELECT g AS id FROM generate_series(1, 5) g"))
+        await conn.execute(text(f"CREATE TABLE {schema}.externa AS SELECT g AS id FROM generate_series(1, 5) g"))
+        await conn.execute(text(f"CREATE VIEW {schema}.visao AS SELECT id FROM {schema}.externa"))
+    cache = StudioResultCache(max_entries=10, ttl_seconds=60, allowed_tables=["tb_contato"])
+    monkeypatch.setattr(sql_guard, "studio_result_cache", cache)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def run(query: str):
+        async with factory() as session:
+            await bootstrap_tenant_session(session, schema, sql_safe=True)
+            return await sql_guard.validar_e_executar_sql_seguro(query, session, tenant_id="t1")
+
+    try:
+        yield run, factory, schema
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_allowlisted_query_is_cached_until_written(studio) -> None:
+    run, factory, schema = studio
+    assert not (await run("SELECT count(*) FROM tb_contato")).cache_hit
+    hit = await run("select COUNT(*) from tb_contato")
+    assert hit.cache_hit and hit.rows[0][0] == 5
+
+    async with factory() as session:
+        await session.execute(text(f"INSERT INTO {schema}.tb_contato VALUES (6)"))
+        mark_tables_written(session, "tb_contato", schema=schema)
+        await session.commit()
+    fresh = await run("SELECT count(*) FROM tb_contato")
+    assert not fresh.cache_hit and fresh.rows[0][0] == 6
+
+
+@pytest.mark.anyio
+async def test_write_committed_by_another_worker_invalidates(studio, database_url: str) -> None:
+    run, _, schema = studio
+    await run("SELECT count(*) FROM tb_contato")
+    assert (await run("SELECT count(*) FROM tb_contato")).cache_hit
+
+    # Another process: nothing in this one hears about the write, only the shared row changes
+    script = f"""
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.db.table_versions import mark_tables_written
+
+async def main():
+    engine = create_async_engine({database_url!r})
+    async with async_sessionmaker(engine)() as session:
+        await session.execute(text("INSERT INTO {schema}.tb_contato VALUES (7)"))
+        mark_tables_written(session, "tb_contato", schema={schema!r})
+        await session.commit()
+    await engine.dispose()
+
+asyncio.run(main())
+"""
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+
+    fresh = await run("SELECT count(*) FROM tb_contato")
+    assert not fresh.cache_hit and fresh.rows[0][0] == 6
+
+
+@pytest.mark.anyio
+async def test_rolled_back_write_keeps_the_entry(studio) -> None:
+    run, factory, schema = studio
+    await run("SELECT count(*) FROM tb_contato")
+    async with factory() as session:
+        await session.execute(text(f"INSERT INTO {schema}.tb_contato VALUES (8)"))
+        mark_tables_written(session, "tb_contato", schema=schema)
+        await session.rollback()
+    assert (await run("SELECT count(*) FROM tb_contato")).cache_hit
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT count(*) FROM externa",
+        "SELECT count(*) FROM visao",
+        "SELECT count(*) FROM tb_contato JOIN externa USING (id)",
+        "SELECT count(*), now() FROM tb_contato",
+        "SELECT count(*) FROM tb_contato, generate_series(1, 2)",
+    ],
+)
+async def test_unsafe_queries_are_never_cached(studio, query: str) -> None:
+    run, _, _ = studio
+    await run(query)
+    assert not (await run(query)).cache_hit
+
+
+@pytest.mark.anyio
+async def test_replica_reads_are_not_cached(studio, monkeypatch: pytest.MonkeyPatch) -> None:
+    run, _, _ = studio
+    monkeypatch.setattr(sql_guard, "is_replica_session", lambda session: True)
+    await run("SELECT count(*) FROM tb_contato")
+    assert not (await run("SELECT count(*) FROM tb_contato")).cache_hit
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.utils import bootstrap_tenant_session
+from app.dependencies.tenancy import get_tenant_read_session_sqlsafe
+from app.services import sql_guard
+from app.services.studio_limiter import StudioConcurrencyLimiter
+
+
+def _limiter(**kw) -> StudioConcurrencyLimiter:
+    options = {"global_limit": 1, "per_tenant_limit": 1, "max_queued": 8, "wait_timeout_seconds": 5}
+    options.update(kw)
+    return StudioConcurrencyLimiter(**options)
+
+
+async def _until(predicate) -> None:
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.anyio
+async def test_slots_go_round_robin_across_tenants() -> None:
+    limiter = _limiter(per_tenant_limit=4)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def query(name: str, tenant: str, hold: bool = False) -> None:
+        async with limiter.slot(tenant):
+            order.append(name)
+            if hold:
+                await release.wait()
+
+    holder = asyncio.create_task(query("first", "a", hold=True))
+    await _until(lambda: limiter.stats()["active"] == 1)
+    # Tenant a queues three queries before b queues one: b must not wait behind all of them
+    waiters = [asyncio.create_task(query(f"a{i}", "a")) for i in range(3)]
+    waiters.append(asyncio.create_task(query("b0", "b")))
+    await _until(lambda: limiter.stats()["queued"] == 4)
+    release.set()
+    await asyncio.gather(holder, *waiters)
+    assert order == ["first", "a0", "b0", "a1", "a2"]
+
+
+@pytest.mark.anyio
+async def test_per_tenant_cap_lets_other_tenants_through() -> None:
+    limiter = _limiter(global_limit=3, per_tenant_limit=1)
+    release = asyncio.Event()
+    started: list[str] = []
+
+    async def query(name: str, tenant: str) -> None:
+        async with limiter.slot(tenant):
+            started.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(query("a0", "a")), asyncio.create_task(query("a1", "a"))]
+    tasks.append(asyncio.create_task(query("b0", "b")))
+    await _until(lambda: len(started) == 2)
+    assert started == ["a0", "b0"] and limiter.stats()["queued"] == 1
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["a0", "b0", "a1"] and limiter.stats()["active"] == 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_is_429_with_retry_after() -> None:
+    limiter = _limiter(max_queued=1, wait_timeout_seconds=3)
+    release = asyncio.Event()
+
+    async def hold(tenant: str) -> None:
+        async with limiter.slot(tenant):
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold("a")), asyncio.create_task(hold("b"))]
+    await _until(lambda: limiter.stats()["queued"] == 1)
+    with pytest.raises(HTTPException) as exc:
+        async with limiter.slot("c"):
+            pass
+    assert exc.value.status_code == 429 and exc.value.headers == {"Retry-After": "3"}
+    assert limiter.stats()["rejected"] == 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.anyio
+async def test_wait_timeout_is_429_and_leaves_the_queue() -> None:
+    limiter = _limiter(wait_timeout_seconds=0.05)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot("a"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await _until(lambda: limiter.stats()["active"] == 1)
+    with pytest.raises(HTTPException) as exc:
+        async with limiter.slot("b"):
+            pass
+    assert exc.value.status_code == 429 and "esgotado" in exc.value.detail
+    stats = limiter.stats()
+    assert stats["timeouts"] == 1 and stats["queued"] == 0
+    release.set()
+    await holder
+    # The timed out waiter got nothing: the next query runs straight away
+    async with limiter.slot("b"):
+        assert limiter.stats()["active"] == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_is_removed_from_the_queue() -> None:
+    limiter = _limiter()
+    release = asyncio.Event()
+
+    async def hold(tenant: str) -> None:
+        async with limiter.slot(tenant):
+            await release.wait()
+
+    holder = asyncio.create_task(hold("a"))
+    await _until(lambda: limiter.stats()["active"] == 1)
+    waiter = asyncio.create_task(hold("b"))
+    await _until(lambda: limiter.stats()["queued"] == 1)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats()["queued"] == 0
+    release.set()
+    await holder
+    assert limiter.stats()["active"] == 0
+
+
+@pytest.mark.anyio
+async def test_waiter_cancelled_after_its_grant_gives_the_slot_back() -> None:
+    limiter = _limiter()
+    await limiter._acquire("a")
+    waiter = asyncio.create_task(limiter._acquire("b"))
+    await _until(lambda: limiter.stats()["queued"] == 1)
+    # The slot is handed to the waiter and the client goes away before it resumes
+    limiter._release("a")
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats()["active"] == 0 and limiter.stats()["queued"] == 0
+
+
+@pytest.mark.anyio
+async def test_queued_queries_hold_no_pool_connection(database_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = StudioConcurrencyLimiter(global_limit=1, per_tenant_limit=1, max_queued=4, wait_timeout_seconds=10)
+    monkeypatch.setattr(sql_guard, "studio_limiter", limiter)
+    # A single pooled connection: a waiter that had already checked one out would starve the running query
+    engine = create_async_engine(database_url, pool_size=1, max_overflow=0, pool_timeout=3)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    user = {"schema_name": f"test_slot_{uuid4().hex[:8]}"}
+    dependencies_done = asyncio.Event()
+
+    async def request(query: str):
+        # Like a request: dependencies, handler, then the session closes
+        async with factory() as session:
+            await get_tenant_read_session_sqlsafe(user, session)
+            dependencies_done.set()
+            return await sql_guard.validar_e_executar_sql_seguro(query, session, tenant_id="t1")
+
+    try:
+        running = asyncio.create_task(request("SELECT pg_sleep(0.5)"))
+        while not limiter.stats()["active"]:
+            await asyncio.sleep(0.01)
+        dependencies_done.clear()
+        queued = asyncio.create_task(
+            request("SELECT current_setting('search_path'), current_setting('statement_timeout')")
+        )
+        await dependencies_done.wait()
+        await asyncio.sleep(0.1)
+        assert limiter.stats()["queued"] == 1
+        # Only the running query holds the single connection
+        assert engine.pool.checkedout() == 1
+
+        await running
+        result = await queued
+        # The deferred bootstrap still applied the SQL-safe restrictions
+        assert result.rows[0][0] == user["schema_name"]
+        assert result.rows[0][1] != "0"
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_session_already_in_transaction_is_restricted_immediately(database_url: str) -> None:
+    engine = create_async_engine(database_url)
+    schema = f"test_slot_{uuid4().hex[:8]}"
+    try:
+        async with async_sessionmaker(engine)() as session:
+            # e.g. validar_jwt_e_tenant resolved the tenant on the shared primary session
+            await bootstrap_tenant_session(session, schema)
+            await get_tenant_read_session_sqlsafe({"schema_name": schema}, session)
+            result = await sql_guard.validar_e_executar_sql_seguro(
+                "SELECT current_setting('search_path')", session, tenant_id="t1"
+            )
+            assert result.rows[0][0] == schema
+    finally:
+        await engine.dispose()